@@ -1,6 +1,6 @@
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from app.extensions import db, migrate, socketio
+from app.extensions import db, migrate, socketio, get_socketio_options
 from app.exceptions import register_error_handlers
 from app.utils.logger import setup_logging
 from app.config import Config
@@ -43,7 +43,7 @@ def create_app():
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
+    socketio.init_app(app, **get_socketio_options())
     
     # Initialize Swagger/OpenAPI documentation
     try:
@@ -83,6 +83,36 @@ def create_app():
         init_redis_reservation_manager(redis_client)
         app.logger.info("Redis reservation manager initialized")
         
+        # Initialize seat state version log
+        from app.utils.seat_state_log import init_seat_state_log
+        init_seat_state_log(redis_client)
+        
+        # Initialize seat status bitmaps (served to status polls)
+        from app.utils.seat_status_bitmap import init_seat_status_bitmap
+        init_seat_status_bitmap(redis_client)
+        
+        # Initialize rendered ticket QR cache
+        from app.utils.qr_cache import init_qr_image_cache
+        init_qr_image_cache(redis_client)
+        
+        # Initialize order/ticket code generator (worker id leased from Redis)
+        from app.utils.code_generator import init_code_generator
+        init_code_generator(redis_client)
+        
+        # Initialize general-admission inventory counters
+        from app.utils.inventory_counter import init_inventory_counter
+        init_inventory_counter(redis_client)
+        
+        # Initialize discount catalog and redemption counters
+        from app.utils.discount_catalog import init_discount_catalog
+        from app.utils.discount_redemption_manager import init_discount_redemption_manager
+        init_discount_catalog(redis_client)
+        init_discount_redemption_manager(redis_client)
+        
+        # Initialize event listing cache
+        from app.utils.event_list_cache import init_event_list_cache
+        init_event_list_cache(redis_client)
+        
         # Initialize Redis password reset manager
         from app.utils.redis_password_reset_manager import init_redis_password_reset_manager
         init_redis_password_reset_manager(redis_client)
@@ -94,11 +124,35 @@ def create_app():
         init_redis_reservation_manager(None)
         app.logger.warning("Redis not available - seat reservation will use in-memory fallback")
         
+        from app.utils.seat_state_log import init_seat_state_log
+        init_seat_state_log(None)
+        
+        from app.utils.qr_cache import init_qr_image_cache
+        init_qr_image_cache(None)
+        
+        from app.utils.code_generator import init_code_generator
+        init_code_generator(None)
+        
+        from app.utils.inventory_counter import init_inventory_counter
+        init_inventory_counter(None)
+        
+        from app.utils.discount_catalog import init_discount_catalog
+        from app.utils.discount_redemption_manager import init_discount_redemption_manager
+        init_discount_catalog(None)
+        init_discount_redemption_manager(None)
+        
+        from app.utils.event_list_cache import init_event_list_cache
+        init_event_list_cache(None)
+        
         # Initialize password reset manager with None (will use in-memory fallback)
         from app.utils.redis_password_reset_manager import init_redis_password_reset_manager
         init_redis_password_reset_manager(None)
         app.logger.warning("Redis not available - password reset will use in-memory fallback")
 
+    # Ticket QR pre-render worker pool (threads start on first committed order)
+    from app.utils.qr_render_queue import init_qr_render_queue
+    init_qr_render_queue(app)
+
     # Import models to ensure they are registered
     from app.models import (
         Role, User, EventCategory, Venue, Event, 
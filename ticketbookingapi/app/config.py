@@ -66,8 +66,103 @@ class Config:
     REDIS_REFRESH_TOKEN_PREFIX = f"{REDIS_KEY_PREFIX}refresh_token:"
     REDIS_BLACKLIST_PREFIX = f"{REDIS_KEY_PREFIX}blacklist:"
     REDIS_SEAT_RESERVATION_PREFIX = f"{REDIS_KEY_PREFIX}seat_reservation:"
+    # Secondary indexes over seat holds (sorted sets scored by expiry)
+    REDIS_SEAT_HOLDS_USER_PREFIX = f"{REDIS_KEY_PREFIX}seat_holds:user:"
+    REDIS_SEAT_HOLDS_EVENT_PREFIX = f"{REDIS_KEY_PREFIX}seat_holds:event:"
+    REDIS_SEAT_HOLDS_ACTIVE_EVENTS_KEY = f"{REDIS_KEY_PREFIX}seat_holds:active_events"
+    REDIS_SEAT_STATE_DIRTY_KEY = f"{REDIS_KEY_PREFIX}seat_state:dirty"
+    REDIS_SEAT_LAYOUT_PREFIX = f"{REDIS_KEY_PREFIX}seat_layout:"
+    REDIS_SEAT_STATUS_PREFIX = f"{REDIS_KEY_PREFIX}seat_status:"
+    REDIS_SEAT_STATE_LOG_PREFIX = f"{REDIS_KEY_PREFIX}seat_state:log:"
+    REDIS_QR_CACHE_PREFIX = f"{REDIS_KEY_PREFIX}qr:"
+    REDIS_CODE_WORKER_PREFIX = f"{REDIS_KEY_PREFIX}code_worker:"
+    REDIS_INVENTORY_PREFIX = f"{REDIS_KEY_PREFIX}inventory:"
+    REDIS_INVENTORY_DIRTY_KEY = f"{REDIS_KEY_PREFIX}inventory:dirty"
+    REDIS_DISCOUNT_USES_PREFIX = f"{REDIS_KEY_PREFIX}discount:uses:"
+    REDIS_DISCOUNT_ORDERS_KEY = f"{REDIS_KEY_PREFIX}discount:orders"
+    REDIS_DISCOUNT_VERSION_KEY = f"{REDIS_KEY_PREFIX}discount:version"
+    REDIS_EVENT_LIST_PREFIX = f"{REDIS_KEY_PREFIX}event_list:"
     REDIS_PASSWORD_RESET_TOKEN_PREFIX = f"{REDIS_KEY_PREFIX}password_reset_token:"
     
+    # Seat release pipeline (Redis expired-key events + periodic reconciliation)
+    SEAT_RELEASE_LISTENER_ENABLED = os.getenv('SEAT_RELEASE_LISTENER_ENABLED', 'True').lower() == 'true'
+    SEAT_RELEASE_RECONCILE_SECONDS = int(os.getenv('SEAT_RELEASE_RECONCILE_SECONDS', 30))
+    
+    # Seat state write-behind: RESERVED lives only in Redis, MySQL is reconciled
+    # in the background and only BOOKED is written through
+    SEAT_STATE_WRITE_BEHIND = os.getenv('SEAT_STATE_WRITE_BEHIND', 'False').lower() == 'true'
+    SEAT_STATE_FLUSH_SECONDS = float(os.getenv('SEAT_STATE_FLUSH_SECONDS', 5))
+    SEAT_STATE_FLUSH_BATCH_SIZE = int(os.getenv('SEAT_STATE_FLUSH_BATCH_SIZE', 1000))
+    
+    # Cached static seat layouts (invalidated when seats are (re)assigned)
+    SEAT_LAYOUT_CACHE_TTL = int(os.getenv('SEAT_LAYOUT_CACHE_TTL', 24 * 60 * 60))
+    
+    # Seat state versions: change log entries kept per event for ?since= diffs
+    SEAT_STATE_LOG_SIZE = int(os.getenv('SEAT_STATE_LOG_SIZE', 5000))
+    
+    # Socket.IO seat broadcasts are coalesced per room
+    SOCKETIO_BROADCAST_FLUSH_MS = int(os.getenv('SOCKETIO_BROADCAST_FLUSH_MS', 100))
+    SOCKETIO_BROADCAST_MAX_BATCH = int(os.getenv('SOCKETIO_BROADCAST_MAX_BATCH', 500))
+    
+    # Socket.IO horizontal scaling: room broadcasts are relayed between API
+    # processes through this pub/sub queue (e.g. redis://host:6379/0); unset
+    # runs a single process
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', f"{REDIS_KEY_PREFIX}socketio")
+    # Websocket-only transport needs no sticky sessions at the load balancer
+    SOCKETIO_WEBSOCKET_ONLY = os.getenv('SOCKETIO_WEBSOCKET_ONLY', 'False').lower() == 'true'
+    # Real-time runtime: 'threading' (Werkzeug, development), or 'eventlet' /
+    # 'gevent' to hold tens of thousands of idle websockets per process
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    SOCKETIO_PING_INTERVAL = int(os.getenv('SOCKETIO_PING_INTERVAL', 25))
+    SOCKETIO_PING_TIMEOUT = int(os.getenv('SOCKETIO_PING_TIMEOUT', 20))
+    
+    # Ticket QR codes are rendered off the checkout path by a worker pool
+    QR_RENDER_WORKERS = int(os.getenv('QR_RENDER_WORKERS', 2))
+    QR_RENDER_BATCH_SIZE = int(os.getenv('QR_RENDER_BATCH_SIZE', 100))
+    
+    # On-demand ticket QR images (/tickets/<code>/qr.png): in-process LRU,
+    # shared through Redis when available
+    QR_ERROR_CORRECTION = os.getenv('QR_ERROR_CORRECTION', 'M')
+    QR_CACHE_MAX_ITEMS = int(os.getenv('QR_CACHE_MAX_ITEMS', 5000))
+    QR_CACHE_MAX_BYTES = int(os.getenv('QR_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    QR_CACHE_TTL = int(os.getenv('QR_CACHE_TTL', 7 * 24 * 60 * 60))
+    
+    # General-admission inventory: Redis counters per ticket type, sold counts
+    # reconciled back to MySQL in batches
+    INVENTORY_RECONCILE_SECONDS = float(os.getenv('INVENTORY_RECONCILE_SECONDS', 5))
+    INVENTORY_RECONCILE_BATCH_SIZE = int(os.getenv('INVENTORY_RECONCILE_BATCH_SIZE', 500))
+    
+    # Discount catalog (codes indexed in process) refresh interval; any
+    # discount write also refreshes it in every process
+    DISCOUNT_CACHE_TTL = int(os.getenv('DISCOUNT_CACHE_TTL', 60))
+    
+    # Order/ticket/payment codes: Snowflake IDs, one worker id per process.
+    # Set CODE_GENERATOR_WORKER_ID (0-1023) per process, or leave it unset to
+    # lease one from Redis
+    CODE_GENERATOR_WORKER_ID = int(os.getenv('CODE_GENERATOR_WORKER_ID')) if os.getenv('CODE_GENERATOR_WORKER_ID') else None
+    CODE_GENERATOR_LEASE_SECONDS = int(os.getenv('CODE_GENERATOR_LEASE_SECONDS', 300))
+    
+    # Public event listing cache (in process + Redis), refreshed on every
+    # organizer/admin event write; sold counts are as fresh as the TTL
+    EVENT_LIST_CACHE_TTL = int(os.getenv('EVENT_LIST_CACHE_TTL', 60))
+    EVENT_LIST_CACHE_LOCAL_TTL = float(os.getenv('EVENT_LIST_CACHE_LOCAL_TTL', 5))
+    EVENT_LIST_CACHE_MAX_ITEMS = int(os.getenv('EVENT_LIST_CACHE_MAX_ITEMS', 512))
+
+    # Event card read model: groups whose next showtime has started are
+    # moved on to their following showtime at this interval
+    EVENT_CARD_REFRESH_SECONDS = float(os.getenv('EVENT_CARD_REFRESH_SECONDS', 60))
+
+    # Event search index (in process): event card changes made by other
+    # processes are picked up at this interval
+    SEARCH_INDEX_SYNC_SECONDS = float(os.getenv('SEARCH_INDEX_SYNC_SECONDS', 5))
+
+    # Expired PENDING orders are cancelled by a background sweeper in chunks
+    # of one short transaction each
+    ORDER_PENDING_TIMEOUT_MINUTES = int(os.getenv('ORDER_PENDING_TIMEOUT_MINUTES', 15))
+    ORDER_SWEEP_SECONDS = float(os.getenv('ORDER_SWEEP_SECONDS', 30))
+    ORDER_SWEEP_BATCH_SIZE = int(os.getenv('ORDER_SWEEP_BATCH_SIZE', 200))
+
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(basedir, os.getenv('UPLOAD_FOLDER', 'uploads'))
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
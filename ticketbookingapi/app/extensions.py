@@ -6,7 +6,7 @@ from typing import Optional
 
 db = SQLAlchemy()
 migrate = Migrate()
-socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO()  # configured in create_app() via get_socketio_options()
 redis_client: Optional[redis.Redis] = None
 
 
@@ -47,6 +47,33 @@ def init_redis(app) -> Optional[redis.Redis]:
         return None
 
 
+def get_socketio_options(message_queue: Optional[str] = None) -> dict:
+    """
+    Socket.IO server options from the configuration
+    
+    Args:
+        message_queue: Override for Config.SOCKETIO_MESSAGE_QUEUE
+        
+    Returns:
+        Keyword arguments for SocketIO() / socketio.init_app()
+    """
+    from app.config import Config
+    
+    options = {
+        'cors_allowed_origins': "*",
+        'async_mode': Config.SOCKETIO_ASYNC_MODE,
+        'ping_interval': Config.SOCKETIO_PING_INTERVAL,
+        'ping_timeout': Config.SOCKETIO_PING_TIMEOUT
+    }
+    message_queue = message_queue or Config.SOCKETIO_MESSAGE_QUEUE
+    if message_queue:
+        options['message_queue'] = message_queue
+        options['channel'] = Config.SOCKETIO_CHANNEL
+    if Config.SOCKETIO_WEBSOCKET_ONLY:
+        options['transports'] = ['websocket']
+    return options
+
+
 def get_redis() -> Optional[redis.Redis]:
     """Get Redis client instance"""
     return redis_client
@@ -8,10 +8,12 @@ from app.models.order import Order
 from app.models.payment import Payment
 from app.models.ticket import Ticket
 from app.models.discount import Discount
+from app.models.discount_redemption import DiscountRedemption
 from app.models.banner import Banner
 from app.models.organizer_info import OrganizerInfo
 from app.models.favorite_event import FavoriteEvent
 from app.models.advertisement import Advertisement
+from app.models.event_card import EventCard
 # Note: RefreshToken model removed - using Redis instead
 
 __all__ = [
@@ -25,8 +27,10 @@ __all__ = [
     'Payment',
     'Ticket',
     'Discount',
+    'DiscountRedemption',
     'Banner',
     'OrganizerInfo',
     'FavoriteEvent',
     'Advertisement',
+    'EventCard',
 ]
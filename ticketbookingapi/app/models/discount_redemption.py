@@ -0,0 +1,12 @@
+from app.extensions import db
+from app.utils.datetime_utils import now_gmt7
+
+class DiscountRedemption(db.Model):
+    """Discount use of an order: RESERVED at checkout, then COMMITTED (paid) or RELEASED"""
+    __tablename__ = "DiscountRedemption"
+
+    order_id = db.Column(db.BigInteger, db.ForeignKey('Order.order_id'), primary_key=True)
+    discount_id = db.Column(db.BigInteger, db.ForeignKey('Discount.discount_id'), nullable=False, index=True)
+    status = db.Column(db.Enum('RESERVED', 'COMMITTED', 'RELEASED'), nullable=False, default='RESERVED')
+    created_at = db.Column(db.DateTime, default=now_gmt7)
+    updated_at = db.Column(db.DateTime, default=now_gmt7, onupdate=now_gmt7)
@@ -0,0 +1,49 @@
+from app.extensions import db
+from app.utils.datetime_utils import now_gmt7
+
+class EventCard(db.Model):
+    """
+    Catalog read model: one row per showtime group (the group_id, or the
+    event id of a single showtime) built from its PUBLISHED showtimes at
+    active venues. Maintained by EventCardService, never edited directly.
+    """
+    __tablename__ = "EventCard"
+
+    group_key = db.Column(db.String(100), primary_key=True)
+    # Representative showtime: the next upcoming one, else the first one
+    event_id = db.Column(db.BigInteger, nullable=False, index=True)
+    category_id = db.Column(db.BigInteger, nullable=True)
+    venue_id = db.Column(db.BigInteger, nullable=False, index=True)
+    venue_city = db.Column(db.String(100), nullable=True, index=True)
+    min_price = db.Column(db.Numeric(15, 2), nullable=True, index=True)  # Active ticket types only
+    max_price = db.Column(db.Numeric(15, 2), nullable=True)
+    start_datetime = db.Column(db.DateTime, nullable=False)  # Of the representative
+    next_start_datetime = db.Column(db.DateTime, nullable=True)  # NULL once every showtime started
+    showtime_count = db.Column(db.Integer, nullable=False, default=1)
+    total_capacity = db.Column(db.Integer, nullable=False, default=0)
+    available_tickets = db.Column(db.Integer, nullable=False, default=0)
+    is_featured = db.Column(db.Boolean, nullable=False, default=False)  # Any showtime featured
+    popularity_score = db.Column(db.Integer, nullable=False, default=0)  # Tickets sold over the group
+    created_at = db.Column(db.DateTime, nullable=False)  # Of the representative
+    refreshed_at = db.Column(db.DateTime, default=now_gmt7)
+
+    __table_args__ = (
+        db.Index('idx_event_card_category_next', 'category_id', 'next_start_datetime'),
+        # Keyset pagination: one index per listing sort, ending with group_key
+        db.Index('idx_event_card_ranking', 'is_featured', 'popularity_score', 'created_at', 'group_key'),
+        db.Index('idx_event_card_upcoming', 'next_start_datetime', 'group_key'),
+        db.Index('idx_event_card_newest', 'created_at', 'group_key'),
+        db.Index('idx_event_card_popular', 'popularity_score', 'group_key'),
+    )
+
+    def to_dict(self):
+        return {
+            'group_key': self.group_key,
+            'event_id': self.event_id,
+            'min_price': float(self.min_price) if self.min_price is not None else None,
+            'max_price': float(self.max_price) if self.max_price is not None else None,
+            'next_start_datetime': self.next_start_datetime.isoformat() if self.next_start_datetime else None,
+            'showtime_count': self.showtime_count,
+            'available_tickets': self.available_tickets,
+            'popularity_score': self.popularity_score
+        }
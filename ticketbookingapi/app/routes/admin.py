@@ -11,6 +11,7 @@ from app.decorators.auth import optional_auth
 from sqlalchemy import func
 from datetime import datetime, timedelta
 from app.utils.datetime_utils import now_gmt7
+from app.services.event_card_service import EventCardService
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -252,6 +253,7 @@ def update_event_status(event_id):
         # Lưu ý: Ở đây có thể thêm logic gửi thông báo cho Organizer nếu bị từ chối
         
         db.session.commit()
+        EventCardService.refresh_events([event_id])
         
         return jsonify({
             'success': True, 
@@ -276,8 +278,10 @@ def admin_delete_event(event_id):
                 'message': 'Không thể xóa sự kiện đã có vé được bán'
             }), 400
             
+        group_key = EventCardService.group_key(event.event_id, event.group_id)
         db.session.delete(event)
         db.session.commit()
+        EventCardService.refresh_groups([group_key])
         
         return jsonify({
             'success': True,
@@ -439,6 +443,8 @@ def admin_update_venue_status(venue_id):
             venue.status = new_status
             
         db.session.commit()
+        # Listings only show events at ACTIVE venues
+        EventCardService.refresh_venue(venue_id)
         return jsonify({
             'success': True,
             'message': f'Đã cập nhật trạng thái địa điểm thành {venue.status}',
@@ -455,6 +461,8 @@ def process_order_cancellation(order_id):
         from app.models.ticket import Ticket
         from app.models.ticket_type import TicketType
         from app.models.seat import Seat
+        from app.utils.seat_state_log import record_seat_changes_on_commit
+        from app.services.inventory_service import InventoryService
         
         data = request.get_json()
         action = data.get('action') # 'approve' or 'reject'
@@ -469,6 +477,7 @@ def process_order_cancellation(order_id):
         if action == 'approve':
             # 1. Cập nhật trạng thái các vé và giải phóng ghế
             tickets = Ticket.query.filter_by(order_id=order_id).all()
+            released_seat_ids = []
             for ticket in tickets:
                 ticket.ticket_status = 'CANCELLED'
                 
@@ -477,16 +486,12 @@ def process_order_cancellation(order_id):
                     seat = Seat.query.get(ticket.seat_id)
                     if seat:
                         seat.status = 'AVAILABLE'
-                
-                # Update sold quantity
-                ticket_type = TicketType.query.get(ticket.ticket_type_id)
-                if ticket_type:
-                    ticket_type.sold_quantity -= 1
-                    
-                    # Update event sold tickets
-                    event = Event.query.get(ticket_type.event_id)
-                    if event:
-                        event.sold_tickets -= 1
+                        released_seat_ids.append(seat.seat_id)
+            
+            record_seat_changes_on_commit(released_seat_ids, 'AVAILABLE')
+            # Sold counts are reconciled after commit; GA tickets go back on sale
+            InventoryService.release_tickets_on_commit(tickets)
+            InventoryService.reconcile_sold_on_commit({ticket.ticket_type_id for ticket in tickets})
             
             # 2. Cập nhật trạng thái đơn hàng
             order.order_status = 'REFUNDED'
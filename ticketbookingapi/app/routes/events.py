@@ -2,25 +2,35 @@ from flask import Blueprint, jsonify, request
 from app.extensions import db
 from app.models.event import Event
 from app.models.event_category import EventCategory
-from app.models.venue import Venue
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_
 from datetime import datetime
 from app.utils.datetime_utils import now_gmt7, parse_to_gmt7
+from app.utils.event_list_cache import get_event_list_cache
+from app.services.event_service import EventService
+from app.services.event_card_service import EventCardService
+from app.services.event_search_service import EventSearchService
+from app.utils.event_serializer import serialize_events
+from app.utils.pagination import parse_limit
 
 events_bp = Blueprint("events", __name__)
 
 @events_bp.route("/events", methods=["GET"])
 def get_events():
-    """Get all events with optional filters"""
+    """Get all events with optional filters (?limit=&offset=, or ?cursor= for infinite scroll; ?total=exact|approx|none)"""
     try:
         # Get query parameters
         category_id = request.args.get('category_id', type=int)
         status = request.args.get('status', 'PUBLISHED')
         is_featured = request.args.get('is_featured', type=lambda x: x.lower() == 'true')
-        limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = parse_limit(request.args.get('limit', type=int))
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        cursor = request.args.get('cursor') or None
+        total_mode = request.args.get('total', 'exact')
         sort = request.args.get('sort')
         
+        if total_mode not in ('exact', 'approx', 'none'):
+            raise ValueError("total must be 'exact', 'approx' or 'none'")
+        
         # New filter parameters
         venue_id = request.args.get('venue_id', type=int)
         date_from = request.args.get('date_from')
@@ -28,110 +38,57 @@ def get_events():
         min_price = request.args.get('min_price', type=float)
         max_price = request.args.get('max_price', type=float)
         
-        # Build query
-        # We join with Venue to ensure we only show events at ACTIVE venues
-        # Also join with TicketType to filter by price
-        query = db.session.query(Event).join(Venue, Event.venue_id == Venue.venue_id).filter(
-            Venue.status == 'ACTIVE',
-            Venue.is_active == True
-        )
-        
-        if category_id:
-            query = query.filter(Event.category_id == category_id)
-        
-        if status:
-            query = query.filter(Event.status == status)
-        
-        if is_featured is not None:
-            query = query.filter(Event.is_featured == is_featured)
-        
-        if venue_id:
-            query = query.filter(Event.venue_id == venue_id)
-        
-        # Date filters (GMT+7)
-        if date_from:
-            date_from_obj = parse_to_gmt7(date_from)
-            if date_from_obj:
-                query = query.filter(Event.start_datetime >= date_from_obj)
-        
-        if date_to:
-            date_to_obj = parse_to_gmt7(date_to)
-            if date_to_obj:
-                query = query.filter(Event.start_datetime <= date_to_obj)
-        
-        # Price filters - use subquery in WHERE clause
-        if min_price is not None or max_price is not None:
-            from app.models.ticket_type import TicketType
-            # Subquery to get min price per event
-            price_subq = db.session.query(
-                TicketType.event_id,
-                func.min(TicketType.price).label('min_price')
-            ).filter(
-                TicketType.is_active == True
-            ).group_by(TicketType.event_id).subquery()
-            
-            # Use EXISTS or IN to filter events by price range
-            if min_price is not None and max_price is not None:
-                query = query.filter(
-                    Event.event_id.in_(
-                        db.session.query(price_subq.c.event_id).filter(
-                            price_subq.c.min_price >= min_price,
-                            price_subq.c.min_price <= max_price
-                        )
-                    )
-                )
-            elif min_price is not None:
-                query = query.filter(
-                    Event.event_id.in_(
-                        db.session.query(price_subq.c.event_id).filter(
-                            price_subq.c.min_price >= min_price
-                        )
-                    )
-                )
-            elif max_price is not None:
-                query = query.filter(
-                    Event.event_id.in_(
-                        db.session.query(price_subq.c.event_id).filter(
-                            price_subq.c.min_price <= max_price
-                        )
-                    )
-                )
-        
-        # Add basic filters (e.g. upcoming) if needed before grouping
-        if sort == 'upcoming':
-            query = query.filter(Event.start_datetime >= now_gmt7())
-
-        # Group showtimes: Only show one record per group_id among events that matched the filters
-        # Using coalesce(group_id, event_id_as_string) to create a unique identifier for grouping
-        # CAST is necessary because event_id is int and group_id is string
-        # We use query.with_entities() on the filtered query to get the min ID per group
-        subq = query.with_entities(func.min(Event.event_id)).group_by(
-            func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
+        # Normalized filter set (dates as GMT+7 ISO strings): equal filters
+        # share one cache entry
+        date_from_obj = parse_to_gmt7(date_from) if date_from else None
+        date_to_obj = parse_to_gmt7(date_to) if date_to else None
+        filters = {
+            'category_id': category_id,
+            'status': status,
+            'is_featured': is_featured,
+            'venue_id': venue_id,
+            'date_from': date_from_obj.isoformat() if date_from_obj else None,
+            'date_to': date_to_obj.isoformat() if date_to_obj else None,
+            'min_price': min_price,
+            'max_price': max_price,
+            'sort': sort
+        }
+        page = {
+            'limit': limit,
+            'offset': 0 if cursor else offset,
+            'cursor': cursor,
+            'with_total': total_mode == 'exact'
+        }
+        
+        cache = get_event_list_cache()
+        result = cache.get_or_build(
+            {**filters, **page}, lambda: EventService.list_events(**filters, **page)
         )
-        query = query.filter(Event.event_id.in_(subq))
-
-        # Apply sorting ONLY to the final query
-        if sort == 'upcoming':
-            query = query.order_by(Event.start_datetime.asc())
-        elif sort == 'newest':
-            query = query.order_by(Event.created_at.desc())
-        elif sort == 'popular':
-            query = query.order_by(Event.sold_tickets.desc())
-        else:
-            query = query.order_by(Event.is_featured.desc(), Event.sold_tickets.desc(), Event.created_at.desc())
-        
-        # Pagination
-        total = query.count()
-        events = query.limit(limit).offset(offset).all()
+        total = result['total']
+        if total_mode == 'approx':
+            # Counted once per filter set, then served from the listing
+            # cache until it expires or an event write invalidates it
+            total = cache.get_or_build(
+                {**filters, 'count': True}, lambda: {'total': EventService.count_events(**filters)}
+            )['total']
         
         return jsonify({
             'success': True,
-            'data': [event.to_dict(include_details=True) for event in events],
+            'data': result['data'],
             'total': total,
             'limit': limit,
-            'offset': offset
+            'offset': page['offset'],
+            'pagination': {
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more']
+            }
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         print(f"Error in get_events: {str(e)}")
         return jsonify({
@@ -152,7 +109,7 @@ def get_event(event_id):
             }), 404
         
         # DB is source of truth; model already exposes `qr_image_url`.
-        event_data = event.to_dict(include_details=True)
+        event_data = serialize_events([event], 'detail')[0]
         
         # If part of a group, fetch siblings for schedule
         if event.group_id:
@@ -193,22 +150,10 @@ def get_featured_events():
     try:
         limit = request.args.get('limit', 10, type=int)
         
-        query = db.session.query(Event).join(Venue, Event.venue_id == Venue.venue_id).filter(
-            Event.is_featured == True,
-            Event.status == 'PUBLISHED',
-            Venue.status == 'ACTIVE',
-            Venue.is_active == True
-        )
-        
-        # Group showtimes
-        subq = query.with_entities(func.min(Event.event_id)).group_by(
-            func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
-        )
-        events = query.filter(Event.event_id.in_(subq)).order_by(Event.created_at.desc()).limit(limit).all()
-        
+        # One card per showtime group, from the event card read model
         return jsonify({
             'success': True,
-            'data': [event.to_dict(include_details=True) for event in events]
+            'data': EventCardService.get_featured(limit)
         }), 200
         
     except Exception as e:
@@ -220,10 +165,11 @@ def get_featured_events():
 
 @events_bp.route("/events/search", methods=["GET"])
 def search_events():
-    """Search events by name or description"""
+    """Search events by name, description, venue, city or category (accents optional)"""
     try:
-        query_text = request.args.get('q', '')
-        limit = request.args.get('limit', 20, type=int)
+        query_text = request.args.get('q', '').strip()
+        limit = parse_limit(request.args.get('limit', type=int))
+        offset = max(request.args.get('offset', 0, type=int), 0)
         
         if not query_text:
             return jsonify({
@@ -231,25 +177,9 @@ def search_events():
                 'message': 'Search query is required'
             }), 400
         
-        query = db.session.query(Event).join(Venue, Event.venue_id == Venue.venue_id).filter(
-            or_(
-                Event.event_name.like(f'%{query_text}%'),
-                Event.description.like(f'%{query_text}%')
-            ),
-            Event.status == 'PUBLISHED',
-            Venue.status == 'ACTIVE',
-            Venue.is_active == True
-        )
-        
-        # Group showtimes
-        subq = query.with_entities(func.min(Event.event_id)).group_by(
-            func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
-        )
-        events = query.filter(Event.event_id.in_(subq)).limit(limit).all()
-        
         return jsonify({
             'success': True,
-            'data': [event.to_dict(include_details=True) for event in events]
+            'data': EventSearchService.search(query_text, limit, offset)
         }), 200
         
     except Exception as e:
@@ -1,4 +1,8 @@
 from flask import Blueprint, jsonify
+from app.utils.broadcast_coalescer import get_broadcast_coalescer
+from app.services.order_sweeper_service import OrderSweeperService
+from app.utils.event_list_cache import get_event_list_cache
+from app.utils.event_search_index import get_event_search_index
 
 health_bp = Blueprint("health", __name__)
 
@@ -9,3 +13,36 @@ def health_check():
         "status": "ok",
         "message": "API is running"
     })
+
+@health_bp.route("/health/realtime", methods=["GET"])
+def realtime_metrics():
+    """Socket.IO broadcast coalescing metrics"""
+    coalescer = get_broadcast_coalescer()
+    return jsonify({
+        "status": "ok",
+        "broadcasts": coalescer.get_metrics() if coalescer else None
+    })
+
+@health_bp.route("/health/order-sweeper", methods=["GET"])
+def order_sweeper_metrics():
+    """Expired order sweeper throughput metrics"""
+    return jsonify({
+        "status": "ok",
+        "order_sweeper": OrderSweeperService.get_metrics()
+    })
+
+@health_bp.route("/health/event-cache", methods=["GET"])
+def event_cache_metrics():
+    """Event listing cache hit ratio and rebuild latency"""
+    return jsonify({
+        "status": "ok",
+        "event_list_cache": get_event_list_cache().get_metrics()
+    })
+
+@health_bp.route("/health/search", methods=["GET"])
+def search_index_metrics():
+    """Event search index size, freshness and query latency"""
+    return jsonify({
+        "status": "ok",
+        "search_index": get_event_search_index().get_metrics()
+    })
@@ -1,7 +1,13 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, g, jsonify, request, make_response
+from app.config import Config
 from app.extensions import db
 from app.services.order_service import OrderService
+from app.models.order import Order
+from app.models.ticket import Ticket
 from app.models.ticket_type import TicketType
+from app.exceptions import APIException
+from app.decorators.auth import require_auth
+from app.utils.qr_cache import CONTENT_TYPES, get_qr_image_cache
 
 orders_bp = Blueprint("orders", __name__)
 
@@ -25,6 +31,10 @@ def create_order():
             }
         }), 201
         
+    except APIException as e:
+        db.session.rollback()
+        # e.g. seat conflicts: 'seat_errors' lists every unavailable seat
+        return jsonify({'success': False, 'message': e.message, **e.payload}), e.status_code
     except ValueError as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -60,10 +70,21 @@ def get_order_by_code(order_code):
 
 @orders_bp.route("/orders/user/<int:user_id>", methods=["GET"])
 def get_user_orders(user_id):
-    """Get all orders for a user with full details"""
+    """Get a user's orders with full details (cursor paginated with ?cursor=&limit=, all orders without)"""
     try:
-        data = OrderService.get_user_orders(user_id)
-        return jsonify({'success': True, 'data': data}), 200
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        data, next_cursor = OrderService.get_user_orders(user_id, cursor, limit)
+        return jsonify({
+            'success': True,
+            'data': data,
+            'pagination': {
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -118,10 +139,61 @@ def cancel_refund_request(order_id):
 
 @orders_bp.route("/tickets/user/<int:user_id>", methods=["GET"])
 def get_user_tickets(user_id):
-    """Get all tickets for a user (for MyTickets page)"""
+    """Get a user's tickets (MyTickets page), ?when=upcoming|past; cursor paginated with ?cursor=&limit=, all tickets without"""
     try:
-        data = OrderService.get_user_tickets_details(user_id)
-        return jsonify({'success': True, 'data': data}), 200
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        when = request.args.get('when')
+        data, next_cursor = OrderService.get_user_tickets_details(user_id, cursor, limit, when)
+        return jsonify({
+            'success': True,
+            'data': data,
+            'pagination': {
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@orders_bp.route("/tickets/<string:ticket_code>/qr.<string:fmt>", methods=["GET"])
+@require_auth
+def get_ticket_qr(ticket_code, fmt):
+    """
+    Ticket QR code as PNG (`qr.png`) or SVG (`qr.svg`), for the ticket owner
+    
+    Rendered on demand from the ticket code and cached server side. The
+    ticket is checked (owned by the caller, not cancelled or refunded) on
+    every request; browsers may keep the image but must revalidate it (the
+    ETag makes that a 304), and shared caches must not store it.
+    """
+    try:
+        if fmt not in CONTENT_TYPES:
+            return jsonify({'success': False, 'message': 'Unsupported QR format'}), 404
+        
+        owned = db.session.query(Ticket.ticket_id).join(
+            Order, Order.order_id == Ticket.order_id
+        ).filter(
+            Ticket.ticket_code == ticket_code,
+            Ticket.ticket_status.in_(['ACTIVE', 'USED']),
+            Order.user_id == g.user_id
+        ).first()
+        if owned is None:
+            return jsonify({'success': False, 'message': 'Ticket not found'}), 404
+        
+        qr_cache = get_qr_image_cache()
+        etag = qr_cache.etag(ticket_code, fmt)
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            image, etag = qr_cache.get_or_render(ticket_code, fmt)
+            response = make_response(image, 200)
+            response.headers['Content-Type'] = CONTENT_TYPES[fmt]
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -136,9 +208,15 @@ def check_discount():
         if not code or not items:
              return jsonify({'success': False, 'message': 'Missing data'}), 400
              
+        ticket_types = {
+            tt.ticket_type_id: tt
+            for tt in TicketType.query.filter(
+                TicketType.ticket_type_id.in_([it.get('ticket_type_id') for it in items])
+            ).all()
+        }
         detailed_items = []
         for it in items:
-            tt = TicketType.query.get(it.get('ticket_type_id'))
+            tt = ticket_types.get(it.get('ticket_type_id'))
             if tt:
                 detailed_items.append({
                     'ticket_type': tt,
@@ -191,7 +269,7 @@ def cleanup_expired_orders():
     """Cleanup expired pending orders and release reserved seats (system/admin endpoint)"""
     try:
         data = request.get_json() or {}
-        older_than_minutes = data.get('older_than_minutes', 15)
+        older_than_minutes = data.get('older_than_minutes', Config.ORDER_PENDING_TIMEOUT_MINUTES)
         
         cancelled_count, released_seats_count = OrderService.cleanup_expired_pending_orders(
             older_than_minutes=older_than_minutes
@@ -5,11 +5,10 @@ from app.models.payment import Payment
 from app.services.order_service import OrderService
 from datetime import datetime
 from app.utils.datetime_utils import now_gmt7
+from app.utils.code_generator import generate_code
 import hashlib
 import hmac
 import urllib.parse
-import random
-import string
 import requests
 import base64
 
@@ -36,10 +35,8 @@ VIETQR_RETURN_URL = "http://localhost:5173/payment/vietqr-return"
 VIETQR_RETURN_URL = "http://localhost:5173/payment/vietqr-return"
 
 def generate_payment_code():
-    """Generate unique payment code"""
-    timestamp = now_gmt7().strftime('%Y%m%d%H%M%S')
-    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"PAY-{timestamp}-{random_str}"
+    """Generate unique payment code (Snowflake ID, e.g. PAY-0F4QZ8XK2M000)"""
+    return generate_code('PAY')
 
 def get_paypal_access_token():
     """Get PayPal OAuth access token"""
@@ -1,12 +1,15 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, make_response, request
+from app.config import Config
 from app.extensions import db
 from app.models.seat import Seat
 from app.models.ticket_type import TicketType
 from app.models.event import Event
 from app.models.user import User
 from app.utils.redis_reservation_manager import get_redis_reservation_manager
-from app.utils.datetime_utils import now_gmt7
-from datetime import datetime, timedelta
+from app.services.seat_hold_service import SeatHoldService, requested_seat_ids
+from app.services.seat_map_service import SeatMapService
+from app.utils.seat_state_log import get_seat_state_log
+from app.exceptions import APIException
 
 seats_bp = Blueprint("seats", __name__)
 
@@ -36,10 +39,47 @@ def get_seat(seat_id):
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _conditional_response(payload, etag):
+    """JSON response with a strong ETag; 304 when the client already has it"""
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = make_response(jsonify(payload), 200)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @seats_bp.route("/seats/event/<int:event_id>", methods=["GET"])
 def get_all_event_seats(event_id):
-    """Lấy toàn bộ danh sách ghế đã được gán của một sự kiện (cho tất cả hạng vé)"""
+    """
+    Lấy toàn bộ danh sách ghế đã được gán của một sự kiện (cho tất cả hạng vé)
+    
+    Supports If-None-Match (ETag = seat state version) and `?since=<version>`,
+    which returns only the seats whose status changed after that version
+    ('full': true with the whole map when the change log no longer covers it).
+    """
     try:
+        seat_state_log = get_seat_state_log()
+        since = request.args.get('since', type=int)
+        if since is not None:
+            diff = seat_state_log.get_changes_since(event_id, since)
+            if diff is not None:
+                return jsonify({
+                    'success': True,
+                    'version': diff['version'],
+                    'full': False,
+                    'data': [
+                        {'seat_id': seat_id, 'status': status}
+                        for seat_id, status in diff['changes'].items()
+                    ]
+                }), 200
+        
+        # Read the version before the seats so the ETag never runs ahead of the data
+        version = seat_state_log.get_version(event_id)
+        etag = f"seats-{event_id}-{version}"
+        if since is None and etag in request.if_none_match:
+            return _conditional_response(None, etag)
+        
         # Optimized query using only the fields we need
         # Include seat_id and status if needed for frontend logic
         seats = db.session.query(
@@ -53,8 +93,13 @@ def get_all_event_seats(event_id):
             Seat.status
         ).join(TicketType).filter(TicketType.event_id == event_id).all()
 
-        return jsonify({
+        # With write-behind the DB only knows BOOKED; live holds come from Redis
+        holds = SeatHoldService.get_live_holds(event_id) if Config.SEAT_STATE_WRITE_BEHIND else {}
+
+        return _conditional_response({
             'success': True,
+            'version': version,
+            'full': True,
             'data': [
                 {
                     'seat_id': s.seat_id,
@@ -64,16 +109,49 @@ def get_all_event_seats(event_id):
                     'area_name': s.area_name,
                     'x_pos': s.x_pos,
                     'y_pos': s.y_pos,
-                    'status': s.status
+                    'status': 'RESERVED' if s.seat_id in holds and s.status == 'AVAILABLE' else s.status
                 } for s in seats
             ]
-        }), 200
+        }, etag)
     except Exception as e:
         import traceback
         print(f"Error in get_all_event_seats: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@seats_bp.route("/seats/event/<int:event_id>/layout", methods=["GET"])
+def get_event_seat_layout(event_id):
+    """Static seat layout of an event (columnar, cached per event)"""
+    try:
+        layout = SeatMapService.get_layout(event_id)
+        return _conditional_response({
+            'success': True,
+            'data': layout
+        }, f"layout-{event_id}-{layout['layout_version']}")
+    except Exception as e:
+        print(f"Error in get_event_seat_layout: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@seats_bp.route("/seats/event/<int:event_id>/status", methods=["GET"])
+def get_event_seat_status(event_id):
+    """Seat status vector of an event (2 bits per seat, in layout order)"""
+    try:
+        version = get_seat_state_log().get_version(event_id)
+        layout_version = SeatMapService.get_layout(event_id)['layout_version']
+        etag = f"status-{event_id}-{layout_version}-{version}"
+        if etag in request.if_none_match:
+            return _conditional_response(None, etag)
+        
+        status_vector = SeatMapService.get_status_vector(event_id)
+        status_vector['version'] = version
+        return _conditional_response({
+            'success': True,
+            'data': status_vector
+        }, f"status-{event_id}-{status_vector['layout_version']}-{version}")
+    except Exception as e:
+        print(f"Error in get_event_seat_status: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @seats_bp.route("/seats/initialize-default", methods=["POST"])
 def initialize_default_seats():
     # ... (existing code but updated to handle quantity)
@@ -99,6 +177,7 @@ def initialize_default_seats():
         
         ticket_type.quantity = created_count
         db.session.commit()
+        SeatMapService.invalidate_layout(ticket_type.event_id)
         return jsonify({'success': True, 'message': f'Đã tạo thành công {created_count} ghế ngồi'}), 201
     except Exception as e:
         db.session.rollback()
@@ -161,6 +240,7 @@ def assign_seats_from_template():
             db.session.bulk_insert_mappings(Seat, seats_to_insert)
         
         db.session.commit()
+        SeatMapService.invalidate_layout(ticket_type.event_id)
         
         # 6. Đếm lại tổng số ghế hiện tại
         final_seat_count = Seat.query.filter_by(ticket_type_id=ticket_type_id).count()
@@ -188,146 +268,77 @@ def assign_seats_from_template():
 
 @seats_bp.route("/seats/lock", methods=["POST"])
 def lock_seat():
-    """Lock a seat for reservation (5 minutes)"""
+    """Lock one or more seats for reservation (5 minutes, all-or-nothing)"""
     try:
         data = request.get_json()
-        seat_id = data.get('seat_id')
+        seat_ids = requested_seat_ids(data)
         user_id = data.get('user_id')
         event_id = data.get('event_id')
         
-        if not all([seat_id, user_id, event_id]):
+        if not all([seat_ids, user_id, event_id]):
             return jsonify({'success': False, 'message': 'Missing required parameters'}), 400
         
-        reservation_manager = get_redis_reservation_manager()
-        if not reservation_manager:
-            return jsonify({'success': False, 'message': 'Reservation service unavailable'}), 503
-        
         # Validate user exists
         user = User.query.get(user_id)
         if not user:
-            import logging
-            logging.error(f"SeatReservation validation failed: User {user_id} not found")
             return jsonify({'success': False, 'message': f'User not found (user_id: {user_id})'}), 404
         
-        # Validate event exists
-        event = Event.query.get(event_id)
-        if not event:
-            import logging
-            logging.error(f"SeatReservation validation failed: Event {event_id} not found")
-            return jsonify({'success': False, 'message': f'Event not found (event_id: {event_id})'}), 404
-        
-        # Validate seat exists
-        seat = Seat.query.get(seat_id)
-        if not seat:
-            import logging
-            logging.error(f"SeatReservation validation failed: Seat {seat_id} not found")
-            return jsonify({'success': False, 'message': f'Seat not found (seat_id: {seat_id})'}), 404
-        
-        # Check for existing active reservation in Redis
-        existing_reservation = reservation_manager.get_reservation(seat_id)
-        
-        if existing_reservation:
-            # Check if expired
-            expires_at = datetime.fromisoformat(existing_reservation['expires_at'])
-            if expires_at < now_gmt7():
-                # Expired, clean up
-                seat.status = 'AVAILABLE'
-                reservation_manager.delete_reservation(seat_id)
-                db.session.commit()
-            elif existing_reservation.get('user_id') != user_id:
-                # Reserved by another user
-                return jsonify({'success': False, 'message': 'Seat is already reserved'}), 409
-            elif existing_reservation.get('user_id') == user_id:
-                # User already has this seat reserved
-                return jsonify({
-                    'success': True,
-                    'message': 'Seat already reserved by you',
-                    'data': {
-                        'seat_id': seat_id,
-                        'expires_at': existing_reservation['expires_at']
-                    }
-                }), 200
-        
-        # Check if seat is available
-        if seat.status != 'AVAILABLE' and seat.status != 'RESERVED':
-            return jsonify({'success': False, 'message': 'Seat is not available'}), 409
-        
-        # Create reservation in Redis
-        success = reservation_manager.create_reservation(
-            seat_id=seat_id,
-            user_id=user_id,
-            event_id=event_id,
-            duration_minutes=5
-        )
-        
-        if not success:
-            return jsonify({'success': False, 'message': 'Failed to create reservation'}), 500
-        
-        # Update seat status
-        seat.status = 'RESERVED'
-        db.session.commit()
-        
-        # Get reservation to get expires_at
-        reservation = reservation_manager.get_reservation(seat_id)
-        expires_at = reservation['expires_at'] if reservation else None
+        result = SeatHoldService.hold_seats(event_id, user_id, seat_ids, ttl=5 * 60)
+        held = result['held']
         
         return jsonify({
             'success': True,
-            'message': 'Seat reserved successfully',
+            'message': 'Seat reserved successfully' if result['new_seat_ids'] else 'Seat already reserved by you',
             'data': {
-                'seat_id': seat_id,
-                'expires_at': expires_at
+                'seat_id': held[0]['seat_id'],
+                'expires_at': held[0]['expires_at'],
+                'seats': [
+                    {'seat_id': r['seat_id'], 'expires_at': r['expires_at']}
+                    for r in held
+                ]
             }
         }), 200
         
+    except APIException as e:
+        return jsonify({'success': False, 'message': e.message, **e.payload}), e.status_code
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': f'Invalid parameters: {str(e)}'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @seats_bp.route("/seats/unlock", methods=["POST"])
 def unlock_seat():
-    """Unlock a seat reservation"""
+    """Unlock one or more seat reservations"""
     try:
         data = request.get_json()
-        seat_id = data.get('seat_id')
+        seat_ids = requested_seat_ids(data)
         user_id = data.get('user_id')
         event_id = data.get('event_id')
         
-        if not all([seat_id, user_id, event_id]):
+        if not all([seat_ids, user_id, event_id]):
             return jsonify({'success': False, 'message': 'Missing required parameters'}), 400
         
-        reservation_manager = get_redis_reservation_manager()
-        if not reservation_manager:
-            return jsonify({'success': False, 'message': 'Reservation service unavailable'}), 503
-        
         # Validate user exists
         user = User.query.get(user_id)
         if not user:
             return jsonify({'success': False, 'message': 'User not found'}), 404
         
-        # Validate seat exists
-        seat = Seat.query.get(seat_id)
-        if not seat:
-            return jsonify({'success': False, 'message': 'Seat not found'}), 404
+        released = SeatHoldService.release_seats(event_id, user_id, seat_ids)
         
-        # Find active reservation in Redis
-        reservation = reservation_manager.get_reservation(seat_id)
-        
-        if reservation and reservation.get('user_id') == user_id:
-            # Delete reservation from Redis
-            reservation_manager.delete_reservation(seat_id)
-            
-            # Update seat status
-            seat.status = 'AVAILABLE'
-            db.session.commit()
-            
+        if released:
             return jsonify({
                 'success': True,
-                'message': 'Seat unlocked successfully'
+                'message': 'Seat unlocked successfully',
+                'data': {'seat_ids': released}
             }), 200
         else:
             return jsonify({'success': False, 'message': 'No active reservation found'}), 404
         
+    except APIException as e:
+        return jsonify({'success': False, 'message': e.message, **e.payload}), e.status_code
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'message': f'Invalid parameters: {str(e)}'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -353,15 +364,13 @@ def get_my_reservations(event_id, user_id):
         # Get reservations from Redis
         reservations = reservation_manager.get_user_reservations(user_id, event_id)
         
-        # Clean up seats that don't have active reservations
-        for reservation in reservations:
-            seat_id = reservation.get('seat_id')
-            seat = Seat.query.get(seat_id)
-            if seat and seat.status != 'RESERVED':
-                # Update seat status if needed
-                seat.status = 'RESERVED'
-        
-        if reservations:
+        # Make sure seats with an active reservation are marked RESERVED
+        seat_ids = [r.get('seat_id') for r in reservations if r.get('seat_id')]
+        if seat_ids and not Config.SEAT_STATE_WRITE_BEHIND:
+            Seat.query.filter(
+                Seat.seat_id.in_(seat_ids),
+                Seat.status == 'AVAILABLE'
+            ).update({Seat.status: 'RESERVED'}, synchronize_session=False)
             db.session.commit()
         
         return jsonify({
@@ -398,20 +407,8 @@ def unlock_all_seats():
         if not event:
             return jsonify({'success': False, 'message': 'Event not found'}), 404
         
-        # Get all active reservations for this user in this event from Redis
-        reservations = reservation_manager.get_user_reservations(user_id, event_id)
-        
-        unlocked_count = 0
-        for reservation in reservations:
-            seat_id = reservation.get('seat_id')
-            seat = Seat.query.get(seat_id)
-            if seat:
-                seat.status = 'AVAILABLE'
-                # Delete reservation from Redis
-                reservation_manager.delete_reservation(seat_id)
-                unlocked_count += 1
-        
-        db.session.commit()
+        # Release all active holds for this user in this event in one batch
+        unlocked_count = len(SeatHoldService.release_user_seats(event_id, user_id))
         
         return jsonify({
             'success': True,
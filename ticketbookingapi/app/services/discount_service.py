@@ -0,0 +1,179 @@
+"""
+Discount engine
+Validates discount codes against the cached discount catalog (no query per
+lookup), checks manager-scoped codes with one prefetch of event ownership,
+and ties redemptions to the order lifecycle: reserved at checkout, committed
+on payment, given back on cancellation. Each order's redemption is recorded
+in DiscountRedemption (the source of truth for used_count); the redemption
+manager keeps the usage counters that enforce usage_limit.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, update
+
+from app.extensions import db
+from app.models.discount import Discount
+from app.models.discount_redemption import DiscountRedemption
+from app.models.event import Event
+from app.utils.datetime_utils import now_gmt7
+from app.utils.discount_catalog import get_discount_catalog
+from app.utils.discount_redemption_manager import (
+    commit_on_commit,
+    get_discount_redemption_manager,
+    release_on_commit,
+    track_reserved
+)
+
+USAGE_LIMIT_REACHED = "Mã giảm giá đã hết lượt sử dụng"
+
+
+class DiscountService:
+    @staticmethod
+    def validate_and_calculate(
+        discount_code: str,
+        items: List[Dict[str, Any]]
+    ) -> Tuple[bool, float, str, Optional[Any]]:
+        """
+        items: list of dict {'ticket_type': obj, 'quantity': int, 'price': float}
+        Returns: (is_valid, amount, message, discount snapshot)
+        """
+        discount = get_discount_catalog().get(discount_code)
+        if not discount:
+            # The catalog only holds active, unexpired codes: tell the
+            # customer why (rare path, one indexed lookup)
+            row = db.session.query(Discount.is_active).filter(Discount.discount_code == discount_code).first()
+            if not row:
+                return False, 0, "Mã giảm giá không tồn tại", None
+            if not row.is_active:
+                return False, 0, "Mã giảm giá đã bị khóa", None
+            return False, 0, "Mã giảm giá đã hết hạn", None
+
+        if not discount.is_active:
+            return False, 0, "Mã giảm giá đã bị khóa", None
+
+        if discount.end_date < now_gmt7():
+             return False, 0, "Mã giảm giá đã hết hạn", None
+
+        if discount.start_date > now_gmt7():
+             return False, 0, "Mã giảm giá chưa có hiệu lực", None
+
+        if discount.usage_limit and discount.usage_limit > 0:
+            if get_discount_redemption_manager().get_uses(discount) >= discount.usage_limit:
+                 return False, 0, USAGE_LIMIT_REACHED, None
+
+        # Manager-scoped codes: ownership of every event in the order at once
+        event_managers = {}
+        if not discount.event_id and discount.manager_id:
+            event_ids = {item['ticket_type'].event_id for item in items}
+            if event_ids:
+                event_managers = dict(
+                    db.session.query(Event.event_id, Event.manager_id).filter(Event.event_id.in_(event_ids)).all()
+                )
+
+        eligible_amount = 0
+        has_valid_item = False
+
+        for item in items:
+            tt = item['ticket_type']
+            is_applicable = False
+
+            # Check Event ID constraint
+            if discount.event_id:
+                 if tt.event_id == discount.event_id:
+                     is_applicable = True
+            # Check Manager ID constraint
+            elif discount.manager_id:
+                 if event_managers.get(tt.event_id) == discount.manager_id:
+                      is_applicable = True
+            else:
+                 is_applicable = True
+
+            if is_applicable:
+                eligible_amount += item['price'] * item['quantity']
+                has_valid_item = True
+
+        if not has_valid_item:
+            return False, 0, "Mã giảm giá không áp dụng cho đơn hàng này", None
+
+        if discount.min_order_amount and eligible_amount < discount.min_order_amount:
+             return False, 0, f"Đơn hàng chưa đạt giá trị tối thiểu {float(discount.min_order_amount):,.0f}đ", None
+
+        amount = 0
+        if discount.discount_type == 'PERCENTAGE':
+            amount = eligible_amount * (float(discount.discount_value) / 100)
+        else:
+            amount = float(discount.discount_value)
+
+        if discount.max_discount_amount and amount > float(discount.max_discount_amount):
+            amount = float(discount.max_discount_amount)
+
+        if amount > eligible_amount:
+            amount = eligible_amount
+
+        return True, amount, "Áp dụng thành công", discount
+
+    @staticmethod
+    def reserve_for_order(discount, order_id: int) -> None:
+        """
+        Reserve one use of a discount for a new order (atomic against
+        usage_limit); given back automatically if the order is not committed
+
+        Raises:
+            ValueError: if the usage limit was reached meanwhile
+        """
+        if not get_discount_redemption_manager().reserve(discount, order_id):
+            raise ValueError(USAGE_LIMIT_REACHED)
+        track_reserved(db.session, order_id)
+        db.session.add(DiscountRedemption(
+            order_id=order_id,
+            discount_id=discount.discount_id,
+            status='RESERVED'
+        ))
+
+    @staticmethod
+    def _settle(order_ids: Iterable[int], status: str) -> Dict[int, int]:
+        """
+        Move the RESERVED redemptions of some orders to `status`
+
+        Returns:
+            Dict of order_id -> discount_id for the redemptions moved (each
+            redemption is settled once, even if an order is processed twice)
+        """
+        order_ids = {int(order_id) for order_id in order_ids if order_id}
+        if not order_ids:
+            return {}
+        reserved = dict(
+            db.session.query(DiscountRedemption.order_id, DiscountRedemption.discount_id).filter(
+                DiscountRedemption.order_id.in_(order_ids),
+                DiscountRedemption.status == 'RESERVED'
+            ).with_for_update().all()
+        )
+        if reserved:
+            db.session.execute(
+                update(DiscountRedemption)
+                .where(DiscountRedemption.order_id.in_(list(reserved)))
+                .values(status=status, updated_at=now_gmt7())
+            )
+        return reserved
+
+    @classmethod
+    def commit_for_order(cls, order_id: int) -> None:
+        """Count the order's redemption in Discount.used_count (order paid)"""
+        settled = cls._settle([order_id], 'COMMITTED')
+        if not settled:
+            return
+        # Atomic increment, no read-modify-write of the row
+        db.session.execute(
+            update(Discount)
+            .where(Discount.discount_id == settled[int(order_id)])
+            .values(used_count=func.coalesce(Discount.used_count, 0) + 1)
+        )
+        commit_on_commit(db.session, order_id)
+
+    @classmethod
+    def release_for_orders(cls, order_ids: Iterable[int]) -> None:
+        """Give back the redemptions of cancelled/failed/expired orders once the transaction commits"""
+        settled = cls._settle(order_ids, 'RELEASED')
+        if settled:
+            release_on_commit(db.session, settled)
@@ -0,0 +1,420 @@
+"""
+Event card read model
+Maintains EventCard (one row per showtime group) and serves catalog browsing
+from it: listings, featured events and recommendations become indexed scans
+of EventCard instead of per-request MIN(price) / MIN(event_id) aggregation
+over Event and TicketType.
+
+Rows are recomputed per group, never patched:
+- organizer/admin writes refresh the groups they touch right after commit
+  (refresh_events / refresh_venue), then drop cached listings
+- sold count reconciliation refreshes the groups of the reconciled events
+- a periodic pass moves groups whose next showtime has started on to the
+  following one (refresh_due)
+- rebuild_all backfills or repairs the whole table
+  (scripts/rebuild_event_cards.py, run once after creating the table)
+Refreshed groups are also reindexed for search (EventSearchService).
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from app.extensions import db
+from app.models.event import Event
+from app.models.event_card import EventCard
+from app.models.ticket_type import TicketType
+from app.models.venue import Venue
+from app.utils.datetime_utils import now_gmt7
+from app.utils.event_list_cache import invalidate_event_listings
+from app.utils.event_search_index import mark_search_documents_stale
+from app.utils.event_serializer import serialize_events
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Groups recomputed per statement batch
+REFRESH_CHUNK_SIZE = 500
+
+
+def _chunks(values: List, size: int):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class EventCardService:
+    @staticmethod
+    def group_key(event_id: int, group_id: Optional[str]) -> str:
+        """Showtime group of an event: its group_id, or its own id when not grouped"""
+        return group_id or str(event_id)
+
+    @staticmethod
+    def _group_key_expr():
+        return func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
+
+    @classmethod
+    def _compute(cls, group_keys: List[str], now: datetime) -> Dict[str, Dict[str, Any]]:
+        """Card columns of the groups that still have a listable showtime"""
+        event_ids = [int(key) for key in group_keys if key.isdigit()]
+        group_ids = [key for key in group_keys if not key.isdigit()]
+        showtimes = db.session.query(
+            Event.event_id, Event.group_id, Event.category_id, Event.venue_id, Event.start_datetime,
+            Event.total_capacity, Event.sold_tickets, Event.is_featured, Event.created_at, Venue.city
+        ).join(Venue, Event.venue_id == Venue.venue_id).filter(
+            or_(
+                Event.group_id.in_(group_ids),
+                and_(Event.group_id.is_(None), Event.event_id.in_(event_ids))
+            ),
+            Event.status == 'PUBLISHED',
+            Venue.status == 'ACTIVE',
+            Venue.is_active == True
+        ).all()
+        if not showtimes:
+            return {}
+
+        prices = {
+            row.event_id: row for row in db.session.query(
+                TicketType.event_id,
+                func.min(TicketType.price).label('min_price'),
+                func.max(TicketType.price).label('max_price'),
+                func.sum(TicketType.quantity - func.coalesce(TicketType.sold_quantity, 0)).label('available')
+            ).filter(
+                TicketType.event_id.in_([s.event_id for s in showtimes]),
+                TicketType.is_active == True
+            ).group_by(TicketType.event_id).all()
+        }
+
+        groups = {}
+        for showtime in showtimes:
+            groups.setdefault(cls.group_key(showtime.event_id, showtime.group_id), []).append(showtime)
+
+        cards = {}
+        for key, members in groups.items():
+            members.sort(key=lambda s: (s.start_datetime, s.event_id))
+            upcoming = [s for s in members if s.start_datetime >= now]
+            representative = upcoming[0] if upcoming else members[0]
+            min_prices = [prices[s.event_id].min_price for s in members if s.event_id in prices]
+            max_prices = [prices[s.event_id].max_price for s in members if s.event_id in prices]
+            cards[key] = {
+                'event_id': representative.event_id,
+                'category_id': representative.category_id,
+                'venue_id': representative.venue_id,
+                'venue_city': representative.city,
+                'min_price': min(min_prices) if min_prices else None,
+                'max_price': max(max_prices) if max_prices else None,
+                'start_datetime': representative.start_datetime,
+                'next_start_datetime': upcoming[0].start_datetime if upcoming else None,
+                'showtime_count': len(members),
+                'total_capacity': sum(s.total_capacity or 0 for s in members),
+                'available_tickets': max(sum(
+                    int(prices[s.event_id].available or 0) for s in members if s.event_id in prices
+                ), 0),
+                'is_featured': any(s.is_featured for s in members),
+                'popularity_score': sum(s.sold_tickets or 0 for s in members),
+                'created_at': representative.created_at or representative.start_datetime
+            }
+        return cards
+
+    @classmethod
+    def refresh_groups(cls, group_keys: Iterable[str], invalidate_listings: bool = True) -> int:
+        """
+        Recompute the cards of showtime groups (call after committing the write)
+
+        Errors are logged, not raised: the write that triggered the refresh
+        has already committed.
+
+        Returns:
+            Number of groups refreshed
+        """
+        group_keys = sorted(set(group_keys))
+        if not group_keys:
+            return 0
+        now = now_gmt7()
+        try:
+            for chunk in _chunks(group_keys, REFRESH_CHUNK_SIZE):
+                cards = cls._compute(chunk, now)
+                existing = {card.group_key: card for card in EventCard.query.filter(EventCard.group_key.in_(chunk)).all()}
+                for key in chunk:
+                    values = cards.get(key)
+                    card = existing.get(key)
+                    if values is None:
+                        # No listable showtime left
+                        if card is not None:
+                            db.session.delete(card)
+                        continue
+                    if card is None:
+                        card = EventCard(group_key=key)
+                        db.session.add(card)
+                    for name, value in values.items():
+                        setattr(card, name, value)
+                    card.refreshed_at = now
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error refreshing event cards: {str(e)}")
+            return 0
+        mark_search_documents_stale(group_keys)
+        if invalidate_listings:
+            invalidate_event_listings()
+        return len(group_keys)
+
+    @classmethod
+    def refresh_events(cls, event_ids: Iterable[int], invalidate_listings: bool = True) -> int:
+        """
+        Recompute the groups of these events (and their former single-event
+        cards); like refresh_groups, errors are logged, not raised
+        """
+        event_ids = {int(event_id) for event_id in event_ids if event_id}
+        if not event_ids:
+            return 0
+        # An event that just joined a group leaves its own card behind
+        group_keys = {str(event_id) for event_id in event_ids}
+        try:
+            for chunk in _chunks(sorted(event_ids), REFRESH_CHUNK_SIZE):
+                group_keys.update(
+                    group_id for (group_id,) in db.session.query(Event.group_id).filter(
+                        Event.event_id.in_(chunk), Event.group_id.isnot(None)
+                    ).distinct()
+                )
+        except Exception as e:
+            # The write is committed; refresh_due / rebuild_all repair the cards
+            db.session.rollback()
+            print(f"Error refreshing event cards: {str(e)}")
+            return 0
+        return cls.refresh_groups(group_keys, invalidate_listings)
+
+    @classmethod
+    def refresh_venue(cls, venue_id: int) -> int:
+        """Recompute the groups with a showtime at this venue (status/city changes)"""
+        try:
+            event_ids = [event_id for (event_id,) in db.session.query(Event.event_id).filter(Event.venue_id == venue_id)]
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error refreshing event cards: {str(e)}")
+            return 0
+        return cls.refresh_events(event_ids)
+
+    @classmethod
+    def refresh_due(cls) -> int:
+        """Move groups whose next showtime has started on to the following one"""
+        group_keys = [key for (key,) in db.session.query(EventCard.group_key).filter(
+            EventCard.next_start_datetime < now_gmt7()
+        )]
+        if not group_keys:
+            return 0
+        return cls.refresh_groups(group_keys)
+
+    @classmethod
+    def rebuild_all(cls) -> int:
+        """Recompute every card (backfill after creating the table, or repair)"""
+        group_keys = {key for (key,) in db.session.query(cls._group_key_expr()).filter(
+            Event.status == 'PUBLISHED'
+        ).distinct()}
+        # Cards whose groups are gone are dropped by the refresh
+        group_keys.update(key for (key,) in db.session.query(EventCard.group_key))
+        return cls.refresh_groups(group_keys)
+
+    @staticmethod
+    def serialize_cards(cards: List[EventCard]) -> List[Dict[str, Any]]:
+        """Event cards in the order of `cards`, with the read model columns"""
+        if not cards:
+            return []
+        events = {event.event_id: event for event in Event.query.filter(
+            Event.event_id.in_([card.event_id for card in cards])
+        ).all()}
+        present = [card for card in cards if card.event_id in events]
+        results = serialize_events([events[card.event_id] for card in present], 'card')
+        for data, card in zip(results, present):
+            data.update(card.to_dict())
+        return results
+
+    @classmethod
+    def _filtered(
+        cls,
+        category_id=None,
+        is_featured=None,
+        venue_id=None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        min_price=None,
+        max_price=None,
+        sort=None
+    ):
+        """Cards matching the listing filters (unordered)"""
+        query = EventCard.query
+
+        if category_id:
+            query = query.filter(EventCard.category_id == category_id)
+        if is_featured is not None:
+            query = query.filter(EventCard.is_featured == is_featured)
+        if venue_id:
+            query = query.filter(EventCard.venue_id == venue_id)
+
+        if date_from or date_to:
+            showtimes = db.session.query(cls._group_key_expr()).join(
+                Venue, Event.venue_id == Venue.venue_id
+            ).filter(
+                Event.status == 'PUBLISHED',
+                Venue.status == 'ACTIVE',
+                Venue.is_active == True
+            )
+            if date_from:
+                showtimes = showtimes.filter(Event.start_datetime >= date_from)
+            if date_to:
+                showtimes = showtimes.filter(Event.start_datetime <= date_to)
+            query = query.filter(EventCard.group_key.in_(showtimes))
+
+        if min_price is not None:
+            query = query.filter(EventCard.min_price >= min_price)
+        if max_price is not None:
+            query = query.filter(EventCard.min_price <= max_price)
+
+        if sort == 'upcoming':
+            query = query.filter(EventCard.next_start_datetime >= now_gmt7())
+        return query
+
+    @staticmethod
+    def _sort_keys(sort) -> List[Tuple[Any, bool]]:
+        """(column, descending) of each sort, ending with group_key so the order is total"""
+        if sort == 'upcoming':
+            return [(EventCard.next_start_datetime, False), (EventCard.group_key, False)]
+        if sort == 'newest':
+            return [(EventCard.created_at, True), (EventCard.group_key, True)]
+        if sort == 'popular':
+            return [(EventCard.popularity_score, True), (EventCard.group_key, True)]
+        return [
+            (EventCard.is_featured, True),
+            (EventCard.popularity_score, True),
+            (EventCard.created_at, True),
+            (EventCard.group_key, True)
+        ]
+
+    @staticmethod
+    def _after(sort_keys: List[Tuple[Any, bool]], values: List[Any]):
+        """Keyset condition: rows strictly after `values` in the sort order"""
+        # Booleans compare as 0/1 (SQLAlchemy only allows == / != against True/False)
+        values = [int(value) if isinstance(value, bool) else value for value in values]
+        clauses = []
+        for i, (column, descending) in enumerate(sort_keys):
+            equal = [sort_keys[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    @classmethod
+    def count_cards(cls, **filters) -> int:
+        """Number of cards matching the listing filters"""
+        return cls._filtered(**filters).count()
+
+    @classmethod
+    def list_cards(
+        cls,
+        category_id=None,
+        is_featured=None,
+        venue_id=None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        min_price=None,
+        max_price=None,
+        sort=None,
+        limit=20,
+        offset=0,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Published event listing, one card per showtime group
+
+        Dates match any showtime of the group; prices match the group's
+        lowest active ticket price. With a cursor (from a previous page's
+        next_cursor) the page continues after that card and offset is
+        ignored; every page, offset ones included, returns the cursor of
+        the page after it.
+
+        Raises:
+            ValueError: if the cursor is malformed or from another sort
+
+        Returns:
+            {'data': [event dicts], 'total': int or None (with_total=False),
+             'next_cursor': str or None, 'has_more': bool}
+        """
+        filters = {
+            'category_id': category_id,
+            'is_featured': is_featured,
+            'venue_id': venue_id,
+            'date_from': date_from,
+            'date_to': date_to,
+            'min_price': min_price,
+            'max_price': max_price,
+            'sort': sort
+        }
+        sort_keys = cls._sort_keys(sort)
+        query = cls._filtered(**filters)
+        total = query.count() if with_total else None
+
+        # The cursor starts with the sort it was made for
+        sort_name = sort if sort in ('upcoming', 'newest', 'popular') else 'default'
+        after = decode_cursor(cursor, len(sort_keys) + 1)
+        if after is not None:
+            if after[0] != sort_name or any(value is None for value in after):
+                raise ValueError('Invalid cursor')
+            after = after[1:]
+            query = query.filter(cls._after(sort_keys, after))
+        query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in sort_keys])
+        if after is None and offset:
+            query = query.offset(offset)
+
+        cards = query.limit(limit + 1).all()
+        has_more = len(cards) > limit
+        cards = cards[:limit]
+        next_cursor = None
+        if has_more and cards:
+            last = cards[-1]
+            next_cursor = encode_cursor(sort_name, *[getattr(last, column.key) for column, _ in sort_keys])
+        return {
+            'data': cls.serialize_cards(cards),
+            'total': total,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }
+
+    @classmethod
+    def get_featured(cls, limit=10) -> List[Dict[str, Any]]:
+        """Featured showtime groups, newest first"""
+        cards = EventCard.query.filter(EventCard.is_featured == True).order_by(
+            EventCard.created_at.desc()
+        ).limit(limit).all()
+        return cls.serialize_cards(cards)
+
+    @classmethod
+    def get_recommended(cls, event_id, limit=4) -> List[Dict[str, Any]]:
+        """Other showtime groups of the event's category, upcoming ones first"""
+        event = db.session.query(Event.event_id, Event.group_id, Event.category_id).filter(
+            Event.event_id == event_id
+        ).first()
+        if not event or event.category_id is None:
+            return []
+
+        cards = EventCard.query.filter(
+            EventCard.category_id == event.category_id,
+            EventCard.group_key != cls.group_key(event.event_id, event.group_id)
+        ).order_by(
+            EventCard.next_start_datetime.is_(None),
+            EventCard.next_start_datetime.asc(),
+            EventCard.start_datetime.asc()
+        ).limit(limit).all()
+        if not cards:
+            return []
+
+        events = {row.event_id: row for row in db.session.query(
+            Event.event_id, Event.event_name, Event.banner_image_url
+        ).filter(Event.event_id.in_([card.event_id for card in cards]))}
+        return [
+            {
+                "event_id": card.event_id,
+                "event_name": events[card.event_id].event_name,
+                "banner_image_url": events[card.event_id].banner_image_url,
+                "start_datetime": card.start_datetime.isoformat() if card.start_datetime else None,
+                "min_price": float(card.min_price) if card.min_price is not None else 0
+            }
+            for card in cards if card.event_id in events
+        ]
@@ -0,0 +1,162 @@
+"""
+Event search service
+Feeds the in-process search index (app.utils.event_search_index) from the
+event card read model and answers /events/search with event cards.
+
+The index is loaded on first use (or by the background sync loop) and
+kept current incrementally:
+- groups refreshed by this process are reindexed before the next search
+- groups refreshed by other processes are picked up by EventCard.refreshed_at
+  every SEARCH_INDEX_SYNC_SECONDS
+- groups whose card is gone are dropped when a search hits them
+If the index cannot be loaded, search falls back to a LIKE scan.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_
+
+from app.config import Config
+from app.extensions import db
+from app.models.event import Event
+from app.models.event_card import EventCard
+from app.models.event_category import EventCategory
+from app.models.venue import Venue
+from app.services.event_card_service import EventCardService
+from app.utils.event_search_index import get_event_search_index
+from app.utils.event_serializer import serialize_events
+
+# Cards refreshed this long before the newest indexed one are read again on
+# sync, so a refresh committed late is not skipped
+SYNC_OVERLAP = timedelta(seconds=30)
+
+LOAD_BATCH_SIZE = 1000
+
+
+class EventSearchService:
+    _sync_lock = threading.Lock()
+    _last_sync = 0.0
+
+    @staticmethod
+    def _documents(group_keys: Optional[List[str]] = None, refreshed_since=None):
+        """(group_key, refreshed_at, fields) of the cards to index"""
+        query = db.session.query(
+            EventCard.group_key, EventCard.refreshed_at, EventCard.venue_city,
+            Event.event_name, Event.description, Venue.venue_name, EventCategory.category_name
+        ).join(
+            Event, Event.event_id == EventCard.event_id
+        ).outerjoin(
+            Venue, Venue.venue_id == EventCard.venue_id
+        ).outerjoin(
+            EventCategory, EventCategory.category_id == EventCard.category_id
+        )
+        if group_keys is not None:
+            query = query.filter(EventCard.group_key.in_(group_keys))
+        if refreshed_since is not None:
+            query = query.filter(EventCard.refreshed_at >= refreshed_since)
+        for row in query.yield_per(LOAD_BATCH_SIZE):
+            yield row.group_key, row.refreshed_at, {
+                'name': row.event_name,
+                'description': row.description,
+                'venue': row.venue_name,
+                'city': row.venue_city,
+                'category': row.category_name
+            }
+
+    @classmethod
+    def _index_documents(cls, documents) -> int:
+        index = get_event_search_index()
+        count = 0
+        for group_key, refreshed_at, fields in documents:
+            index.index(group_key, fields)
+            if refreshed_at and (index.synced_until is None or refreshed_at > index.synced_until):
+                index.synced_until = refreshed_at
+            count += 1
+        return count
+
+    @classmethod
+    def load(cls) -> int:
+        """(Re)build the whole index from the event cards"""
+        with cls._sync_lock:
+            index = get_event_search_index()
+            index.clear()
+            index.pop_stale()
+            count = cls._index_documents(cls._documents())
+            index.loaded = True
+            cls._last_sync = time.monotonic()
+            return count
+
+    @classmethod
+    def sync(cls, force: bool = False) -> int:
+        """
+        Bring the index up to date (loads it on first use)
+
+        Returns:
+            Number of documents (re)indexed
+        """
+        index = get_event_search_index()
+        if not index.loaded:
+            return cls.load()
+        with cls._sync_lock:
+            count = 0
+            stale = index.pop_stale()
+            if stale:
+                indexed = set()
+                for i in range(0, len(stale), LOAD_BATCH_SIZE):
+                    chunk = stale[i:i + LOAD_BATCH_SIZE]
+                    documents = list(cls._documents(group_keys=chunk))
+                    indexed.update(group_key for group_key, _, _ in documents)
+                    count += cls._index_documents(documents)
+                for group_key in set(stale) - indexed:
+                    index.remove(group_key)
+
+            now = time.monotonic()
+            if force or now - cls._last_sync >= Config.SEARCH_INDEX_SYNC_SECONDS:
+                since = index.synced_until - SYNC_OVERLAP if index.synced_until else None
+                count += cls._index_documents(cls._documents(refreshed_since=since))
+                cls._last_sync = now
+            return count
+
+    @classmethod
+    def search(cls, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Published event cards matching a query, best first"""
+        try:
+            cls.sync()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error syncing event search index: {str(e)}")
+            if not get_event_search_index().loaded:
+                return cls._search_like(query, limit, offset)
+
+        index = get_event_search_index()
+        hits = index.search(query, limit, offset)
+        if not hits:
+            return []
+        group_keys = [group_key for group_key, _ in hits]
+        cards = {card.group_key: card for card in EventCard.query.filter(EventCard.group_key.in_(group_keys)).all()}
+        for group_key in group_keys:
+            if group_key not in cards:
+                # Unlisted since it was indexed (e.g. by another process)
+                index.remove(group_key)
+        return EventCardService.serialize_cards([cards[key] for key in group_keys if key in cards])
+
+    @staticmethod
+    def _search_like(query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Substring match on name/description (no index, no diacritic folding)"""
+        events = db.session.query(Event).join(Venue, Event.venue_id == Venue.venue_id).filter(
+            or_(
+                Event.event_name.like(f'%{query}%'),
+                Event.description.like(f'%{query}%')
+            ),
+            Event.status == 'PUBLISHED',
+            Venue.status == 'ACTIVE',
+            Venue.is_active == True
+        )
+        # Group showtimes
+        subq = events.with_entities(func.min(Event.event_id)).group_by(
+            func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
+        )
+        return serialize_events(events.filter(Event.event_id.in_(subq)).limit(limit).offset(offset).all(), 'card')
@@ -2,8 +2,12 @@ from app.extensions import db
 from app.models.favorite_event import FavoriteEvent
 from app.models.event import Event
 from app.models.venue import Venue
+from app.models.ticket_type import TicketType
+from sqlalchemy import func
 from datetime import datetime
 from app.utils.datetime_utils import now_gmt7
+from app.utils.event_serializer import serialize_events
+from app.services.event_card_service import EventCardService
 
 class EventService:
     @staticmethod
@@ -51,7 +55,7 @@ class EventService:
             ).delete(synchronize_session=False)
             db.session.commit()
         
-        return [event.to_dict(include_details=True) for event in events]
+        return serialize_events(events, 'card')
 
     @staticmethod
     def get_user_favorite_ids(user_id):
@@ -83,3 +87,163 @@ class EventService:
             db.session.commit()
         
         return active_event_ids
+
+    @staticmethod
+    def list_events(
+        category_id=None,
+        status='PUBLISHED',
+        is_featured=None,
+        venue_id=None,
+        date_from=None,
+        date_to=None,
+        min_price=None,
+        max_price=None,
+        sort=None,
+        limit=20,
+        offset=0,
+        cursor=None,
+        with_total=True
+    ):
+        """
+        Public event listing (one card per showtime group) for GET /events
+
+        Dates are GMT+7 ISO strings. The result is JSON serializable so it
+        can be cached (see app.utils.event_list_cache). PUBLISHED listings
+        come from the event card read model and can be paged with a cursor;
+        other statuses are aggregated from Event on each call and only page
+        by offset.
+
+        Raises:
+            ValueError: for a malformed cursor, or a cursor on another status
+
+        Returns:
+            {'data': [event dicts], 'total': int or None, 'next_cursor': str or None, 'has_more': bool}
+        """
+        if status == 'PUBLISHED':
+            # Served from the event card read model
+            return EventCardService.list_cards(
+                category_id=category_id,
+                is_featured=is_featured,
+                venue_id=venue_id,
+                date_from=datetime.fromisoformat(date_from) if date_from else None,
+                date_to=datetime.fromisoformat(date_to) if date_to else None,
+                min_price=min_price,
+                max_price=max_price,
+                sort=sort,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+                with_total=with_total
+            )
+
+        if cursor:
+            raise ValueError('Cursor pagination is only available for published events')
+
+        # Build query
+        # We join with Venue to ensure we only show events at ACTIVE venues
+        # Also join with TicketType to filter by price
+        query = db.session.query(Event).join(Venue, Event.venue_id == Venue.venue_id).filter(
+            Venue.status == 'ACTIVE',
+            Venue.is_active == True
+        )
+        
+        if category_id:
+            query = query.filter(Event.category_id == category_id)
+        
+        if status:
+            query = query.filter(Event.status == status)
+        
+        if is_featured is not None:
+            query = query.filter(Event.is_featured == is_featured)
+        
+        if venue_id:
+            query = query.filter(Event.venue_id == venue_id)
+        
+        # Date filters (GMT+7)
+        if date_from:
+            query = query.filter(Event.start_datetime >= datetime.fromisoformat(date_from))
+        
+        if date_to:
+            query = query.filter(Event.start_datetime <= datetime.fromisoformat(date_to))
+        
+        # Price filters - use subquery in WHERE clause
+        if min_price is not None or max_price is not None:
+            # Subquery to get min price per event
+            price_subq = db.session.query(
+                TicketType.event_id,
+                func.min(TicketType.price).label('min_price')
+            ).filter(
+                TicketType.is_active == True
+            ).group_by(TicketType.event_id).subquery()
+            
+            # Use EXISTS or IN to filter events by price range
+            if min_price is not None and max_price is not None:
+                query = query.filter(
+                    Event.event_id.in_(
+                        db.session.query(price_subq.c.event_id).filter(
+                            price_subq.c.min_price >= min_price,
+                            price_subq.c.min_price <= max_price
+                        )
+                    )
+                )
+            elif min_price is not None:
+                query = query.filter(
+                    Event.event_id.in_(
+                        db.session.query(price_subq.c.event_id).filter(
+                            price_subq.c.min_price >= min_price
+                        )
+                    )
+                )
+            elif max_price is not None:
+                query = query.filter(
+                    Event.event_id.in_(
+                        db.session.query(price_subq.c.event_id).filter(
+                            price_subq.c.min_price <= max_price
+                        )
+                    )
+                )
+        
+        # Add basic filters (e.g. upcoming) if needed before grouping
+        if sort == 'upcoming':
+            query = query.filter(Event.start_datetime >= now_gmt7())
+
+        # Group showtimes: Only show one record per group_id among events that matched the filters
+        # Using coalesce(group_id, event_id_as_string) to create a unique identifier for grouping
+        # CAST is necessary because event_id is int and group_id is string
+        # We use query.with_entities() on the filtered query to get the min ID per group
+        subq = query.with_entities(func.min(Event.event_id)).group_by(
+            func.coalesce(Event.group_id, func.cast(Event.event_id, db.String))
+        )
+        query = query.filter(Event.event_id.in_(subq))
+
+        # Apply sorting ONLY to the final query
+        if sort == 'upcoming':
+            query = query.order_by(Event.start_datetime.asc())
+        elif sort == 'newest':
+            query = query.order_by(Event.created_at.desc())
+        elif sort == 'popular':
+            query = query.order_by(Event.sold_tickets.desc())
+        else:
+            query = query.order_by(Event.is_featured.desc(), Event.sold_tickets.desc(), Event.created_at.desc())
+        
+        # Pagination
+        total = query.count()
+        events = query.limit(limit).offset(offset).all()
+        
+        return {
+            'data': serialize_events(events, 'card'),
+            'total': total if with_total else None,
+            'next_cursor': None,
+            'has_more': offset + len(events) < total
+        }
+
+    @staticmethod
+    def count_events(status='PUBLISHED', date_from=None, date_to=None, **filters):
+        """Number of listing cards matching the filters of list_events"""
+        if status == 'PUBLISHED':
+            return EventCardService.count_cards(
+                date_from=datetime.fromisoformat(date_from) if date_from else None,
+                date_to=datetime.fromisoformat(date_to) if date_to else None,
+                **filters
+            )
+        return EventService.list_events(status=status, date_from=date_from, date_to=date_to, limit=0, **filters)['total']
@@ -0,0 +1,135 @@
+"""
+General-admission inventory service
+Checkout-time reservation against the per-ticket-type inventory counters and
+batched reconciliation of TicketType.sold_quantity / Event.sold_tickets.
+"""
+
+from typing import Dict, Iterable
+
+from sqlalchemy import func, update
+
+from app.extensions import db
+from app.models.event import Event
+from app.models.order import Order
+from app.models.ticket import Ticket
+from app.models.ticket_type import TicketType
+from app.services.event_card_service import EventCardService
+from app.utils.inventory_counter import (
+    get_inventory_counter,
+    reconcile_on_commit,
+    release_on_commit,
+    track_reserved
+)
+
+# Tickets that hold inventory: their order is awaiting payment or paid
+HELD_ORDER_STATUSES = ('PENDING', 'PAID', 'REFUND_PENDING')
+SOLD_ORDER_STATUSES = ('PAID', 'REFUND_PENDING')
+ACTIVE_TICKET_STATUSES = ('ACTIVE', 'USED')
+
+
+class InventoryService:
+    @staticmethod
+    def count_tickets(ticket_type_ids: Iterable[int], order_statuses) -> Dict[int, int]:
+        """Active tickets per ticket type whose order is in `order_statuses` (one grouped query)"""
+        ticket_type_ids = list(ticket_type_ids)
+        if not ticket_type_ids:
+            return {}
+        rows = db.session.query(Ticket.ticket_type_id, func.count(Ticket.ticket_id)).join(
+            Order, Order.order_id == Ticket.order_id
+        ).filter(
+            Ticket.ticket_type_id.in_(ticket_type_ids),
+            Ticket.ticket_status.in_(ACTIVE_TICKET_STATUSES),
+            Order.order_status.in_(order_statuses)
+        ).group_by(Ticket.ticket_type_id).all()
+        return {ticket_type_id: count for ticket_type_id, count in rows}
+
+    @classmethod
+    def reserve(cls, ticket_type: TicketType, quantity: int) -> int:
+        """
+        Take general-admission tickets for an order being created
+
+        The tickets are given back automatically if the order transaction
+        rolls back.
+
+        Returns:
+            Remaining tickets
+
+        Raises:
+            ValueError: if fewer than `quantity` tickets are left
+        """
+        ticket_type_id = ticket_type.ticket_type_id
+
+        def load_available():
+            held = cls.count_tickets([ticket_type_id], HELD_ORDER_STATUSES).get(ticket_type_id, 0)
+            return max((ticket_type.quantity or 0) - held, 0)
+
+        success, remaining = get_inventory_counter().reserve(ticket_type_id, quantity, load_available)
+        if not success:
+            raise ValueError(f'Not enough Ticket available for {ticket_type.type_name}. Only {remaining} left.')
+        track_reserved(db.session, ticket_type_id, quantity)
+        return remaining
+
+    @staticmethod
+    def release_tickets_on_commit(tickets: Iterable[Ticket]) -> None:
+        """
+        Give the general-admission tickets of a cancelled/refunded order back
+        to inventory once the transaction commits (seated tickets are freed
+        with their seats)
+        """
+        counts = {}
+        for ticket in tickets:
+            if not ticket.seat_id:
+                counts[ticket.ticket_type_id] = counts.get(ticket.ticket_type_id, 0) + 1
+        release_on_commit(db.session, counts)
+
+    @staticmethod
+    def reconcile_sold_on_commit(ticket_type_ids: Iterable[int]) -> None:
+        """Queue ticket types for sold count reconciliation once the transaction commits"""
+        reconcile_on_commit(db.session, ticket_type_ids)
+
+    @classmethod
+    def reconcile_sold_quantities(cls, batch_size: int = 500) -> int:
+        """
+        Write sold counts of queued ticket types back to MySQL
+
+        sold_quantity is recomputed from the tickets of paid orders (so a lost
+        or repeated queue entry cannot drift the count), and sold_tickets of
+        the affected events is the sum over their ticket types. One grouped
+        query, one batched UPDATE per table and one commit per batch.
+
+        Returns:
+            Number of ticket types reconciled
+        """
+        ticket_type_ids = get_inventory_counter().pop_dirty(batch_size)
+        if not ticket_type_ids:
+            return 0
+        try:
+            sold = cls.count_tickets(ticket_type_ids, SOLD_ORDER_STATUSES)
+            db.session.execute(update(TicketType), [
+                {'ticket_type_id': ticket_type_id, 'sold_quantity': sold.get(ticket_type_id, 0)}
+                for ticket_type_id in ticket_type_ids
+            ])
+
+            event_ids = [
+                event_id for (event_id,) in db.session.query(TicketType.event_id).filter(
+                    TicketType.ticket_type_id.in_(ticket_type_ids)
+                ).distinct()
+            ]
+            if event_ids:
+                totals = dict(db.session.query(
+                    TicketType.event_id, func.coalesce(func.sum(TicketType.sold_quantity), 0)
+                ).filter(TicketType.event_id.in_(event_ids)).group_by(TicketType.event_id).all())
+                db.session.execute(update(Event), [
+                    {'event_id': event_id, 'sold_tickets': int(totals.get(event_id, 0))}
+                    for event_id in event_ids
+                ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Requeue so the next run retries
+            get_inventory_counter().mark_dirty(ticket_type_ids)
+            raise
+        # Availability and popularity on the event cards; cached listings
+        # keep their sold counts until they expire
+        EventCardService.refresh_events(event_ids, invalidate_listings=False)
+        return len(ticket_type_ids)
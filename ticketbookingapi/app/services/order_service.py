@@ -1,104 +1,137 @@
 from datetime import datetime, timedelta
-import random
 from app.utils.datetime_utils import now_gmt7
-import string
 from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.models.order import Order
 from app.models.ticket import Ticket
 from app.models.ticket_type import TicketType
 from app.models.event import Event
 from app.models.payment import Payment
-from app.models.discount import Discount
 from app.models.seat import Seat
 from app.models.venue import Venue
-from app.utils import generate_ticket_qr
+from app.utils.redis_reservation_manager import get_redis_reservation_manager, release_holds_on_commit
+from app.exceptions import ConflictException
+from app.utils.seat_state_log import record_seat_changes_on_commit
+from app.utils.qr_render_queue import render_ticket_qr_on_commit
+from app.utils.qr_cache import get_ticket_qr_url
+from app.utils.code_generator import generate_code, generate_secret_code
+from app.services.inventory_service import InventoryService
+from app.services.discount_service import DiscountService
+from app.services.seat_hold_service import pending_order_seats
+from app.utils.pagination import decode_cursor, encode_cursor, parse_limit
 
 from typing import Dict, List, Any, Tuple, Optional
 
 class OrderService:
     @staticmethod
     def generate_order_code() -> str:
-        """Generate unique order code"""
-        timestamp = now_gmt7().strftime('%Y%m%d%H%M%S')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-        return f"ORD-{timestamp}-{random_str}"
+        """Generate unique order code (Snowflake ID, e.g. ORD-0F4QZ8XK2M000)"""
+        return generate_code('ORD')
 
     @staticmethod
     def generate_ticket_code() -> str:
-        """Generate unique ticket code"""
-        timestamp = now_gmt7().strftime('%Y%m%d%H%M%S')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        return f"TKT-{timestamp}-{random_str}"
+        """Generate unique, unguessable ticket code (checked at the venue)"""
+        return generate_secret_code('TKT')
 
     @staticmethod
     def validate_and_calculate_discount(
         discount_code: str,
         items: List[Dict[str, Any]]
-    ) -> Tuple[bool, float, str, Optional[Discount]]:
+    ) -> Tuple[bool, float, str, Optional[Any]]:
         """
         items: list of dict {'ticket_type': obj, 'quantity': int, 'price': float}
         Returns: (is_valid, amount, message, discount_obj)
+        (discount_obj is a cached snapshot of the Discount, see DiscountService)
         """
-        discount = Discount.query.filter_by(discount_code=discount_code).first()
-        if not discount:
-            return False, 0, "Mã giảm giá không tồn tại", None
-            
-        if not discount.is_active:
-            return False, 0, "Mã giảm giá đã bị khóa", None
+        return DiscountService.validate_and_calculate(discount_code, items)
 
-        if discount.end_date < now_gmt7():
-             return False, 0, "Mã giảm giá đã hết hạn", None
+    @staticmethod
+    def _lock_and_validate_seats(tickets_data: List[Dict[str, Any]], user_id) -> Dict[int, Seat]:
+        """
+        Lock and validate every selected seat of an order in one pass
         
-        if discount.start_date > now_gmt7():
-             return False, 0, "Mã giảm giá chưa có hiệu lực", None
-
-        if discount.usage_limit and discount.usage_limit > 0:
-            if (discount.used_count or 0) >= discount.usage_limit:
-                 return False, 0, "Mã giảm giá đã hết lượt sử dụng", None
-                 
-        eligible_amount = 0
-        has_valid_item = False
+        All seats are loaded with a single SELECT ... FOR UPDATE (in seat_id
+        order, so concurrent orders lock rows in the same order) and hold
+        ownership is checked with a single Redis MGET. Seats already on a
+        pending order are rejected even if the user holds them again. Every
+        failing seat is reported, not just the first one.
         
-        for item in items:
-            tt = item['ticket_type']
-            is_applicable = False
+        Returns:
+            Dict of seat_id -> locked Seat
             
-            # Check Event ID constraint
-            if discount.event_id:
-                 if tt.event_id == discount.event_id:
-                     is_applicable = True
-            # Check Manager ID constraint
-            elif discount.manager_id:
-                 event = Event.query.get(tt.event_id)
-                 if event and event.manager_id == discount.manager_id:
-                      is_applicable = True
-            else:
-                 is_applicable = True
-                 
-            if is_applicable:
-                eligible_amount += item['price'] * item['quantity']
-                has_valid_item = True
-                
-        if not has_valid_item:
-            return False, 0, "Mã giảm giá không áp dụng cho đơn hàng này", None
+        Raises:
+            ConflictException: with payload 'seat_errors' listing
+                {'seat_id', 'reason', 'message'} for each unavailable seat
+        """
+        requested = []  # (seat_id, ticket_type_id)
+        for item in tickets_data:
+            for seat_id in item.get('seat_ids') or []:
+                requested.append((int(seat_id), item.get('ticket_type_id')))
+        if not requested:
+            return {}
+        
+        seat_ids = [seat_id for seat_id, _ in requested]
+        seats_by_id = {
+            seat.seat_id: seat
+            for seat in Seat.query.filter(Seat.seat_id.in_(seat_ids)).order_by(Seat.seat_id).with_for_update().all()
+        }
+        
+        on_pending_order = set(db.session.execute(pending_order_seats(seat_ids)).scalars())
+        
+        reservation_manager = get_redis_reservation_manager()
+        hold_owners = reservation_manager.get_hold_owners(seat_ids) if reservation_manager else None
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            pass
+        
+        errors = []
+        seen = set()
+        for seat_id, ticket_type_id in requested:
+            seat = seats_by_id.get(seat_id)
+            if seat_id in seen:
+                errors.append({'seat_id': seat_id, 'reason': 'DUPLICATE', 'message': f'Ghế {seat_id} được chọn nhiều lần'})
+                continue
+            seen.add(seat_id)
             
-        if discount.min_order_amount and eligible_amount < discount.min_order_amount:
-             return False, 0, f"Đơn hàng chưa đạt giá trị tối thiểu {float(discount.min_order_amount):,.0f}đ", None
-             
-        amount = 0
-        if discount.discount_type == 'PERCENTAGE':
-            amount = eligible_amount * (float(discount.discount_value) / 100)
-        else:
-            amount = float(discount.discount_value)
+            if not seat or str(seat.ticket_type_id) != str(ticket_type_id):
+                errors.append({'seat_id': seat_id, 'reason': 'INVALID', 'message': f'Ghế {seat_id} không hợp lệ'})
+                continue
             
-        if discount.max_discount_amount and amount > float(discount.max_discount_amount):
-            amount = float(discount.max_discount_amount)
+            label = f'{seat.row_name}{seat.seat_number}'
+            # If seat is BOOKED, it's already sold
+            if seat.status == 'BOOKED':
+                errors.append({'seat_id': seat_id, 'reason': 'BOOKED', 'message': f'Ghế {label} đã được đặt'})
+                continue
             
-        if amount > eligible_amount:
-            amount = eligible_amount
+            # Seat is waiting for the payment of another (or an earlier) order
+            if seat_id in on_pending_order:
+                errors.append({'seat_id': seat_id, 'reason': 'PENDING', 'message': f'Ghế {label} đang chờ thanh toán'})
+                continue
+            
+            # Without Redis, be more lenient but still check seat status
+            if hold_owners is None:
+                continue
             
-        return True, amount, "Áp dụng thành công", discount
+            owner = hold_owners.get(seat_id)
+            # RESERVED/LOCKED seats need an active hold by this user; AVAILABLE
+            # seats may still be held in Redis (seat state write-behind)
+            if seat.status in ('RESERVED', 'LOCKED'):
+                taken = owner != user_id
+            else:
+                taken = owner is not None and owner != user_id
+            if taken:
+                errors.append({'seat_id': seat_id, 'reason': 'HELD', 'message': f'Ghế {label} đã được người khác chọn'})
+        
+        if errors:
+            raise ConflictException(
+                message=errors[0]['message'] if len(errors) == 1 else f'{len(errors)} ghế không thể đặt: ' + ', '.join(e['message'] for e in errors),
+                payload={'seat_errors': errors}
+            )
+        
+        return seats_by_id
 
     @classmethod
     def create_order(cls, data):
@@ -116,67 +149,37 @@ class OrderService:
         total_amount = 0
         ticket_types_to_update = []
         
+        ticket_type_ids = {item.get('ticket_type_id') for item in tickets_data}
+        ticket_types = {
+            tt.ticket_type_id: tt
+            for tt in TicketType.query.filter(TicketType.ticket_type_id.in_(ticket_type_ids)).all()
+        }
+        
+        # Validate and lock every selected seat of the order at once
+        seats_by_id = cls._lock_and_validate_seats(tickets_data, data.get('user_id'))
+        
         for ticket_item in tickets_data:
             ticket_type_id = ticket_item.get('ticket_type_id')
             quantity = ticket_item.get('quantity', 1)
             seat_ids = ticket_item.get('seat_ids', []) # optional seat selection
             
-            ticket_type = TicketType.query.get(ticket_type_id)
+            ticket_type = ticket_types.get(ticket_type_id)
             if not ticket_type:
                 raise ValueError(f'Ticket type {ticket_type_id} not found')
             
             # If Seat are provided, quantity should match seat_ids length
-            if seat_ids:
-                if len(seat_ids) != quantity:
-                    raise ValueError(f'Quantity ({quantity}) does not match number of selected Seat ({len(seat_ids)})')
-                
-                # Check status each seat
-                for seat_id in seat_ids:
-                    seat = Seat.query.get(seat_id)
-                    if not seat or seat.ticket_type_id != ticket_type_id:
-                        raise ValueError(f'Ghế {seat_id} không hợp lệ')
-                    
-                    # If seat is BOOKED, it's already sold
-                    if seat.status == 'BOOKED':
-                        raise ValueError(f'Ghế {seat.row_name}{seat.seat_number} đã được đặt')
-                    
-                    # If seat is RESERVED, check if it's reserved by this user
-                    if seat.status == 'RESERVED':
-                        from app.utils.redis_reservation_manager import get_redis_reservation_manager
-                        reservation_manager = get_redis_reservation_manager()
-                        if reservation_manager:
-                            # Check if there's an active reservation by this user in Redis
-                            user_reservation = reservation_manager.get_reservation(seat_id)
-                            
-                            if user_reservation and user_reservation.get('user_id') == data.get('user_id'):
-                                # User has valid reservation for this seat, allow it
-                                pass
-                            else:
-                                # Seat is reserved by someone else or reservation expired
-                                raise ValueError(f'Ghế {seat.row_name}{seat.seat_number} đã được người khác chọn')
-                        else:
-                            # If Redis unavailable, be more lenient but still check seat status
-                            pass
-                    
-                    # If seat is LOCKED, check if it's locked by this user
-                    if seat.status == 'LOCKED':
-                        from app.utils.redis_reservation_manager import get_redis_reservation_manager
-                        reservation_manager = get_redis_reservation_manager()
-                        if reservation_manager:
-                            user_reservation = reservation_manager.get_reservation(seat_id)
-                            
-                            if not user_reservation or user_reservation.get('user_id') != data.get('user_id'):
-                                raise ValueError(f'Ghế {seat.row_name}{seat.seat_number} đã được người khác chọn')
-                        else:
-                            # If Redis unavailable, be more lenient but still check seat status
-                            pass
-                    
-                    # If seat is AVAILABLE, it's fine to proceed
+            if seat_ids and len(seat_ids) != quantity:
+                raise ValueError(f'Quantity ({quantity}) does not match number of selected Seat ({len(seat_ids)})')
             
-            # Check availability (for non-seat Ticket)
-            available = ticket_type.quantity - ticket_type.sold_quantity
-            if available < quantity:
-                raise ValueError(f'Not enough Ticket available for {ticket_type.type_name}. Only {available} left.')
+            if seat_ids:
+                # Seated tickets: the seats themselves are locked above
+                available = ticket_type.quantity - ticket_type.sold_quantity
+                if available < quantity:
+                    raise ValueError(f'Not enough Ticket available for {ticket_type.type_name}. Only {available} left.')
+            else:
+                # General admission: atomic take from the inventory counter
+                # (given back if this order is not committed)
+                InventoryService.reserve(ticket_type, quantity)
             
             total_amount += float(ticket_type.price) * quantity
             ticket_types_to_update.append({
@@ -188,6 +191,7 @@ class OrderService:
         
         # Apply discount if provided
         discount_amount = 0
+        discount_obj = None
         if data.get('discount_code'):
             is_valid, amount, msg, discount_obj = cls.validate_and_calculate_discount(
                 data.get('discount_code'), 
@@ -197,10 +201,6 @@ class OrderService:
                 raise ValueError(msg)
                 
             discount_amount = amount
-            
-            # Increment usage count
-            if discount_obj:
-                discount_obj.used_count = (discount_obj.used_count or 0) + 1
         
         final_amount = total_amount - discount_amount
         
@@ -219,8 +219,13 @@ class OrderService:
         db.session.add(order)
         db.session.flush()  # Get order_id
         
+        # Reserve one use of the discount (committed when the order is paid)
+        if discount_obj:
+            DiscountService.reserve_for_order(discount_obj, order.order_id)
+        
         # Create Ticket
         created_tickets = []
+        reserved_seat_ids = []
         for ticket_info in ticket_types_to_update:
             ticket_type = ticket_info['ticket_type']
             quantity = ticket_info['quantity']
@@ -230,43 +235,49 @@ class OrderService:
             for i in range(quantity):
                 seat_id = seat_ids[i] if seat_ids and i < len(seat_ids) else None
                 
+                ticket_code = cls.generate_ticket_code()
                 ticket = Ticket(
                     order_id=order.order_id,
                     ticket_type_id=ticket_type.ticket_type_id,
-                    ticket_code=cls.generate_ticket_code(),
+                    ticket_code=ticket_code,
                     ticket_status='ACTIVE',
                     seat_id=seat_id,
                     price=price,
                     holder_name=data.get('customer_name'),
-                    holder_email=data.get('customer_email')
+                    holder_email=data.get('customer_email'),
+                    # Rendered on demand from the ticket code (no image file)
+                    qr_code_url=get_ticket_qr_url(ticket_code)
                 )
                 db.session.add(ticket)
-                db.session.flush()  # Get ticket_id
-                
-                # Generate QR code for ticket
-                try:
-                    qr_url = generate_ticket_qr(ticket.ticket_code, ticket.ticket_id)
-                    ticket.qr_code_url = qr_url
-                except Exception as qr_err:
-                    print(f"Error generating QR code: {qr_err}")
-                
                 created_tickets.append(ticket)
                 
                 # Mark seat as RESERVED (will be BOOKED when payment succeeds)
                 if seat_id:
-                    seat = Seat.query.get(seat_id)
+                    seat = seats_by_id[int(seat_id)]
                     if seat.status == 'AVAILABLE':
                         seat.status = 'RESERVED'
-                    
-                    # Delete reservation from Redis since order is created
-                    from app.utils.redis_reservation_manager import get_redis_reservation_manager
-                    reservation_manager = get_redis_reservation_manager()
-                    if reservation_manager:
-                        reservation_manager.delete_reservation(seat_id)
+                        reserved_seat_ids.append(seat.seat_id)
             
             # NOTE: sold_quantity and sold_tickets will be updated when payment succeeds
             # Do NOT update them here to prevent counting unpaid orders as sold
         
+        # Seats taken straight from AVAILABLE (no hold written to MySQL yet)
+        record_seat_changes_on_commit(reserved_seat_ids, 'RESERVED')
+        
+        # Tickets are inserted in one flush on commit; their QR codes are
+        # pre-rendered into the QR cache once the order is committed
+        render_ticket_qr_on_commit(created_tickets)
+        
+        # The holds are consumed by the order: dropped from Redis once it is
+        # committed (until then they keep other users off the seats)
+        for ticket_info in ticket_types_to_update:
+            if ticket_info['seat_ids']:
+                release_holds_on_commit(
+                    ticket_info['ticket_type'].event_id,
+                    data.get('user_id'),
+                    ticket_info['seat_ids']
+                )
+        
         return order, created_tickets, (final_amount > 0)
 
     @staticmethod
@@ -327,68 +338,119 @@ class OrderService:
         }
 
     @staticmethod
-    def get_user_orders(user_id):
-        orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
-        
+    def get_user_orders(user_id, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Order history of a user, newest first, one page at a time
+
+        A constant number of queries per page: orders, tickets (with seats),
+        their ticket types, and the events (with venues); event/venue
+        summaries are built once and shared by all orders of the page.
+
+        Args:
+            user_id: User ID
+            cursor: Cursor returned with the previous page (None = first page)
+            limit: Page size (with neither cursor nor limit, the whole history
+                is returned for clients that do not paginate)
+
+        Returns:
+            (orders, next cursor or None on the last page)
+        """
+        query = Order.query.filter(Order.user_id == user_id)
+        after = decode_cursor(cursor, 2)
+        if after:
+            created_at, order_id = after
+            query = query.filter(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.order_id < order_id)
+            ))
+        query = query.order_by(Order.created_at.desc(), Order.order_id.desc())
+
+        next_cursor = None
+        if cursor is None and limit is None:
+            orders = query.all()
+        else:
+            limit = parse_limit(limit)
+            orders = query.limit(limit + 1).all()
+            if len(orders) > limit:
+                orders = orders[:limit]
+                next_cursor = encode_cursor(orders[-1].created_at, orders[-1].order_id)
+
+        tickets_by_order = {}
+        if orders:
+            tickets = Ticket.query.options(joinedload(Ticket.seat)).filter(
+                Ticket.order_id.in_([order.order_id for order in orders])
+            ).order_by(Ticket.ticket_id).all()
+            for ticket in tickets:
+                tickets_by_order.setdefault(ticket.order_id, []).append(ticket)
+
+        ticket_types = {}
+        type_ids = {ticket.ticket_type_id for tickets in tickets_by_order.values() for ticket in tickets}
+        if type_ids:
+            ticket_types = {
+                tt.ticket_type_id: tt
+                for tt in TicketType.query.filter(TicketType.ticket_type_id.in_(type_ids)).all()
+            }
+
+        # Event and venue summaries, shared across orders
+        summaries = {}
+        event_ids = {tt.event_id for tt in ticket_types.values()}
+        if event_ids:
+            events = Event.query.options(joinedload(Event.venue)).filter(Event.event_id.in_(event_ids)).all()
+            for event in events:
+                # Ticket types have no sale window: sales stay open
+                event_info = {
+                    'event_id': event.event_id,
+                    'event_name': event.event_name,
+                    'start_datetime': event.start_datetime.isoformat() if event.start_datetime else None,
+                    'end_datetime': event.end_datetime.isoformat() if event.end_datetime else None,
+                    'banner_image_url': event.banner_image_url,
+                    'status': event.status,
+                    'sale_end': None,
+                    'is_sale_active': True
+                }
+
+                venue_info = None
+                venue = event.venue
+                if venue:
+                    venue_info = {
+                        'venue_id': venue.venue_id,
+                        'venue_name': venue.venue_name,
+                        'address': venue.address,
+                        'city': venue.city
+                    }
+                summaries[event.event_id] = (event_info, venue_info)
+
         orders_data = []
         for order in orders:
-            tickets = Ticket.query.filter_by(order_id=order.order_id).all()
-            
-            # Get event info with venue details
+            tickets = tickets_by_order.get(order.order_id, [])
+
+            # Event info comes from the order's first ticket
             event_info = None
             venue_info = None
             if tickets:
-                ticket_type = TicketType.query.get(tickets[0].ticket_type_id)
-                if ticket_type:
-                    event = Event.query.get(ticket_type.event_id)
-                    if event:
-                        # Check if any ticket type has sales ended
-                        min_sale_end = None
-                        for tt in event.ticket_types:
-                            if tt.sale_end:
-                                if min_sale_end is None or tt.sale_end < min_sale_end:
-                                    min_sale_end = tt.sale_end
-                        
-                        event_info = {
-                            'event_id': event.event_id,
-                            'event_name': event.event_name,
-                            'start_datetime': event.start_datetime.isoformat() if event.start_datetime else None,
-                            'end_datetime': event.end_datetime.isoformat() if event.end_datetime else None,
-                            'banner_image_url': event.banner_image_url,
-                            'status': event.status,
-                            'sale_end': min_sale_end.isoformat() if min_sale_end else None,
-                            'is_sale_active': min_sale_end > now_gmt7() if min_sale_end else True
-                        }
-                        
-                        # Get venue info
-                        venue = Venue.query.get(event.venue_id)
-                        if venue:
-                            venue_info = {
-                                'venue_id': venue.venue_id,
-                                'venue_name': venue.venue_name,
-                                'address': venue.address,
-                                'city': venue.city
-                            }
-            
+                first_type = ticket_types.get(tickets[0].ticket_type_id)
+                if first_type:
+                    event_info, venue_info = summaries.get(first_type.event_id, (None, None))
+
             # Build detailed tickets list with ticket_type info
             tickets_data = []
             for ticket in tickets:
                 ticket_dict = ticket.to_dict()
-                
+
                 # Add ticket type info
-                ticket_type = TicketType.query.get(ticket.ticket_type_id)
+                ticket_type = ticket_types.get(ticket.ticket_type_id)
                 if ticket_type:
                     ticket_dict['ticket_type_name'] = ticket_type.type_name
                     ticket_dict['ticket_type_description'] = ticket_type.description
-                
+
                 # Add event and venue info to each ticket
                 ticket_dict['event_name'] = event_info['event_name'] if event_info else None
                 ticket_dict['event_date'] = event_info['start_datetime'] if event_info else None
                 ticket_dict['venue_name'] = venue_info['venue_name'] if venue_info else None
                 ticket_dict['venue_address'] = venue_info['address'] if venue_info else None
-                
+
                 tickets_data.append(ticket_dict)
-            
+
             # Build order data
             order_dict = order.to_dict()
             order_dict['event_name'] = event_info['event_name'] if event_info else None
@@ -398,10 +460,10 @@ class OrderService:
             order_dict['is_sale_active'] = event_info['is_sale_active'] if event_info else True
             order_dict['tickets'] = tickets_data
             order_dict['tickets_count'] = len(tickets)
-            
+
             orders_data.append(order_dict)
-            
-        return orders_data
+
+        return orders_data, next_cursor
 
     @staticmethod
     def cancel_order(order_id):
@@ -434,73 +496,87 @@ class OrderService:
         for ticket in tickets:
             ticket.ticket_status = 'CANCELLED'
             
-            # Release seat if exists (from RESERVED to AVAILABLE)
-            if ticket.seat_id:
-                seat = Seat.query.get(ticket.seat_id)
-                if seat and seat.status == 'RESERVED':
-                    seat.status = 'AVAILABLE'
-            
             # NOTE: sold_quantity and sold_tickets are NOT decremented here
             # because they were never incremented (order was never paid)
         
+        # Release seats (from RESERVED to AVAILABLE)
+        released_seat_ids = OrderService._transition_seats(
+            [ticket.seat_id for ticket in tickets], 'AVAILABLE', ('RESERVED',)
+        )
+        record_seat_changes_on_commit(released_seat_ids, 'AVAILABLE')
+        InventoryService.release_tickets_on_commit(tickets)
+        DiscountService.release_for_orders([order.order_id])
+        
         # Update order status
         order.order_status = 'CANCELLED'
+        return True, 'Đơn hàng đã được hủy.'
 
     @staticmethod
-    def mark_seats_as_booked(order_id):
+    def _transition_seats(seat_ids, status: str, from_statuses) -> List[int]:
+        """
+        Move an order's seats to `status` with one locking read and one UPDATE
+
+        Returns:
+            The seat IDs that were actually transitioned
+        """
+        seat_ids = {seat_id for seat_id in seat_ids if seat_id}
+        if not seat_ids:
+            return []
+        moved = [
+            seat_id for (seat_id,) in db.session.query(Seat.seat_id).filter(
+                Seat.seat_id.in_(seat_ids),
+                Seat.status.in_(list(from_statuses))
+            ).with_for_update()
+        ]
+        if moved:
+            Seat.query.filter(Seat.seat_id.in_(moved)).update({Seat.status: status})
+        return moved
+
+    @classmethod
+    def mark_seats_as_booked(cls, order_id):
         """Mark seats as BOOKED and update sold quantities when payment succeeds"""
         order = Order.query.get(order_id)
         if not order:
             return
         
-        tickets = Ticket.query.filter_by(order_id=order_id).all()
-        
-        # Track ticket types to update sold quantities
-        ticket_type_counts = {}
+        tickets = db.session.query(Ticket.ticket_type_id, Ticket.seat_id).filter(
+            Ticket.order_id == order_id
+        ).all()
         
-        for ticket in tickets:
-            # Mark seat as BOOKED if exists
-            if ticket.seat_id:
-                seat = Seat.query.get(ticket.seat_id)
-                if seat and seat.status in ['RESERVED', 'AVAILABLE']:
-                    seat.status = 'BOOKED'
-            
-            # Count tickets by ticket type for sold quantity update
-            ticket_type_id = ticket.ticket_type_id
-            if ticket_type_id not in ticket_type_counts:
-                ticket_type_counts[ticket_type_id] = 0
-            ticket_type_counts[ticket_type_id] += 1
-        
-        # Update sold quantities for each ticket type
-        for ticket_type_id, quantity in ticket_type_counts.items():
-            ticket_type = TicketType.query.get(ticket_type_id)
-            if ticket_type:
-                ticket_type.sold_quantity += quantity
-                
-                # Update event sold tickets
-                event = Event.query.get(ticket_type.event_id)
-                if event:
-                    event.sold_tickets += quantity
+        # Mark all of the order's seats as BOOKED at once
+        seat_ids = {ticket.seat_id for ticket in tickets if ticket.seat_id}
+        booked_seat_ids = cls._transition_seats(seat_ids, 'BOOKED', ('RESERVED', 'AVAILABLE'))
+        record_seat_changes_on_commit(booked_seat_ids, 'BOOKED')
+        if len(booked_seat_ids) != len(seat_ids):
+            # The payment is already captured: keep it, but flag the order
+            print(f"Error booking seats for order {order_id}: seats {sorted(seat_ids - set(booked_seat_ids))} are already booked")
+        
+        # sold_quantity / sold_tickets are reconciled in batches after commit
+        # (no read-modify-write of the hot TicketType/Event rows per payment)
+        InventoryService.reconcile_sold_on_commit({ticket.ticket_type_id for ticket in tickets})
+        DiscountService.commit_for_order(order_id)
 
-    @staticmethod
-    def release_seats_for_failed_order(order_id):
+    @classmethod
+    def release_seats_for_failed_order(cls, order_id):
         """Release seats when payment fails (sold quantities not updated since order was never paid)"""
         order = Order.query.get(order_id)
         if not order:
             return
         
-        tickets = Ticket.query.filter_by(order_id=order_id).all()
+        tickets = db.session.query(Ticket.ticket_type_id, Ticket.seat_id).filter(
+            Ticket.order_id == order_id
+        ).all()
         
-        for ticket in tickets:
-            # Release seat if exists (RESERVED only, since BOOKED means payment succeeded)
-            if ticket.seat_id:
-                seat = Seat.query.get(ticket.seat_id)
-                if seat and seat.status == 'RESERVED':
-                    seat.status = 'AVAILABLE'
+        # Release seats (RESERVED only, since BOOKED means payment succeeded)
+        released_seat_ids = cls._transition_seats(
+            [ticket.seat_id for ticket in tickets], 'AVAILABLE', ('RESERVED',)
+        )
+        record_seat_changes_on_commit(released_seat_ids, 'AVAILABLE')
+        InventoryService.release_tickets_on_commit(tickets)
+        DiscountService.release_for_orders([order_id])
         
         # Cancel tickets
-        for ticket in tickets:
-            ticket.ticket_status = 'CANCELLED'
+        Ticket.query.filter(Ticket.order_id == order_id).update({Ticket.ticket_status: 'CANCELLED'})
         
         # Update order status
         order.order_status = 'CANCELLED'
@@ -509,99 +585,119 @@ class OrderService:
         # because they were never incremented (order was never paid)
 
     @staticmethod
-    def cleanup_expired_pending_orders(older_than_minutes=15):
+    def cleanup_expired_pending_orders(older_than_minutes=None):
         """
         Cleanup expired pending orders and release reserved seats
-        This should be called periodically (e.g., via cron job or scheduled task)
+        The background sweeper (see socket_handlers) runs this periodically
         
         Args:
-            older_than_minutes: Orders older than this will be cancelled (default: 15 minutes)
+            older_than_minutes: Orders older than this will be cancelled (default: ORDER_PENDING_TIMEOUT_MINUTES)
             
         Returns:
             Tuple of (cancelled_count, released_seats_count)
         """
-        from app.repositories.order_repository import OrderRepository
-        
-        threshold = now_gmt7() - timedelta(minutes=older_than_minutes)
-        
-        # Get expired pending orders
-        expired_orders = Order.query.filter(
-            Order.order_status == 'PENDING',
-            Order.created_at < threshold
-        ).all()
-        
-        cancelled_count = 0
-        released_seats_count = 0
-        
-        for order in expired_orders:
-            try:
-                tickets = Ticket.query.filter_by(order_id=order.order_id).all()
-                
-                # Release seats
-                for ticket in tickets:
-                    if ticket.seat_id:
-                        seat = Seat.query.get(ticket.seat_id)
-                        if seat and seat.status == 'RESERVED':
-                            seat.status = 'AVAILABLE'
-                            released_seats_count += 1
-                    
-                    # Cancel ticket
-                    ticket.ticket_status = 'CANCELLED'
-                
-                # Cancel order
-                order.order_status = 'CANCELLED'
-                cancelled_count += 1
-                
-            except Exception as e:
-                print(f"Error cleaning up order {order.order_id}: {e}")
-                continue
-        
-        db.session.commit()
-        return cancelled_count, released_seats_count
+        from app.services.order_sweeper_service import OrderSweeperService
+
+        # Set-based, chunked sweep (one short transaction per chunk)
+        return OrderSweeperService.sweep(older_than_minutes=older_than_minutes)
 
     @staticmethod
-    def get_user_tickets_details(user_id):
-        # Get all orders for user
-        orders = Order.query.filter_by(user_id=user_id).all()
-        
+    def get_user_tickets_details(
+        user_id,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        when: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Ticket wallet of a user, newest order first, one page at a time
+
+        One joined query per page (ticket, order, ticket type, event, venue
+        and seat) with keyset pagination on (order created_at, ticket_id).
+
+        Args:
+            user_id: User ID
+            cursor: Cursor returned with the previous page (None = first page)
+            limit: Page size (with neither cursor nor limit, every ticket is
+                returned for clients that do not paginate)
+            when: 'upcoming' (event not ended yet) or 'past' (event ended)
+
+        Returns:
+            (tickets, next cursor or None on the last page)
+        """
+        query = db.session.query(
+            Ticket,
+            Order.order_code,
+            Order.order_status,
+            Order.created_at,
+            TicketType.type_name,
+            TicketType.description,
+            Event.event_id,
+            Event.event_name,
+            Event.start_datetime,
+            Event.status,
+            Event.banner_image_url,
+            Venue.venue_name,
+            Venue.address,
+            Venue.city
+        ).select_from(Ticket).join(
+            Order, Order.order_id == Ticket.order_id
+        ).join(
+            TicketType, TicketType.ticket_type_id == Ticket.ticket_type_id
+        ).join(
+            Event, Event.event_id == TicketType.event_id
+        ).outerjoin(
+            Venue, Venue.venue_id == Event.venue_id
+        ).options(joinedload(Ticket.seat)).filter(Order.user_id == user_id)
+
+        if when == 'upcoming':
+            query = query.filter(Event.end_datetime >= now_gmt7())
+        elif when == 'past':
+            query = query.filter(Event.end_datetime < now_gmt7())
+        elif when:
+            raise ValueError("when must be 'upcoming' or 'past'")
+
+        after = decode_cursor(cursor, 2)
+        if after:
+            created_at, ticket_id = after
+            query = query.filter(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Ticket.ticket_id < ticket_id)
+            ))
+        query = query.order_by(Order.created_at.desc(), Ticket.ticket_id.desc())
+
+        next_cursor = None
+        if cursor is None and limit is None:
+            rows = query.all()
+        else:
+            limit = parse_limit(limit)
+            rows = query.limit(limit + 1).all()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].created_at, rows[-1].Ticket.ticket_id)
+
         all_tickets = []
-        
-        for order in orders:
-            tickets = Ticket.query.filter_by(order_id=order.order_id).all()
-            
-            for ticket in tickets:
-                ticket_dict = ticket.to_dict()
-                
-                # Add ticket type info
-                ticket_type = TicketType.query.get(ticket.ticket_type_id)
-                if ticket_type:
-                    ticket_dict['ticket_type_name'] = ticket_type.type_name
-                    ticket_dict['ticket_type_description'] = ticket_type.description
-                    
-                    # Get event info
-                    event = Event.query.get(ticket_type.event_id)
-                    if event:
-                        ticket_dict['event_id'] = event.event_id
-                        ticket_dict['event_name'] = event.event_name
-                        ticket_dict['event_date'] = event.start_datetime.isoformat() if event.start_datetime else None
-                        ticket_dict['event_status'] = event.status
-                        ticket_dict['banner_image_url'] = event.banner_image_url
-                        
-                        # Get venue info
-                        venue = Venue.query.get(event.venue_id)
-                        if venue:
-                            ticket_dict['venue_name'] = venue.venue_name
-                            ticket_dict['venue_address'] = f"{venue.address}, {venue.city}"
-                
-                # Add order info
-                ticket_dict['order_code'] = order.order_code
-                ticket_dict['order_status'] = order.order_status
-                ticket_dict['order_date'] = order.created_at.isoformat() if order.created_at else None
-                
-                all_tickets.append(ticket_dict)
-        
-        # Sort by created_at descending
-        all_tickets.sort(key=lambda x: x.get('order_date', ''), reverse=True)
-        return all_tickets
+        for row in rows:
+            ticket_dict = row.Ticket.to_dict()
+
+            # Ticket type, event and venue info
+            ticket_dict['ticket_type_name'] = row.type_name
+            ticket_dict['ticket_type_description'] = row.description
+            ticket_dict['event_id'] = row.event_id
+            ticket_dict['event_name'] = row.event_name
+            ticket_dict['event_date'] = row.start_datetime.isoformat() if row.start_datetime else None
+            ticket_dict['event_status'] = row.status
+            ticket_dict['banner_image_url'] = row.banner_image_url
+            if row.venue_name is not None:
+                ticket_dict['venue_name'] = row.venue_name
+                ticket_dict['venue_address'] = f"{row.address}, {row.city}"
+
+            # Add order info
+            ticket_dict['order_code'] = row.order_code
+            ticket_dict['order_status'] = row.order_status
+            ticket_dict['order_date'] = row.created_at.isoformat() if row.created_at else None
+
+            all_tickets.append(ticket_dict)
+
+        return all_tickets, next_cursor
 
 
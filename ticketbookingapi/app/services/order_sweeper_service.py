@@ -0,0 +1,173 @@
+"""
+Expired order sweeper
+Cancels PENDING orders that outlived the payment window with set-based
+statements, in bounded chunks of one short transaction each: orders, their
+tickets and their RESERVED seats are flipped with one UPDATE per table per
+chunk, general-admission tickets and discount uses are given back, and the
+released seats go out on the regular seat broadcast path once each chunk
+commits.
+"""
+
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import update
+
+from app.config import Config
+from app.extensions import db
+from app.models.order import Order
+from app.models.seat import Seat
+from app.models.ticket import Ticket
+from app.services.discount_service import DiscountService
+from app.services.inventory_service import InventoryService
+from app.utils.datetime_utils import now_gmt7
+from app.utils.seat_state_log import record_seat_changes_on_commit
+
+
+class OrderSweeperService:
+    _metrics_lock = threading.Lock()
+    _metrics = {
+        'runs': 0,
+        'chunks': 0,
+        'orders_cancelled': 0,
+        'seats_released': 0,
+        'errors': 0,
+        'last_run_at': None,
+        'last_run_orders': 0,
+        'last_run_seconds': 0.0,
+        'last_run_orders_per_second': 0.0
+    }
+
+    @staticmethod
+    def sweep_chunk(threshold, chunk_size: int) -> Tuple[int, int]:
+        """
+        Cancel up to `chunk_size` expired PENDING orders in one transaction
+
+        Orders are claimed with FOR UPDATE SKIP LOCKED, so sweepers running
+        in several processes never wait on each other or on a checkout that
+        is paying the same order.
+
+        Returns:
+            (cancelled orders, released seats)
+        """
+        try:
+            order_ids = [
+                order_id for (order_id,) in db.session.query(Order.order_id).filter(
+                    Order.order_status == 'PENDING',
+                    Order.created_at < threshold
+                ).order_by(Order.order_id).limit(chunk_size).with_for_update(skip_locked=True)
+            ]
+            if not order_ids:
+                db.session.rollback()
+                return 0, 0
+
+            tickets = db.session.query(Ticket.ticket_type_id, Ticket.seat_id).filter(
+                Ticket.order_id.in_(order_ids)
+            ).all()
+
+            # Seats still held by these orders (BOOKED means payment went through)
+            released_seat_ids = []
+            seat_ids = {ticket.seat_id for ticket in tickets if ticket.seat_id}
+            if seat_ids:
+                released_seat_ids = [
+                    seat_id for (seat_id,) in db.session.query(Seat.seat_id).filter(
+                        Seat.seat_id.in_(seat_ids),
+                        Seat.status == 'RESERVED'
+                    ).with_for_update()
+                ]
+            if released_seat_ids:
+                db.session.execute(
+                    update(Seat)
+                    .where(Seat.seat_id.in_(released_seat_ids), Seat.status == 'RESERVED')
+                    .values(status='AVAILABLE')
+                    .execution_options(synchronize_session=False)
+                )
+
+            db.session.execute(
+                update(Ticket)
+                .where(Ticket.order_id.in_(order_ids))
+                .values(ticket_status='CANCELLED')
+                .execution_options(synchronize_session=False)
+            )
+            db.session.execute(
+                update(Order)
+                .where(Order.order_id.in_(order_ids), Order.order_status == 'PENDING')
+                .values(order_status='CANCELLED', updated_at=now_gmt7())
+                .execution_options(synchronize_session=False)
+            )
+
+            InventoryService.release_tickets_on_commit(tickets)
+            DiscountService.release_for_orders(order_ids)
+            record_seat_changes_on_commit(released_seat_ids, 'AVAILABLE')
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(order_ids), len(released_seat_ids)
+
+    @classmethod
+    def sweep(
+        cls,
+        older_than_minutes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_chunks: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Cancel every expired PENDING order, one chunk at a time
+
+        Args:
+            older_than_minutes: Payment window (default ORDER_PENDING_TIMEOUT_MINUTES)
+            chunk_size: Orders per transaction (default ORDER_SWEEP_BATCH_SIZE)
+            max_chunks: Stop after this many chunks (None = until done)
+
+        Returns:
+            (cancelled orders, released seats)
+        """
+        if older_than_minutes is None:
+            older_than_minutes = Config.ORDER_PENDING_TIMEOUT_MINUTES
+        chunk_size = chunk_size or Config.ORDER_SWEEP_BATCH_SIZE
+        threshold = now_gmt7() - timedelta(minutes=older_than_minutes)
+
+        started = time.perf_counter()
+        cancelled_count = 0
+        released_count = 0
+        chunks = 0
+        try:
+            while max_chunks is None or chunks < max_chunks:
+                cancelled, released = cls.sweep_chunk(threshold, chunk_size)
+                if cancelled:
+                    chunks += 1
+                cancelled_count += cancelled
+                released_count += released
+                if cancelled < chunk_size:
+                    break
+        except Exception:
+            with cls._metrics_lock:
+                cls._metrics['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with cls._metrics_lock:
+                metrics = cls._metrics
+                metrics['runs'] += 1
+                metrics['chunks'] += chunks
+                metrics['orders_cancelled'] += cancelled_count
+                metrics['seats_released'] += released_count
+                metrics['last_run_at'] = now_gmt7().isoformat()
+                metrics['last_run_orders'] = cancelled_count
+                metrics['last_run_seconds'] = round(elapsed, 4)
+                metrics['last_run_orders_per_second'] = round(cancelled_count / elapsed, 1) if elapsed > 0 else 0.0
+
+        if cancelled_count:
+            print(
+                f"Order sweeper: cancelled {cancelled_count} orders, released {released_count} seats "
+                f"in {chunks} chunks ({elapsed:.3f}s)"
+            )
+        return cancelled_count, released_count
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Any]:
+        with cls._metrics_lock:
+            return dict(cls._metrics)
@@ -5,6 +5,8 @@ from app.utils.datetime_utils import now_gmt7, parse_to_gmt7
 from werkzeug.utils import secure_filename
 from sqlalchemy import text
 from app.extensions import db
+from app.utils.inventory_counter import get_inventory_counter
+from app.services.event_card_service import EventCardService
 from app.utils.upload_helper import save_event_image, save_vietqr_image, allowed_file, ALLOWED_IMAGE_EXTENSIONS
 
 # Keep for backward compatibility
@@ -314,6 +316,7 @@ class OrganizerEventService:
                 if 'start_datetime' in st_data and 'end_datetime' in st_data:
                     OrganizerEventService.add_showtime(event_id, st_data)
         
+        EventCardService.refresh_events([event_id])
         return OrganizerEventService._fetch_event(event_id)
 
     @staticmethod
@@ -475,6 +478,7 @@ class OrganizerEventService:
                 if 'start_datetime' in st_data and 'end_datetime' in st_data:
                     OrganizerEventService.add_showtime(event_id, st_data)
 
+        EventCardService.refresh_events([event_id])
         return OrganizerEventService._fetch_event(event_id)
 
 
@@ -634,6 +638,7 @@ class OrganizerEventService:
                             })
                 db.session.commit()
             
+        EventCardService.refresh_events([event_id, new_event_id])
         return OrganizerEventService._fetch_event(new_event_id)
 
     @staticmethod
@@ -666,6 +671,7 @@ class OrganizerEventService:
         update_sql = text("UPDATE Event SET status = 'DELETED', updated_at = :now WHERE event_id = :id")
         db.session.execute(update_sql, {"id": event_id, "now": now_gmt7()})
         db.session.commit()
+        EventCardService.refresh_events([event_id])
         
         return True
 
@@ -725,6 +731,7 @@ class OrganizerEventService:
         # Commit all successful deletions
         if results['success_count'] > 0:
             db.session.commit()
+            EventCardService.refresh_events(results['deleted_event_ids'])
         
         return results
 
@@ -759,6 +766,7 @@ class OrganizerEventService:
             "d": data.get('description')
         })
         db.session.commit()
+        EventCardService.refresh_events([event_id])
         
         new_id = res.lastrowid
         # Fetch and return wrapper
@@ -799,6 +807,10 @@ class OrganizerEventService:
             sql = f"UPDATE TicketType SET {', '.join(update_fields)} WHERE ticket_type_id = :id"
             db.session.execute(text(sql), params)
             db.session.commit()
+            EventCardService.refresh_events([row.event_id])
+            if 'q' in params:
+                # Reload the GA inventory counter with the new quantity
+                get_inventory_counter().reset([ticket_type_id])
             
         # Return updated wrapper
         row = db.session.execute(check_query, {"id": ticket_type_id}).fetchone()
@@ -811,7 +823,7 @@ class OrganizerEventService:
 
     @staticmethod
     def delete_ticket_type(ticket_type_id):
-        check_query = text("SELECT sold_quantity FROM TicketType WHERE ticket_type_id = :id")
+        check_query = text("SELECT sold_quantity, event_id FROM TicketType WHERE ticket_type_id = :id")
         row = db.session.execute(check_query, {"id": ticket_type_id}).fetchone()
         if not row:
              raise ValueError('Ticket type not found')
@@ -822,47 +834,10 @@ class OrganizerEventService:
         del_sql = text("DELETE FROM TicketType WHERE ticket_type_id = :id")
         db.session.execute(del_sql, {"id": ticket_type_id})
         db.session.commit()
+        EventCardService.refresh_events([row.event_id])
         return True
 
     @staticmethod
     def get_recommended_events(event_id, limit=4):
-        # 1. Get current event's category
-        query_cat = text("SELECT category_id FROM Event WHERE event_id = :id")
-        res_cat = db.session.execute(query_cat, {"id": event_id}).fetchone()
-        if not res_cat:
-            return []
-        
-        category_id = res_cat.category_id
-
-        # 2. Fetch related Event in same category, different event_id
-        # Use subquery for min price to avoid GROUP BY issues
-        # Filter to group showtimes: Only show one record per group_id
-        sql = text("""
-            SELECT e.event_id, e.event_name, e.banner_image_url, e.start_datetime,
-                   (SELECT MIN(tt.price) FROM TicketType tt WHERE tt.event_id = e.event_id) as min_price
-            FROM Event e
-            WHERE e.category_id = :cat_id
-              AND e.event_id != :eid
-              AND e.status = 'PUBLISHED'
-              AND (e.group_id IS NULL OR e.event_id = (SELECT MIN(event_id) FROM Event WHERE group_id = e.group_id))
-            ORDER BY e.start_datetime ASC
-            LIMIT :limit
-        """)
-        
-        events_rows = db.session.execute(sql, {"cat_id": category_id, "eid": event_id, "limit": limit}).fetchall()
-        
-        results = []
-        for row in events_rows:
-            results.append({
-                "event_id": row.event_id,
-                "event_name": row.event_name,
-                "banner_image_url": row.banner_image_url,
-                "start_datetime": row.start_datetime.isoformat() if row.start_datetime else None,
-                "min_price": float(row.min_price) if row.min_price is not None else 0
-            })
-            
-        return results
-
-
-
-
+        # Same category, one card per showtime group, from the event card read model
+        return EventCardService.get_recommended(event_id, limit)
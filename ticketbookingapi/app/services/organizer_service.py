@@ -15,6 +15,8 @@ from app.models.seat import Seat
 from app.models.organizer_info import OrganizerInfo
 from app.models.user import User
 from app.utils.datetime_utils import now_gmt7
+from app.services.inventory_service import InventoryService
+from app.utils.seat_state_log import record_seat_changes_on_commit
 
 # Keep for backward compatibility
 ALLOWED_EXTENSIONS = ALLOWED_IMAGE_EXTENSIONS
@@ -52,28 +54,15 @@ class OrganizerService:
             if ticket.seat_id:
                 db.session.execute(text("UPDATE Seat SET status = 'AVAILABLE' WHERE seat_id = :sid"), {"sid": ticket.seat_id})
             
-            # Update sold counts
-            tt_id = ticket.ticket_type_id
-            
-            # Decrement ticket_type sold_quantity
-            db.session.execute(text("""
-                UPDATE TicketType 
-                SET sold_quantity = GREATEST(0, sold_quantity - 1) 
-                WHERE ticket_type_id = :tid
-            """), {"tid": tt_id})
-            
-            # Decrement event sold_tickets
-            # Need event_id from ticket_type
-            tt_row = db.session.execute(text("SELECT event_id FROM TicketType WHERE ticket_type_id = :tid"), {"tid": tt_id}).fetchone()
-            if tt_row:
-                db.session.execute(text("""
-                    UPDATE Event 
-                    SET sold_tickets = GREATEST(0, sold_tickets - 1) 
-                    WHERE event_id = :eid
-                """), {"eid": tt_row.event_id})
-            
             # Delete ticket
             db.session.execute(text("DELETE FROM Ticket WHERE ticket_id = :tid"), {"tid": ticket.ticket_id})
+        
+        # Freed seats are logged and broadcast once the refund is committed
+        record_seat_changes_on_commit([ticket.seat_id for ticket in tickets], 'AVAILABLE')
+        
+        # Sold counts are reconciled after commit; GA tickets go back on sale
+        InventoryService.release_tickets_on_commit(tickets)
+        InventoryService.reconcile_sold_on_commit({ticket.ticket_type_id for ticket in tickets})
             
         db.session.commit()
         return True
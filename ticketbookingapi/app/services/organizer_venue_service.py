@@ -1,5 +1,6 @@
 from sqlalchemy import text
 from app.extensions import db
+from app.services.event_card_service import EventCardService
 from datetime import datetime
 import json
 
@@ -180,6 +181,8 @@ class OrganizerVenueService:
             sql = f"UPDATE Venue SET {', '.join(update_fields)} WHERE venue_id = :venue_id"
             db.session.execute(text(sql), params)
             db.session.commit()
+            # Venue status and city show on event cards
+            EventCardService.refresh_venue(venue_id)
             
         # Return updated
         result = db.session.execute(check_query, {"venue_id": venue_id})
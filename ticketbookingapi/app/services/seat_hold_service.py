@@ -0,0 +1,360 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import Config
+from app.extensions import db
+from app.exceptions import ConflictException, NotFoundException, InternalServerException
+from app.models.event import Event
+from app.models.order import Order
+from app.models.seat import Seat
+from app.models.ticket import Ticket
+from app.models.ticket_type import TicketType
+from app.services.seat_map_service import SeatMapService
+from app.utils.redis_reservation_manager import get_redis_reservation_manager
+from app.utils.hold_expiry_scheduler import get_hold_expiry_scheduler
+from app.utils.broadcast_coalescer import publish_seat_changes
+
+# Seat statuses a hold may be placed on. RESERVED seats without a live hold
+# are stale (the hold expired before the DB was cleaned up) and can be re-held,
+# unless they belong to a pending order (see pending_order_seats).
+HOLDABLE_STATUSES = ('AVAILABLE', 'RESERVED')
+
+
+def pending_order_seats(seat_ids: Iterable[int]):
+    """Subquery of the given seats that are taken by a PENDING order's tickets"""
+    return db.select(Ticket.seat_id).join(
+        Order, Order.order_id == Ticket.order_id
+    ).where(
+        Ticket.seat_id.in_(list(seat_ids)),
+        Order.order_status == 'PENDING'
+    )
+
+
+def requested_seat_ids(data) -> List[Any]:
+    """Seat IDs of a lock/unlock request: a single `seat_id` or a batch `seat_ids` list"""
+    seat_ids = data.get('seat_ids')
+    if seat_ids:
+        return seat_ids if isinstance(seat_ids, list) else [seat_ids]
+    seat_id = data.get('seat_id')
+    return [seat_id] if seat_id else []
+
+
+class SeatHoldService:
+    """Seat hold engine shared by the REST and Socket.IO seat selection paths"""
+
+    @staticmethod
+    def _get_manager():
+        reservation_manager = get_redis_reservation_manager()
+        if not reservation_manager:
+            raise InternalServerException(
+                message='Reservation service unavailable',
+                status_code=503,
+                error_code='SERVICE_UNAVAILABLE'
+            )
+        return reservation_manager
+
+    @staticmethod
+    def _load_event_seats(event_id: int, seat_ids: List[int]):
+        """Fetch the requested seats of an event in one query"""
+        return db.session.query(
+            Seat.seat_id,
+            Seat.status,
+            Seat.row_name,
+            Seat.seat_number
+        ).join(TicketType).filter(
+            TicketType.event_id == event_id,
+            Seat.seat_id.in_(seat_ids)
+        ).all()
+
+    @staticmethod
+    def _set_status(seat_ids: List[int], status: str, from_statuses: Iterable[str]) -> None:
+        """
+        Bulk status transition for a set of seats (seats of a pending order
+        are never freed: their hold was consumed by checkout)
+        """
+        if not seat_ids:
+            return
+        query = Seat.query.filter(
+            Seat.seat_id.in_(seat_ids),
+            Seat.status.in_(list(from_statuses))
+        )
+        if status == 'AVAILABLE':
+            query = query.filter(Seat.seat_id.notin_(pending_order_seats(seat_ids)))
+        query.update({Seat.status: status}, synchronize_session=False)
+
+    @classmethod
+    def _write_status(cls, seat_ids: List[int], status: str, from_statuses: Iterable[str]) -> None:
+        """
+        Persist a hold-driven status transition
+
+        With SEAT_STATE_WRITE_BEHIND the hold state stays in Redis and the
+        seats are only queued for the background flusher; otherwise the
+        transition is committed right away.
+        """
+        if not seat_ids:
+            return
+        if Config.SEAT_STATE_WRITE_BEHIND:
+            cls._get_manager().mark_seats_dirty(seat_ids)
+            return
+        try:
+            cls._set_status(seat_ids, status, from_statuses)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    def hold_seats(
+        cls,
+        event_id: int,
+        user_id: int,
+        seat_ids: Iterable[int],
+        ttl: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Hold one or more seats of an event for a user, all-or-nothing
+
+        Args:
+            event_id: Event ID
+            user_id: User ID
+            seat_ids: Seat IDs to hold
+            ttl: Hold duration in seconds (default: reservation manager default)
+
+        Returns:
+            Dict with 'held' (reservation data per seat) and 'new_seat_ids'
+            (seats that were not already held by this user)
+
+        Raises:
+            NotFoundException: event or seats do not exist
+            ConflictException: a seat is booked or held by another user
+        """
+        reservation_manager = cls._get_manager()
+        seat_ids = reservation_manager.normalize_seat_ids(seat_ids)
+        event_id = int(event_id)
+        user_id = int(user_id)
+
+        seats = cls._load_event_seats(event_id, seat_ids)
+        found = {s.seat_id: s for s in seats}
+        missing = [seat_id for seat_id in seat_ids if seat_id not in found]
+        if missing:
+            if not seats and not db.session.query(Event.event_id).filter(Event.event_id == event_id).first():
+                raise NotFoundException(message=f'Event not found (event_id: {event_id})')
+            raise NotFoundException(
+                message=f'Seat not found (seat_id: {missing[0]})',
+                payload={'seat_ids': missing}
+            )
+
+        unavailable = [s.seat_id for s in seats if s.status not in HOLDABLE_STATUSES]
+        if not unavailable:
+            unavailable = db.session.execute(pending_order_seats(seat_ids)).scalars().all()
+        if unavailable:
+            raise ConflictException(
+                message='Seat is not available',
+                payload={'seat_ids': unavailable}
+            )
+
+        result = reservation_manager.hold_seats(event_id, user_id, seat_ids, ttl=ttl)
+        if not result['success']:
+            raise ConflictException(
+                message='Seat is already reserved by another user',
+                payload={'seat_ids': result['conflicts']}
+            )
+
+        # Decided by the hold script itself, so concurrent holds cannot skew it
+        new_seat_ids = result['acquired']
+        try:
+            cls._write_status(new_seat_ids, 'RESERVED', ('AVAILABLE',))
+        except Exception:
+            reservation_manager.release_seats(event_id, user_id, new_seat_ids)
+            raise
+
+        scheduler = get_hold_expiry_scheduler()
+        if scheduler:
+            hold_ttl = ttl or reservation_manager.default_ttl
+            for seat_id in new_seat_ids:
+                scheduler.schedule(seat_id, event_id, user_id, hold_ttl)
+
+        if new_seat_ids:
+            changes = {seat_id: 'RESERVED' for seat_id in new_seat_ids}
+            publish_seat_changes(event_id, changes, SeatMapService.record_changes(event_id, changes))
+
+        return {'held': result['held'], 'new_seat_ids': new_seat_ids}
+
+    @classmethod
+    def release_seats(
+        cls,
+        event_id: int,
+        user_id: int,
+        seat_ids: Iterable[int]
+    ) -> List[int]:
+        """
+        Release seats held by a user and mark them AVAILABLE again
+
+        Args:
+            event_id: Event ID
+            user_id: User ID
+            seat_ids: Seat IDs to release
+
+        Returns:
+            List of seat IDs that were released
+        """
+        reservation_manager = cls._get_manager()
+        event_id = int(event_id)
+
+        released = reservation_manager.release_seats(event_id, user_id, seat_ids)
+        if not released:
+            return []
+
+        cls._write_status(released, 'AVAILABLE', ('RESERVED',))
+
+        scheduler = get_hold_expiry_scheduler()
+        if scheduler:
+            for seat_id in released:
+                scheduler.cancel(seat_id)
+
+        changes = {seat_id: 'AVAILABLE' for seat_id in released}
+        publish_seat_changes(event_id, changes, SeatMapService.record_changes(event_id, changes))
+
+        return released
+
+    @classmethod
+    def release_user_seats(cls, event_id: int, user_id: int) -> List[int]:
+        """Release every seat a user currently holds in an event"""
+        reservation_manager = cls._get_manager()
+        reservations = reservation_manager.get_user_reservations(int(user_id), int(event_id))
+        seat_ids = [r.get('seat_id') for r in reservations if r.get('seat_id')]
+        return cls.release_seats(event_id, user_id, seat_ids)
+
+    @classmethod
+    def release_expired_holds(cls, expired: List[Dict[str, int]]) -> Dict[int, List[int]]:
+        """
+        Return seats of expired holds to AVAILABLE
+
+        All seats are flipped with one UPDATE and each event room gets one
+        batched `seats_updated` broadcast. If the UPDATE fails the seats are
+        queued for flush_seat_state to retry.
+
+        Args:
+            expired: Expired holds as returned by RedisReservationManager.reap_expired
+
+        Returns:
+            Dict of event_id -> released seat IDs
+        """
+        by_event: Dict[int, List[int]] = {}
+        for hold in expired:
+            by_event.setdefault(hold['event_id'], []).append(hold['seat_id'])
+        if not by_event:
+            return {}
+
+        seat_ids = [seat_id for ids in by_event.values() for seat_id in ids]
+        try:
+            cls._write_status(seat_ids, 'AVAILABLE', ('RESERVED',))
+        except Exception as e:
+            # The holds are already gone from Redis: queue the seats so the
+            # reconciler retries the write instead of leaving them RESERVED
+            cls._get_manager().mark_seats_dirty(seat_ids)
+            print(f"Error releasing expired holds, queued for retry: {str(e)}")
+
+        for event_id, ids in by_event.items():
+            changes = {seat_id: 'AVAILABLE' for seat_id in ids}
+            publish_seat_changes(event_id, changes, SeatMapService.record_changes(event_id, changes))
+
+        return by_event
+
+    @classmethod
+    def expire_holds(cls, holds: List[Dict[str, Any]]) -> Dict[int, List[int]]:
+        """
+        Release the given holds if they have expired (hold expiry scheduler ticks)
+
+        Holds that have not expired yet in Redis are rescheduled; holds that
+        were released or checked out in the meantime are skipped.
+
+        Args:
+            holds: Due scheduler entries ({'seat_id', 'event_id', 'user_id', ...})
+
+        Returns:
+            Dict of event_id -> released seat IDs
+        """
+        reservation_manager = get_redis_reservation_manager()
+        if not reservation_manager:
+            return {}
+
+        result = reservation_manager.reap_holds(holds)
+        scheduler = get_hold_expiry_scheduler()
+        if scheduler:
+            for hold in result['live']:
+                scheduler.schedule(hold['seat_id'], hold['event_id'], hold['user_id'], scheduler.tick_seconds)
+        return cls.release_expired_holds(result['expired'])
+
+    @classmethod
+    def expire_seat_holds(cls, seat_ids: Iterable[int]) -> Dict[int, List[int]]:
+        """
+        Release the holds of seats whose hold keys Redis reported as expired
+
+        The expired key carries only the seat ID, so the event comes from the
+        seat's ticket type and the holder from the event's hold index.
+
+        Returns:
+            Dict of event_id -> released seat IDs
+        """
+        reservation_manager = get_redis_reservation_manager()
+        if not reservation_manager:
+            return {}
+        seat_ids = reservation_manager.normalize_seat_ids(seat_ids)
+        if not seat_ids:
+            return {}
+
+        rows = db.session.query(Seat.seat_id, TicketType.event_id).join(
+            TicketType, TicketType.ticket_type_id == Seat.ticket_type_id
+        ).filter(Seat.seat_id.in_(seat_ids)).all()
+        by_event: Dict[int, List[int]] = {}
+        for seat_id, event_id in rows:
+            by_event.setdefault(event_id, []).append(seat_id)
+
+        holds = []
+        for event_id, ids in by_event.items():
+            holds.extend(reservation_manager.get_expired_index_holds(event_id, ids))
+        return cls.expire_holds(holds)
+
+    @staticmethod
+    def get_live_holds(event_id: int) -> Dict[int, int]:
+        """Live holds of an event as seat_id -> user_id ({} when holds are unavailable)"""
+        reservation_manager = get_redis_reservation_manager()
+        if not reservation_manager:
+            return {}
+        return reservation_manager.get_event_holds(event_id)
+
+    @classmethod
+    def flush_seat_state(cls, batch_size: Optional[int] = None) -> int:
+        """
+        Reconcile queued seats' MySQL status with Redis (the write-behind
+        flusher, and the retry path for failed hold releases)
+
+        Held seats are snapshotted as RESERVED and seats without a hold go
+        back to AVAILABLE, except seats that belong to a pending order (their
+        hold was consumed by checkout) and seats that are already BOOKED.
+
+        Returns:
+            Number of seats reconciled
+        """
+        reservation_manager = get_redis_reservation_manager()
+        if not reservation_manager:
+            return 0
+
+        seat_ids = reservation_manager.pop_dirty_seats(batch_size or Config.SEAT_STATE_FLUSH_BATCH_SIZE)
+        if not seat_ids:
+            return 0
+
+        owners = reservation_manager.get_hold_owners(seat_ids)
+        held = [seat_id for seat_id in seat_ids if seat_id in owners]
+        free = [seat_id for seat_id in seat_ids if seat_id not in owners]
+        try:
+            cls._set_status(held, 'RESERVED', ('AVAILABLE',))
+            cls._set_status(free, 'AVAILABLE', ('RESERVED',))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Keep the seats queued so the next flush retries them
+            reservation_manager.mark_seats_dirty(seat_ids)
+            raise
+
+        return len(seat_ids)
@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.extensions import db, get_redis
+from app.models.seat import Seat
+from app.models.ticket_type import TicketType
+from app.utils.redis_reservation_manager import get_redis_reservation_manager
+from app.utils.seat_state_log import get_seat_state_log
+from app.utils.seat_status_bitmap import get_seat_status_bitmap
+
+# 2-bit seat state codes used by the status bitmap
+SEAT_STATUS_CODES = {
+    'AVAILABLE': 0,
+    'RESERVED': 1,
+    'LOCKED': 1,
+    'BOOKED': 2,
+}
+UNAVAILABLE_CODE = 3  # inactive seats and unknown statuses
+
+# Layout columns, in the order they are serialized
+LAYOUT_COLUMNS = ('seat_id', 'row_name', 'seat_number', 'ticket_type_id', 'area_name', 'x_pos', 'y_pos')
+
+
+class SeatMapService:
+    """
+    Compact seat map representation
+
+    The static part of a seat map (positions, labels, ticket types) is a
+    columnar layout blob built once per event and cached. The dynamic part is
+    a status vector with 2 bits per seat, in layout order: seat i occupies
+    bits 2*(i % 4) and 2*(i % 4) + 1 of byte i // 4. The vector is kept up to
+    date by record_changes (see app.utils.seat_status_bitmap) and only read
+    from the database when it is missing.
+    """
+
+    # event_id -> (layout_version, layout, seat_id -> position)
+    _layouts: Dict[int, Tuple[str, Dict[str, Any], Dict[int, int]]] = {}
+    _layouts_lock = threading.Lock()
+
+    @staticmethod
+    def _layout_key(event_id: int) -> str:
+        return f"{Config.REDIS_SEAT_LAYOUT_PREFIX}{event_id}"
+
+    @staticmethod
+    def _layout_version_key(event_id: int) -> str:
+        return f"{Config.REDIS_SEAT_LAYOUT_PREFIX}{event_id}:version"
+
+    @staticmethod
+    def _build_layout(event_id: int) -> Dict[str, Any]:
+        """Query the static seat data of an event into a columnar blob"""
+        rows = db.session.query(
+            Seat.seat_id,
+            Seat.row_name,
+            Seat.seat_number,
+            Seat.ticket_type_id,
+            Seat.area_name,
+            Seat.x_pos,
+            Seat.y_pos
+        ).join(TicketType).filter(
+            TicketType.event_id == event_id
+        ).order_by(Seat.seat_id).all()
+
+        columns = {name: [] for name in LAYOUT_COLUMNS}
+        for row in rows:
+            for name, value in zip(LAYOUT_COLUMNS, row):
+                columns[name].append(value)
+        return {
+            'event_id': event_id,
+            'count': len(rows),
+            'columns': columns
+        }
+
+    @classmethod
+    def _remember(cls, event_id: int, version: str, layout: Dict[str, Any]):
+        positions = {seat_id: i for i, seat_id in enumerate(layout['columns']['seat_id'])}
+        entry = (version, layout, positions)
+        with cls._layouts_lock:
+            cls._layouts[event_id] = entry
+        return entry
+
+    @classmethod
+    def _get_layout_entry(cls, event_id: int, build: bool = True) -> Optional[Tuple[str, Dict[str, Any], Dict[int, int]]]:
+        """
+        Get the cached layout of an event
+
+        The in-process copy is revalidated against the layout version kept in
+        Redis (one small GET), so an invalidation by any worker is seen by all.
+        With build=False nothing is read from the database (None if the
+        layout is not cached).
+        """
+        event_id = int(event_id)
+        with cls._layouts_lock:
+            cached = cls._layouts.get(event_id)
+
+        redis_client = get_redis()
+        if redis_client is None:
+            if cached or not build:
+                return cached
+            layout = cls._build_layout(event_id)
+            return cls._remember(event_id, cls._version_of(layout), layout)
+
+        try:
+            version = redis_client.get(cls._layout_version_key(event_id))
+            if cached and version == cached[0]:
+                return cached
+            if version:
+                blob = redis_client.get(cls._layout_key(event_id))
+                if blob:
+                    return cls._remember(event_id, version, json.loads(blob))
+            if not build:
+                return None
+
+            layout = cls._build_layout(event_id)
+            version = cls._version_of(layout)
+            blob = json.dumps(layout, separators=(',', ':'))
+            pipe = redis_client.pipeline()
+            pipe.setex(cls._layout_key(event_id), Config.SEAT_LAYOUT_CACHE_TTL, blob)
+            pipe.setex(cls._layout_version_key(event_id), Config.SEAT_LAYOUT_CACHE_TTL, version)
+            pipe.execute()
+            return cls._remember(event_id, version, layout)
+        except Exception as e:
+            print(f"Error reading seat layout cache from Redis: {str(e)}")
+            if cached or not build:
+                return cached
+            layout = cls._build_layout(event_id)
+            return cls._remember(event_id, cls._version_of(layout), layout)
+
+    @staticmethod
+    def _version_of(layout: Dict[str, Any]) -> str:
+        blob = json.dumps(layout['columns'], separators=(',', ':'))
+        return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+    @classmethod
+    def get_layout(cls, event_id: int) -> Dict[str, Any]:
+        """
+        Get the static layout blob of an event
+
+        Returns:
+            Dict with 'event_id', 'layout_version', 'count' and 'columns'
+            (one list per field in LAYOUT_COLUMNS, all in layout order)
+        """
+        version, layout, _ = cls._get_layout_entry(event_id)
+        return {**layout, 'layout_version': version}
+
+    @classmethod
+    def invalidate_layout(cls, event_id: int) -> None:
+        """Drop the cached layout of an event (call after seats are added or removed)"""
+        event_id = int(event_id)
+        with cls._layouts_lock:
+            cls._layouts.pop(event_id, None)
+        # Seat diffs across a layout change are meaningless; force a full resync
+        get_seat_status_bitmap().invalidate(event_id)
+        get_seat_state_log().reset(event_id)
+        redis_client = get_redis()
+        if redis_client is not None:
+            try:
+                redis_client.delete(cls._layout_key(event_id), cls._layout_version_key(event_id))
+            except Exception as e:
+                print(f"Error invalidating seat layout cache: {str(e)}")
+
+    @staticmethod
+    def pack_status_codes(codes: List[int]) -> bytes:
+        """Pack 2-bit status codes, four seats per byte"""
+        packed = bytearray((len(codes) + 3) // 4)
+        for i, code in enumerate(codes):
+            if code:
+                packed[i >> 2] |= code << ((i & 3) << 1)
+        return bytes(packed)
+
+    @staticmethod
+    def unpack_status_codes(packed: bytes, count: int) -> List[int]:
+        """Inverse of pack_status_codes"""
+        return [(packed[i >> 2] >> ((i & 3) << 1)) & 3 for i in range(count)]
+
+    @classmethod
+    def _build_status_codes(cls, event_id: int, layout: Dict[str, Any], positions: Dict[int, int]) -> List[int]:
+        """Read the status code of every seat of an event from the database"""
+        codes = [UNAVAILABLE_CODE] * layout['count']
+
+        rows = db.session.query(
+            Seat.seat_id,
+            Seat.status,
+            Seat.is_active
+        ).join(TicketType).filter(TicketType.event_id == event_id).all()
+        for seat_id, status, is_active in rows:
+            position = positions.get(seat_id)
+            if position is None:
+                continue
+            if is_active is False:
+                codes[position] = UNAVAILABLE_CODE
+            else:
+                codes[position] = SEAT_STATUS_CODES.get(status, UNAVAILABLE_CODE)
+
+        # With write-behind the DB only knows BOOKED; live holds come from Redis
+        reservation_manager = get_redis_reservation_manager()
+        if Config.SEAT_STATE_WRITE_BEHIND and reservation_manager:
+            for seat_id in reservation_manager.get_event_holds(event_id):
+                position = positions.get(seat_id)
+                if position is not None and codes[position] == SEAT_STATUS_CODES['AVAILABLE']:
+                    codes[position] = SEAT_STATUS_CODES['RESERVED']
+
+        return codes
+
+    @classmethod
+    def get_status_bitmap(cls, event_id: int) -> Tuple[str, int, bytes]:
+        """
+        Packed 2-bit status codes of an event, in layout order
+
+        Served from the maintained bitmap; the seats are only read from the
+        database when it is missing.
+
+        Returns:
+            Tuple of (layout_version, count, packed)
+        """
+        event_id = int(event_id)
+        version, layout, positions = cls._get_layout_entry(event_id)
+        bitmap = get_seat_status_bitmap()
+        packed = bitmap.get(event_id, version)
+        expected_size = (layout['count'] + 3) // 4
+        if packed is not None and len(packed) >= expected_size:
+            return version, layout['count'], packed[:expected_size]
+
+        token = bitmap.begin_rebuild(event_id)
+        packed = cls.pack_status_codes(cls._build_status_codes(event_id, layout, positions))
+        bitmap.store(event_id, version, packed, token)
+        return version, layout['count'], packed
+
+    @classmethod
+    def get_status_codes(cls, event_id: int) -> Tuple[str, List[int]]:
+        """
+        Current 2-bit status code of every seat of an event, in layout order
+
+        Returns:
+            Tuple of (layout_version, codes)
+        """
+        version, count, packed = cls.get_status_bitmap(event_id)
+        return version, cls.unpack_status_codes(packed, count)
+
+    @classmethod
+    def record_changes(cls, event_id: int, changes: Dict[int, str]) -> int:
+        """
+        Apply seat status changes to the status bitmap and record them in the
+        seat state log (call once the changes are committed)
+
+        Args:
+            event_id: Event ID
+            changes: Dict of seat_id -> new status
+
+        Returns:
+            The new seat state version
+        """
+        event_id = int(event_id)
+        bitmap = get_seat_status_bitmap()
+        try:
+            # No database reads here: this also runs in after-commit hooks
+            entry = cls._get_layout_entry(event_id, build=False)
+            if entry is None:
+                bitmap.invalidate(event_id)
+            else:
+                version, _, positions = entry
+                codes = {
+                    positions[int(seat_id)]: SEAT_STATUS_CODES.get(status, UNAVAILABLE_CODE)
+                    for seat_id, status in changes.items()
+                    if int(seat_id) in positions
+                }
+                bitmap.apply(event_id, version, codes)
+        except Exception as e:
+            print(f"Error updating seat status bitmap: {str(e)}")
+            bitmap.invalidate(event_id)
+        # Bitmap first: a client that sees the new version also sees the new codes
+        return get_seat_state_log().record(event_id, changes)
+
+    @classmethod
+    def get_status_vector(cls, event_id: int) -> Dict[str, Any]:
+        """
+        Get the packed seat status vector of an event
+
+        Returns:
+            Dict with 'event_id', 'layout_version', 'count', 'encoding' and
+            'bitmap' (base64 of the packed 2-bit codes)
+        """
+        version, count, packed = cls.get_status_bitmap(event_id)
+        return {
+            'event_id': int(event_id),
+            'layout_version': version,
+            'count': count,
+            'encoding': '2bit-le',
+            'codes': {'AVAILABLE': 0, 'RESERVED': 1, 'BOOKED': 2, 'UNAVAILABLE': UNAVAILABLE_CODE},
+            'bitmap': base64.b64encode(packed).decode('ascii')
+        }
@@ -2,112 +2,65 @@
 Socket.IO event handlers for real-time seat reservation
 """
 from flask import request
-from app.extensions import socketio, db
-from app.models.seat import Seat
-from app.models.ticket_type import TicketType
-from app.models.event import Event
-from app.models.user import User
-from datetime import datetime, timedelta
-from app.utils.datetime_utils import now_gmt7
+from flask_socketio import join_room, leave_room
+from app.config import Config
+from app.extensions import socketio, db, get_redis
 from app.utils.redis_reservation_manager import get_redis_reservation_manager
+from app.services.seat_hold_service import SeatHoldService, requested_seat_ids
+from app.services.inventory_service import InventoryService
+from app.services.order_sweeper_service import OrderSweeperService
+from app.services.event_card_service import EventCardService
+from app.services.event_search_service import EventSearchService
+from app.utils.hold_expiry_scheduler import init_hold_expiry_scheduler
+from app.utils.redis_expiry_listener import RedisExpiryListener
+from app.utils.seat_state_log import get_seat_state_log
+from app.utils.broadcast_coalescer import init_broadcast_coalescer
+from app.exceptions import APIException
 import threading
 import time
 
-# Store active timers for seat reservations
-seat_timers = {}
-timer_lock = threading.Lock()
-
 # Reservation duration: 5 minutes
 RESERVATION_DURATION_MINUTES = 5
 
 def cleanup_expired_reservations():
-    """Clean up expired reservations - cleanup seats with RESERVED status but no active reservation in Redis"""
+    """Reconcile expired holds: release seats whose hold expired (fallback for missed expiry events)"""
     try:
         reservation_manager = get_redis_reservation_manager()
         if not reservation_manager:
             return
         
-        # Find all seats with RESERVED status
-        reserved_seats = Seat.query.filter(Seat.status == 'RESERVED').all()
-        
-        seats_to_release = []
-        for seat in reserved_seats:
-            # Check if reservation still exists in Redis
-            reservation = reservation_manager.get_reservation(seat.seat_id)
-            if not reservation:
-                # No active reservation, release the seat
-                seats_to_release.append(seat)
+        # Expired holds come from the Redis hold indexes, so the cost follows the
+        # number of expired holds instead of every RESERVED seat in the database
+        SeatHoldService.release_expired_holds(reservation_manager.reap_expired())
         
-        # Release seats that don't have active reservations
-        for seat in seats_to_release:
-            seat.status = 'AVAILABLE'
-            db.session.commit()
-            
-            # Emit to event room (we need event_id, try to get from ticket_type)
-            try:
-                ticket_type = TicketType.query.get(seat.ticket_type_id)
-                if ticket_type:
-                    event_id = ticket_type.event_id
-                    socketio.emit('seat_released', {
-                        'seat_id': seat.seat_id,
-                        'event_id': event_id
-                    }, room=f'event_{event_id}')
-            except Exception:
+        # Retry releases whose MySQL write failed (write-behind mode has its own flush loop)
+        if not Config.SEAT_STATE_WRITE_BEHIND:
+            while SeatHoldService.flush_seat_state() >= Config.SEAT_STATE_FLUSH_BATCH_SIZE:
                 pass
         
-        # Also cleanup expired reservations in fallback storage
-        reservation_manager.cleanup_expired()
-        
     except Exception as e:
         db.session.rollback()
         print(f"Error in cleanup_expired_reservations: {str(e)}")
 
-def start_seat_timer(seat_id, event_id, user_id):
-    """Start timer for seat reservation expiry"""
-    def release_seat():
-        time.sleep(RESERVATION_DURATION_MINUTES * 60)  # 5 minutes
-        
-        with timer_lock:
-            if seat_id in seat_timers:
-                del seat_timers[seat_id]
-        
-        # Check if reservation still exists in Redis
-        reservation_manager = get_redis_reservation_manager()
-        if reservation_manager:
-            reservation = reservation_manager.get_reservation(seat_id)
-            
-            # If reservation exists and belongs to this user, check if expired
-            if reservation and reservation.get('user_id') == user_id:
-                from datetime import datetime
-                expires_at = datetime.fromisoformat(reservation['expires_at'])
-                if expires_at < now_gmt7():
-                    # Expired, release the seat
-                    with db.session.begin():
-                        seat = Seat.query.get(seat_id)
-                        if seat and seat.status == 'RESERVED':
-                            seat.status = 'AVAILABLE'
-                            db.session.commit()
-                            
-                            # Delete reservation from Redis
-                            reservation_manager.delete_reservation(seat_id)
-                            
-                            # Emit to event room
-                            socketio.emit('seat_released', {
-                                'seat_id': seat_id,
-                                'event_id': event_id
-                            }, room=f'event_{event_id}')
-    
-    timer = threading.Thread(target=release_seat, daemon=True)
-    timer.start()
-    
-    with timer_lock:
-        seat_timers[seat_id] = timer
+def expire_due_holds(due_entries):
+    """Hold expiry scheduler callback: release the holds that fell due in one batch"""
+    try:
+        if _app_instance:
+            with _app_instance.app_context():
+                SeatHoldService.expire_holds(due_entries)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error releasing expired holds: {str(e)}")
 
-def cancel_seat_timer(seat_id):
-    """Cancel timer for seat reservation"""
-    with timer_lock:
-        if seat_id in seat_timers:
-            del seat_timers[seat_id]
+def release_expired_keys(seat_ids):
+    """Redis expired-key callback: release the holds of the seats whose hold keys expired"""
+    try:
+        if _app_instance:
+            with _app_instance.app_context():
+                SeatHoldService.expire_seat_holds(seat_ids)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error releasing expired holds: {str(e)}")
 
 @socketio.on('connect')
 def handle_connect():
@@ -124,8 +77,10 @@ def handle_join_event(data):
     """Join event room for seat updates"""
     event_id = data.get('event_id')
     if event_id:
+        # Membership is local to the process holding the connection; broadcasts
+        # reach it from any worker through the Socket.IO message queue
         room = f'event_{event_id}'
-        socketio.server.enter_room(request.sid, room)
+        join_room(room)
         print(f"Client {request.sid} joined room {room}")
 
 @socketio.on('leave_event')
@@ -134,140 +89,68 @@ def handle_leave_event(data):
     event_id = data.get('event_id')
     if event_id:
         room = f'event_{event_id}'
-        socketio.server.leave_room(request.sid, room)
+        leave_room(room)
         print(f"Client {request.sid} left room {room}")
 
+@socketio.on('sync_seats')
+def handle_sync_seats(data):
+    """Resync a (re)connecting client with the seat changes since its version"""
+    event_id = data.get('event_id')
+    since = data.get('since')
+    if not event_id or since is None:
+        return
+
+    try:
+        diff = get_seat_state_log().get_changes_since(int(event_id), int(since))
+        if diff is None:
+            # Change log no longer covers the client's version: reload the seat map
+            socketio.emit('seats_sync', {
+                'event_id': int(event_id),
+                'full': True
+            }, room=request.sid)
+            return
+
+        socketio.emit('seats_sync', {
+            'event_id': int(event_id),
+            'version': diff['version'],
+            'full': False,
+            'changes': [
+                {'seat_id': seat_id, 'status': status}
+                for seat_id, status in diff['changes'].items()
+            ]
+        }, room=request.sid)
+    except Exception as e:
+        print(f"Error syncing seats: {str(e)}")
+
 @socketio.on('lock_seat')
 def handle_lock_seat(data):
-    """Lock a seat for reservation"""
-    seat_id = data.get('seat_id')
+    """Lock one or more seats for reservation (all-or-nothing)"""
+    seat_ids = requested_seat_ids(data)
+    seat_id = data.get('seat_id') or (seat_ids[0] if seat_ids else None)
     user_id = data.get('user_id')
     event_id = data.get('event_id')
     
-    if not all([seat_id, user_id, event_id]):
+    if not all([seat_ids, user_id, event_id]):
         socketio.emit('seat_lock_error', {
             'seat_id': seat_id,
             'message': 'Missing required parameters'
         }, room=request.sid)
         return
     
-    reservation_manager = get_redis_reservation_manager()
-    if not reservation_manager:
+    try:
+        result = SeatHoldService.hold_seats(
+            event_id,
+            user_id,
+            seat_ids,
+            ttl=RESERVATION_DURATION_MINUTES * 60
+        )
+    except APIException as e:
         socketio.emit('seat_lock_error', {
             'seat_id': seat_id,
-            'message': 'Reservation service unavailable'
+            'seat_ids': e.payload.get('seat_ids', seat_ids),
+            'message': e.message
         }, room=request.sid)
         return
-    
-    try:
-        with db.session.begin():
-            # Validate user exists
-            user = User.query.get(user_id)
-            if not user:
-                print(f"SeatReservation validation failed: User {user_id} not found")
-                socketio.emit('seat_lock_error', {
-                    'seat_id': seat_id,
-                    'message': f'User not found (user_id: {user_id})'
-                }, room=request.sid)
-                return
-            
-            # Validate event exists
-            event = Event.query.get(event_id)
-            if not event:
-                print(f"SeatReservation validation failed: Event {event_id} not found")
-                socketio.emit('seat_lock_error', {
-                    'seat_id': seat_id,
-                    'message': f'Event not found (event_id: {event_id})'
-                }, room=request.sid)
-                return
-            
-            # Validate seat exists
-            seat = Seat.query.get(seat_id)
-            if not seat:
-                print(f"SeatReservation validation failed: Seat {seat_id} not found")
-                socketio.emit('seat_lock_error', {
-                    'seat_id': seat_id,
-                    'message': f'Seat not found (seat_id: {seat_id})'
-                }, room=request.sid)
-                return
-            
-            # Check for existing active reservation in Redis
-            existing_reservation = reservation_manager.get_reservation(seat_id)
-            
-            if existing_reservation:
-                # Check if expired
-                from datetime import datetime
-                expires_at = datetime.fromisoformat(existing_reservation['expires_at'])
-                if expires_at < now_gmt7():
-                    # Expired, clean up
-                    seat.status = 'AVAILABLE'
-                    reservation_manager.delete_reservation(seat_id)
-                    db.session.commit()
-                elif existing_reservation.get('user_id') != user_id:
-                    # Seat is reserved by another user
-                    socketio.emit('seat_lock_error', {
-                        'seat_id': seat_id,
-                        'message': 'Seat is already reserved by another user'
-                    }, room=request.sid)
-                    return
-                elif existing_reservation.get('user_id') == user_id:
-                    # User already has this seat reserved
-                    socketio.emit('seat_locked', {
-                        'seat_id': seat_id,
-                        'user_id': user_id,
-                        'event_id': event_id,
-                        'expires_at': existing_reservation['expires_at']
-                    }, room=request.sid)
-                    return
-            
-            # Check if seat is available
-            if seat.status != 'AVAILABLE' and seat.status != 'RESERVED':
-                socketio.emit('seat_lock_error', {
-                    'seat_id': seat_id,
-                    'message': 'Seat is not available'
-                }, room=request.sid)
-                return
-            
-            # Create new reservation in Redis
-            success = reservation_manager.create_reservation(
-                seat_id=seat_id,
-                user_id=user_id,
-                event_id=event_id,
-                duration_minutes=RESERVATION_DURATION_MINUTES
-            )
-            
-            if not success:
-                socketio.emit('seat_lock_error', {
-                    'seat_id': seat_id,
-                    'message': 'Failed to create reservation'
-                }, room=request.sid)
-                return
-            
-            # Update seat status
-            seat.status = 'RESERVED'
-            db.session.commit()
-            
-            # Get reservation to get expires_at
-            reservation = reservation_manager.get_reservation(seat_id)
-            expires_at = reservation['expires_at'] if reservation else None
-            
-            # Start timer
-            start_seat_timer(seat_id, event_id, user_id)
-            
-            # Emit success to client
-            socketio.emit('seat_locked', {
-                'seat_id': seat_id,
-                'user_id': user_id,
-                'event_id': event_id,
-                'expires_at': expires_at
-            }, room=request.sid)
-            
-            # Broadcast to event room
-            socketio.emit('seat_reserved', {
-                'seat_id': seat_id,
-                'event_id': event_id
-            }, room=f'event_{event_id}')
-            
     except Exception as e:
         db.session.rollback()
         print(f"Error locking seat: {str(e)}")
@@ -275,82 +158,42 @@ def handle_lock_seat(data):
             'seat_id': seat_id,
             'message': f'Error: {str(e)}'
         }, room=request.sid)
+        return
+    
+    # Expiry of the new holds is scheduled by SeatHoldService
+    for reservation in result['held']:
+        # Emit success to client
+        socketio.emit('seat_locked', {
+            'seat_id': reservation['seat_id'],
+            'user_id': reservation['user_id'],
+            'event_id': reservation['event_id'],
+            'expires_at': reservation['expires_at']
+        }, room=request.sid)
 
 @socketio.on('unlock_seat')
 def handle_unlock_seat(data):
-    """Unlock a seat reservation"""
-    seat_id = data.get('seat_id')
+    """Unlock one or more seat reservations"""
+    seat_ids = requested_seat_ids(data)
     user_id = data.get('user_id')
     event_id = data.get('event_id')
     
-    if not all([seat_id, user_id, event_id]):
-        return
-    
-    reservation_manager = get_redis_reservation_manager()
-    if not reservation_manager:
+    if not all([seat_ids, user_id, event_id]):
         return
     
     try:
-        seat = Seat.query.get(seat_id)
-        if not seat:
-            return
-        
-        # Find active reservation in Redis
-        reservation = reservation_manager.get_reservation(seat_id)
-        
-        if reservation and reservation.get('user_id') == user_id:
-            # Delete reservation from Redis
-            reservation_manager.delete_reservation(seat_id)
-            
-            # Update seat status
-            seat.status = 'AVAILABLE'
-            db.session.commit()
-            
-            # Cancel timer
-            cancel_seat_timer(seat_id)
-            
-            # Emit to event room
-            socketio.emit('seat_released', {
-                'seat_id': seat_id,
-                'event_id': event_id
-            }, room=f'event_{event_id}')
+        SeatHoldService.release_seats(event_id, user_id, seat_ids)
                 
     except Exception as e:
         db.session.rollback()
         print(f"Error unlocking seat: {str(e)}")
 
-@socketio.on('checkout_complete')
-def handle_checkout_complete(data):
-    """Handle checkout completion - keep seats reserved"""
-    seat_ids = data.get('seat_ids', [])
-    user_id = data.get('user_id')
-    event_id = data.get('event_id')
-    
-    if not all([seat_ids, user_id, event_id]):
-        return
-    
-    reservation_manager = get_redis_reservation_manager()
-    if not reservation_manager:
-        return
-    
-    try:
-        for seat_id in seat_ids:
-            reservation = reservation_manager.get_reservation(seat_id)
-            
-            if reservation and reservation.get('user_id') == user_id:
-                # Cancel timer - seat will be kept as RESERVED until order is paid
-                cancel_seat_timer(seat_id)
-                # Reservation stays in Redis until payment completes
-                    
-    except Exception as e:
-        print(f"Error handling checkout complete: {str(e)}")
-
 # Periodic cleanup task
 _cleanup_task_started = False
 _app_instance = None
+_expiry_listener = None
 
 def start_cleanup_task(app_instance=None):
-    """Start periodic cleanup of expired reservations"""
+    """Start the real-time background tasks: broadcast coalescer, hold expiry scheduler, Redis expired-key listener, periodic reconciliation, sold count reconciliation, the expired order sweeper, the event card refresh and the search index sync"""
     global _cleanup_task_started, _app_instance
     
     if _cleanup_task_started:
@@ -359,6 +202,28 @@ def start_cleanup_task(app_instance=None):
     if app_instance:
         _app_instance = app_instance
     
+    # Seat broadcasts are batched per room
+    init_broadcast_coalescer(
+        socketio.emit,
+        flush_interval_ms=Config.SOCKETIO_BROADCAST_FLUSH_MS,
+        max_batch=Config.SOCKETIO_BROADCAST_MAX_BATCH
+    )
+    
+    # One scheduler thread handles every hold expiry
+    init_hold_expiry_scheduler(expire_due_holds)
+    
+    # Release holds as soon as Redis expires them
+    redis_client = get_redis()
+    if redis_client is not None and Config.SEAT_RELEASE_LISTENER_ENABLED:
+        global _expiry_listener
+        _expiry_listener = RedisExpiryListener(
+            redis_client,
+            key_prefix=Config.REDIS_SEAT_RESERVATION_PREFIX,
+            on_expired=release_expired_keys,
+            db_index=Config.REDIS_DB
+        )
+        _expiry_listener.start()
+    
     def cleanup_loop():
         while True:
             try:
@@ -371,8 +236,80 @@ def start_cleanup_task(app_instance=None):
                         cleanup_expired_reservations()
             except Exception as e:
                 print(f"Error in cleanup task: {str(e)}")
-            time.sleep(60)  # Run every minute
+            time.sleep(Config.SEAT_RELEASE_RECONCILE_SECONDS)
     
     cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
     cleanup_thread.start()
+    
+    if Config.SEAT_STATE_WRITE_BEHIND:
+        def flush_loop():
+            while True:
+                try:
+                    if _app_instance:
+                        with _app_instance.app_context():
+                            # Drain the queue, then wait for the next interval
+                            while SeatHoldService.flush_seat_state() >= Config.SEAT_STATE_FLUSH_BATCH_SIZE:
+                                pass
+                except Exception as e:
+                    print(f"Error flushing seat state: {str(e)}")
+                time.sleep(Config.SEAT_STATE_FLUSH_SECONDS)
+        
+        flush_thread = threading.Thread(target=flush_loop, daemon=True)
+        flush_thread.start()
+    
+    def inventory_reconcile_loop():
+        while True:
+            try:
+                if _app_instance:
+                    with _app_instance.app_context():
+                        while InventoryService.reconcile_sold_quantities(Config.INVENTORY_RECONCILE_BATCH_SIZE) >= Config.INVENTORY_RECONCILE_BATCH_SIZE:
+                            pass
+            except Exception as e:
+                print(f"Error reconciling sold quantities: {str(e)}")
+            time.sleep(Config.INVENTORY_RECONCILE_SECONDS)
+    
+    inventory_thread = threading.Thread(target=inventory_reconcile_loop, daemon=True)
+    inventory_thread.start()
+    
+    def order_sweep_loop():
+        while True:
+            try:
+                if _app_instance:
+                    with _app_instance.app_context():
+                        OrderSweeperService.sweep()
+            except Exception as e:
+                print(f"Error sweeping expired orders: {str(e)}")
+            time.sleep(Config.ORDER_SWEEP_SECONDS)
+    
+    sweep_thread = threading.Thread(target=order_sweep_loop, daemon=True)
+    sweep_thread.start()
+    
+    def event_card_refresh_loop():
+        while True:
+            try:
+                if _app_instance:
+                    with _app_instance.app_context():
+                        EventCardService.refresh_due()
+            except Exception as e:
+                print(f"Error refreshing event cards: {str(e)}")
+            time.sleep(Config.EVENT_CARD_REFRESH_SECONDS)
+    
+    event_card_thread = threading.Thread(target=event_card_refresh_loop, daemon=True)
+    event_card_thread.start()
+    
+    def search_index_sync_loop():
+        while True:
+            try:
+                if _app_instance:
+                    with _app_instance.app_context():
+                        # Loads the search index on start, then picks up event
+                        # card changes made by other processes
+                        EventSearchService.sync()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error syncing event search index: {str(e)}")
+            time.sleep(Config.SEARCH_INDEX_SYNC_SECONDS)
+    
+    search_index_thread = threading.Thread(target=search_index_sync_loop, daemon=True)
+    search_index_thread.start()
     _cleanup_task_started = True
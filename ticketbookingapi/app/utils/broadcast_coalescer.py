@@ -0,0 +1,177 @@
+"""
+Socket.IO seat broadcast coalescer
+Buffers per-seat state changes per event room and flushes them as a single
+`seats_updated` message every few milliseconds (or as soon as a room has
+enough pending changes), instead of one room broadcast per seat.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Seat status -> key of the batched `seats_updated` payload
+STATUS_KEYS = {
+    'RESERVED': 'reserved',
+    'AVAILABLE': 'released',
+    'BOOKED': 'booked',
+}
+
+
+def build_seats_updated(event_id: int, changes: Dict[int, str], version: Optional[int] = None) -> Dict[str, Any]:
+    """Build a `seats_updated` payload from seat_id -> status changes"""
+    payload = {
+        'event_id': event_id,
+        'version': version,
+        'reserved': [],
+        'released': [],
+        'booked': []
+    }
+    for seat_id, status in changes.items():
+        key = STATUS_KEYS.get(status)
+        if key:
+            payload[key].append(seat_id)
+    return payload
+
+
+class BroadcastCoalescer:
+    """Per-room buffer of seat deltas flushed as batched messages"""
+
+    def __init__(
+        self,
+        emit: Callable[..., Any],
+        flush_interval_ms: int = 100,
+        max_batch: int = 500
+    ):
+        """
+        Args:
+            emit: socketio.emit compatible callable
+            flush_interval_ms: Longest a change waits before being broadcast
+            max_batch: Pending changes in one room that trigger an early flush
+        """
+        self.emit = emit
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending = {}  # event_id -> {'changes': {seat_id: status}, 'version': int}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        # Metrics
+        self.changes_published = 0
+        self.messages_emitted = 0
+        self.flush_count = 0
+
+    def publish(self, event_id: int, changes: Dict[int, str], version: Optional[int] = None) -> None:
+        """
+        Queue seat state changes for an event room
+
+        Later changes to the same seat within a window replace earlier ones,
+        so a seat held and released in the same window is sent once.
+        """
+        if not changes:
+            return
+        event_id = int(event_id)
+        with self._cond:
+            room = self._pending.setdefault(event_id, {'changes': {}, 'version': None})
+            room['changes'].update(changes)
+            if version is not None and (room['version'] is None or version > room['version']):
+                room['version'] = version
+            self.changes_published += len(changes)
+            if len(room['changes']) >= self.max_batch:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """
+        Broadcast everything pending, one message per room
+
+        Returns:
+            Number of messages emitted
+        """
+        with self._cond:
+            pending, self._pending = self._pending, {}
+        for event_id, room in pending.items():
+            try:
+                self.emit(
+                    'seats_updated',
+                    build_seats_updated(event_id, room['changes'], room['version']),
+                    room=f'event_{event_id}'
+                )
+            except Exception as e:
+                print(f"Error broadcasting seat updates: {str(e)}")
+        with self._cond:
+            self.messages_emitted += len(pending)
+            if pending:
+                self.flush_count += 1
+        return len(pending)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Coalescing metrics; `messages_saved` is relative to one broadcast per seat change"""
+        with self._cond:
+            return {
+                'changes_published': self.changes_published,
+                'messages_emitted': self.messages_emitted,
+                'messages_saved': max(self.changes_published - self.messages_emitted, 0),
+                'flush_count': self.flush_count,
+                'pending_rooms': len(self._pending)
+            }
+
+    def start(self) -> None:
+        """Start the flush thread (idempotent)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='broadcast-coalescer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and send what is still pending"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                # Woken early when a room reaches max_batch
+                self._cond.wait(self.flush_interval)
+            self.flush()
+
+
+# Global instance (started with the real-time background tasks)
+broadcast_coalescer: Optional[BroadcastCoalescer] = None
+
+
+def init_broadcast_coalescer(emit, flush_interval_ms: int = 100, max_batch: int = 500) -> BroadcastCoalescer:
+    """Initialize and start the broadcast coalescer"""
+    global broadcast_coalescer
+    if broadcast_coalescer is None:
+        broadcast_coalescer = BroadcastCoalescer(emit, flush_interval_ms=flush_interval_ms, max_batch=max_batch)
+        broadcast_coalescer.start()
+    return broadcast_coalescer
+
+
+def get_broadcast_coalescer() -> Optional[BroadcastCoalescer]:
+    """Get broadcast coalescer instance"""
+    return broadcast_coalescer
+
+
+def publish_seat_changes(event_id: int, changes: Dict[int, str], version: Optional[int] = None) -> None:
+    """
+    Broadcast seat state changes to an event room
+
+    Goes through the coalescer when it is running, otherwise emits one
+    batched message right away.
+    """
+    if not changes:
+        return
+    if broadcast_coalescer is not None:
+        broadcast_coalescer.publish(event_id, changes, version)
+        return
+    from app.extensions import socketio
+    socketio.emit(
+        'seats_updated',
+        build_seats_updated(int(event_id), changes, version),
+        room=f'event_{event_id}'
+    )
@@ -0,0 +1,242 @@
+"""
+Order/ticket/payment code generator
+Snowflake-style 64-bit IDs (millisecond timestamp | worker id | sequence)
+encoded as 13 Crockford base32 characters. Codes are unique across processes
+without a database round trip: every process owns a distinct worker id
+(from config, or leased from Redis), and within a process the sequence never
+repeats inside one millisecond. Codes sort by creation time.
+
+Snowflake IDs are predictable, so codes that grant access (ticket codes,
+checked at the venue) append 80 random bits from `secrets`
+(generate_secret_code).
+"""
+
+import os
+import secrets
+import socket
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, Optional
+
+from app.config import Config
+
+# Custom epoch: 2024-01-01T00:00:00Z (41 bits of milliseconds last ~69 years)
+EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 41
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+WORKER_ID_SHIFT = SEQUENCE_BITS
+TIMESTAMP_SHIFT = SEQUENCE_BITS + WORKER_ID_BITS
+
+# Crockford base32 (no I, L, O, U: unambiguous when read out or typed)
+BASE32_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+BASE32_LENGTH = 13  # ceil(64 / 5)
+SECRET_BITS = 80
+SECRET_LENGTH = SECRET_BITS // 5
+_BASE32_INDEX = {char: i for i, char in enumerate(BASE32_ALPHABET)}
+
+# Claim a worker id lease if free (or already ours), return 1 when held
+CLAIM_WORKER_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == false or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def encode_base32(value: int, length: int = BASE32_LENGTH) -> str:
+    """Fixed-width Crockford base32 (zero padded, so order is preserved)"""
+    chars = []
+    for _ in range(length):
+        chars.append(BASE32_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def decode_base32(code: str) -> int:
+    """Inverse of encode_base32 (case-insensitive)"""
+    value = 0
+    for char in code.upper():
+        value = (value << 5) | _BASE32_INDEX[char]
+    return value
+
+
+def parse_id(snowflake_id: int) -> Dict[str, int]:
+    """Split an ID into its timestamp (Unix ms), worker id and sequence"""
+    return {
+        'timestamp_ms': (snowflake_id >> TIMESTAMP_SHIFT) + EPOCH_MS,
+        'worker_id': (snowflake_id >> WORKER_ID_SHIFT) & MAX_WORKER_ID,
+        'sequence': snowflake_id & MAX_SEQUENCE
+    }
+
+
+class CodeGenerator:
+    """Monotonic, worker-aware Snowflake ID generator"""
+
+    def __init__(
+        self,
+        worker_id: Optional[int] = None,
+        redis_client=None,
+        lease_seconds: int = 300
+    ):
+        """
+        Args:
+            worker_id: Fixed worker id (0-1023); unique per process across
+                the deployment. When None it is leased from Redis, or
+                derived from host and PID without Redis.
+            redis_client: Redis client for worker id leases
+            lease_seconds: Worker id lease lifetime (renewed at half-life)
+        """
+        if worker_id is not None and not 0 <= int(worker_id) <= MAX_WORKER_ID:
+            raise ValueError(f'worker_id must be between 0 and {MAX_WORKER_ID}')
+        self.fixed_worker_id = int(worker_id) if worker_id is not None else None
+        self.redis_client = redis_client
+        self.lease_seconds = lease_seconds
+        self.prefix = Config.REDIS_CODE_WORKER_PREFIX
+        self._lock = threading.Lock()
+        self._claim_script = None
+        self._worker_id = None
+        self._pid = None
+        self._token = None
+        self._renew_at = 0.0
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self) -> int:
+        with self._lock:
+            return self._ensure_worker_id()
+
+    def next_id(self) -> int:
+        """Next unique 64-bit ID (strictly increasing within this process)"""
+        with self._lock:
+            worker_id = self._ensure_worker_id()
+            now_ms = int(time.time() * 1000) - EPOCH_MS
+            # A clock step backwards keeps the last timestamp (logical clock)
+            # instead of risking a repeat
+            if now_ms <= self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 IDs in this millisecond: move on to the next one
+                    # (waiting for it unless the clock is behind anyway)
+                    self._last_ms += 1
+                    if self._last_ms == now_ms + 1:
+                        self._wait_until(self._last_ms)
+            else:
+                self._last_ms = now_ms
+                self._sequence = 0
+            return (self._last_ms << TIMESTAMP_SHIFT) | (worker_id << WORKER_ID_SHIFT) | self._sequence
+
+    def next_code(self, prefix: Optional[str] = None) -> str:
+        """Next unique code, e.g. 'ORD-0F4QZ8XK2M000'"""
+        code = encode_base32(self.next_id())
+        return f"{prefix}-{code}" if prefix else code
+
+    @staticmethod
+    def _wait_until(target_ms: int) -> None:
+        while int(time.time() * 1000) - EPOCH_MS < target_ms:
+            time.sleep(0.0001)
+
+    def _ensure_worker_id(self) -> int:
+        pid = os.getpid()
+        if self._pid != pid:
+            # New process (first use, or forked by the app server): a worker
+            # id inherited from the parent must not be shared
+            self._pid = pid
+            self._token = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex}"
+            self._worker_id = None
+            self._last_ms = -1
+            self._sequence = 0
+        if self.fixed_worker_id is not None:
+            self._worker_id = self.fixed_worker_id
+        elif self._worker_id is None:
+            self._worker_id = self._lease_worker_id()
+        elif self.redis_client and time.monotonic() >= self._renew_at:
+            self._renew_lease()
+        return self._worker_id
+
+    def _lease_worker_id(self) -> int:
+        if self.redis_client:
+            try:
+                # Start probing at a rotating offset so concurrent workers
+                # rarely race for the same id
+                start = int(self.redis_client.incr(f"{self.prefix}next"))
+                for i in range(MAX_WORKER_ID + 1):
+                    candidate = (start + i) & MAX_WORKER_ID
+                    if self._claim(candidate):
+                        self._renew_at = time.monotonic() + self.lease_seconds / 2
+                        return candidate
+                print("Error leasing code generator worker id: all worker ids are taken")
+            except Exception as e:
+                print(f"Error leasing code generator worker id: {str(e)}")
+        # No Redis: unique per process on one host
+        fallback = (zlib.crc32(socket.gethostname().encode('utf-8')) ^ os.getpid()) & MAX_WORKER_ID
+        print(f"Warning: code generator using derived worker id {fallback}; "
+              f"set CODE_GENERATOR_WORKER_ID when running several hosts without Redis")
+        return fallback
+
+    def _renew_lease(self) -> None:
+        try:
+            if self._claim(self._worker_id):
+                self._renew_at = time.monotonic() + self.lease_seconds / 2
+            else:
+                # Lease expired and was taken over: move to a free id
+                self._worker_id = self._lease_worker_id()
+        except Exception as e:
+            # Keep the current id; retry on the next call
+            print(f"Error renewing code generator worker id: {str(e)}")
+
+    def _claim(self, worker_id: int) -> bool:
+        if self._claim_script is None:
+            self._claim_script = self.redis_client.register_script(CLAIM_WORKER_SCRIPT)
+        return bool(self._claim_script(
+            keys=[f"{self.prefix}{worker_id}"],
+            args=[self._token, self.lease_seconds]
+        ))
+
+
+# Global instance
+code_generator: Optional[CodeGenerator] = None
+
+
+def init_code_generator(redis_client=None) -> CodeGenerator:
+    """Initialize the code generator"""
+    global code_generator
+    code_generator = CodeGenerator(
+        worker_id=Config.CODE_GENERATOR_WORKER_ID,
+        redis_client=redis_client,
+        lease_seconds=Config.CODE_GENERATOR_LEASE_SECONDS
+    )
+    return code_generator
+
+
+def get_code_generator() -> CodeGenerator:
+    """Get code generator instance (created on first use)"""
+    global code_generator
+    if code_generator is None:
+        from app.extensions import get_redis
+        init_code_generator(get_redis())
+    return code_generator
+
+
+def generate_code(prefix: str) -> str:
+    """Unique '<prefix>-<13 base32 chars>' code"""
+    return get_code_generator().next_code(prefix)
+
+
+def generate_secret_code(prefix: str) -> str:
+    """
+    Unique and unguessable '<prefix>-<13 + 16 base32 chars>' code
+
+    The Snowflake part keeps codes unique; the random part (SECRET_BITS from
+    `secrets`) keeps them from being derived from another known code.
+    """
+    return f"{generate_code(prefix)}{encode_base32(secrets.randbits(SECRET_BITS), SECRET_LENGTH)}"
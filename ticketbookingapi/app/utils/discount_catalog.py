@@ -0,0 +1,146 @@
+"""
+Discount catalog
+In-process index of currently valid discounts keyed by discount code, so
+checkout and /orders/validate-discount look codes up without a query. The
+index is rebuilt with one query when it is older than DISCOUNT_CACHE_TTL or
+when any process changed a discount (a version counter in Redis is bumped
+after every committed Discount write).
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.extensions import get_redis
+
+
+class CachedDiscount:
+    """Read-only snapshot of a Discount row (same attribute names)"""
+
+    __slots__ = (
+        'discount_id', 'manager_id', 'event_id', 'discount_code', 'discount_name',
+        'discount_type', 'discount_value', 'min_order_amount', 'max_discount_amount',
+        'usage_limit', 'used_count', 'start_date', 'end_date', 'is_active'
+    )
+
+    def __init__(self, discount):
+        for name in self.__slots__:
+            setattr(self, name, getattr(discount, name, None))
+
+
+class DiscountCatalog:
+    """Discounts by code, rebuilt on TTL or on a version change"""
+
+    def __init__(self, redis_client=None, ttl: int = 60):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.version_key = Config.REDIS_DISCOUNT_VERSION_KEY
+        self._by_code: Dict[str, CachedDiscount] = {}
+        self._loaded_at = 0.0
+        self._version = None
+        self._local_version = 0
+        self._lock = threading.Lock()
+        # Metrics
+        self.hits = 0
+        self.reloads = 0
+
+    def get(self, discount_code: str) -> Optional[CachedDiscount]:
+        """Discount for a code, None when it does not exist (or is not loaded as valid)"""
+        if not discount_code:
+            return None
+        version = self._current_version()
+        with self._lock:
+            stale = (
+                time.monotonic() - self._loaded_at > self.ttl
+                or version != self._version
+            )
+        if stale:
+            self._reload(version)
+        with self._lock:
+            self.hits += 1
+            return self._by_code.get(discount_code)
+
+    def invalidate(self) -> None:
+        """Force every process to rebuild its index on the next lookup"""
+        with self._lock:
+            self._local_version += 1
+        if self.redis is not None:
+            try:
+                self.redis.incr(self.version_key)
+            except Exception as e:
+                print(f"Error bumping discount catalog version: {str(e)}")
+
+    def get_metrics(self):
+        with self._lock:
+            return {'lookups': self.hits, 'reloads': self.reloads, 'discounts': len(self._by_code)}
+
+    def _current_version(self):
+        with self._lock:
+            local_version = self._local_version
+        if self.redis is not None:
+            try:
+                return (local_version, self.redis.get(self.version_key))
+            except Exception as e:
+                print(f"Error reading discount catalog version: {str(e)}")
+        return (local_version, None)
+
+    def _reload(self, version) -> None:
+        from app.models.discount import Discount
+        from app.utils.datetime_utils import now_gmt7
+
+        # Active codes that have not ended yet; not-yet-started codes are
+        # kept so they can be reported as such
+        rows = Discount.query.filter(
+            Discount.is_active.is_(True),
+            Discount.end_date >= now_gmt7()
+        ).all()
+        by_code = {row.discount_code: CachedDiscount(row) for row in rows}
+        with self._lock:
+            self._by_code = by_code
+            self._loaded_at = time.monotonic()
+            self._version = version
+            self.reloads += 1
+
+
+# Global instance
+discount_catalog: Optional[DiscountCatalog] = None
+
+
+def init_discount_catalog(redis_client=None) -> DiscountCatalog:
+    """Initialize discount catalog"""
+    global discount_catalog
+    discount_catalog = DiscountCatalog(redis_client, ttl=Config.DISCOUNT_CACHE_TTL)
+    return discount_catalog
+
+
+def get_discount_catalog() -> DiscountCatalog:
+    """Get discount catalog instance (created on first use)"""
+    global discount_catalog
+    if discount_catalog is None:
+        init_discount_catalog(get_redis())
+    return discount_catalog
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _track_discount_writes(session, flush_context):
+    from app.models.discount import Discount
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Discount):
+            session.info['discounts_changed'] = True
+            return
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _invalidate_committed_discounts(session):
+    if session.info.pop('discounts_changed', None):
+        get_discount_catalog().invalidate()
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _discard_discount_writes(session):
+    session.info.pop('discounts_changed', None)
@@ -0,0 +1,274 @@
+"""
+Discount redemption manager
+Atomic per-discount usage counters with reserve/commit/rollback tied to the
+order lifecycle: a redemption is reserved when the order is created,
+committed when it is paid and given back when it is cancelled, fails or
+expires. The Redis counter counts committed plus reserved redemptions, so
+`usage_limit` holds even when many checkouts use a code at the same time.
+Which discount an order uses is recorded in MySQL (DiscountRedemption); the
+order hash here only tracks the reservations the counter still includes.
+"""
+
+import threading
+from typing import Optional
+
+from sqlalchemy import event as sa_event, func
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.extensions import get_redis
+
+# Reserve one use of a discount for an order.
+# KEYS[1]: uses counter, KEYS[2]: order -> discount hash
+# ARGV[1]: usage limit (0 = unlimited), ARGV[2]: order id, ARGV[3]: discount id
+# Returns 1 when reserved (or already reserved for this order), 0 when the
+# limit is reached, -1 when the counter is not loaded yet.
+RESERVE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[2], ARGV[2]) == 1 then
+    return 1
+end
+local uses = redis.call('GET', KEYS[1])
+if not uses then
+    return -1
+end
+local limit = tonumber(ARGV[1])
+if limit > 0 and tonumber(uses) >= limit then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+
+# Give back the reservation of an order (no-op when it has none)
+# KEYS[1]: order -> discount hash, ARGV[1]: order id, ARGV[2]: uses key prefix
+RELEASE_SCRIPT = """
+local discount_id = redis.call('HGET', KEYS[1], ARGV[1])
+if not discount_id then
+    return false
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+local uses_key = ARGV[2] .. discount_id
+if redis.call('EXISTS', uses_key) == 1 then
+    redis.call('DECR', uses_key)
+end
+return discount_id
+"""
+
+
+class DiscountRedemptionManager:
+    """Discount usage counters (Redis, in-memory fallback)"""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client
+        self.uses_prefix = Config.REDIS_DISCOUNT_USES_PREFIX
+        self.orders_key = Config.REDIS_DISCOUNT_ORDERS_KEY
+        self._reserve_script = None
+        self._release_script = None
+        if redis_client is not None:
+            try:
+                self._reserve_script = redis_client.register_script(RESERVE_SCRIPT)
+                self._release_script = redis_client.register_script(RELEASE_SCRIPT)
+            except Exception as e:
+                print(f"Error registering discount scripts: {str(e)}")
+        self._fallback_uses = {}
+        self._fallback_orders = {}
+        self._fallback_lock = threading.Lock()
+
+    def reserve(self, discount, order_id: int) -> bool:
+        """
+        Reserve one use of a discount for an order
+
+        Args:
+            discount: Discount (or cached snapshot) with discount_id,
+                usage_limit and used_count (committed uses, to load the counter)
+            order_id: Order ID
+
+        Returns:
+            False when the usage limit is reached
+        """
+        discount_id = int(discount.discount_id)
+        limit = int(discount.usage_limit or 0)
+
+        if self._reserve_script is not None:
+            try:
+                keys = [f"{self.uses_prefix}{discount_id}", self.orders_key]
+                args = [limit, int(order_id), discount_id]
+                result = int(self._reserve_script(keys=keys, args=args))
+                if result == -1:
+                    self.redis.set(keys[0], self._load_used_count(discount), nx=True)
+                    result = int(self._reserve_script(keys=keys, args=args))
+                return result == 1
+            except Exception as e:
+                print(f"Error reserving discount in Redis: {str(e)}")
+                # Fall through to fallback
+
+        with self._fallback_lock:
+            order_id = int(order_id)
+            if order_id in self._fallback_orders:
+                return True
+            if discount_id not in self._fallback_uses:
+                self._fallback_uses[discount_id] = self._load_used_count(discount)
+            if limit > 0 and self._fallback_uses[discount_id] >= limit:
+                return False
+            self._fallback_uses[discount_id] += 1
+            self._fallback_orders[order_id] = discount_id
+            return True
+
+    def get_order_discount(self, order_id: int) -> Optional[int]:
+        """Discount reserved for an order, if any"""
+        if self.redis is not None:
+            try:
+                value = self.redis.hget(self.orders_key, int(order_id))
+                if value is not None:
+                    return int(value)
+            except Exception as e:
+                print(f"Error reading discount reservation from Redis: {str(e)}")
+        with self._fallback_lock:
+            return self._fallback_orders.get(int(order_id))
+
+    def commit(self, order_id: int) -> Optional[int]:
+        """
+        Turn an order's reservation into a used redemption (order paid)
+
+        The use stays counted; only the order's reservation record is dropped.
+
+        Returns:
+            The discount ID, or None when the order had no reservation
+        """
+        discount_id = self.get_order_discount(order_id)
+        if discount_id is None:
+            return None
+        if self.redis is not None:
+            try:
+                self.redis.hdel(self.orders_key, int(order_id))
+            except Exception as e:
+                print(f"Error committing discount reservation in Redis: {str(e)}")
+        with self._fallback_lock:
+            self._fallback_orders.pop(int(order_id), None)
+        return discount_id
+
+    def release(self, order_id: int) -> Optional[int]:
+        """
+        Give back an order's reservation (order cancelled, failed or expired)
+
+        Returns:
+            The discount ID, or None when the order had no reservation
+        """
+        if self._release_script is not None:
+            try:
+                result = self._release_script(
+                    keys=[self.orders_key],
+                    args=[int(order_id), self.uses_prefix]
+                )
+                if result is not None:
+                    return int(result)
+            except Exception as e:
+                print(f"Error releasing discount reservation in Redis: {str(e)}")
+
+        with self._fallback_lock:
+            discount_id = self._fallback_orders.pop(int(order_id), None)
+            if discount_id is not None and discount_id in self._fallback_uses:
+                self._fallback_uses[discount_id] = max(self._fallback_uses[discount_id] - 1, 0)
+            return discount_id
+
+    def get_uses(self, discount) -> int:
+        """Committed plus reserved uses of a discount"""
+        discount_id = int(discount.discount_id)
+        if self.redis is not None:
+            try:
+                value = self.redis.get(f"{self.uses_prefix}{discount_id}")
+                if value is not None:
+                    return int(value)
+            except Exception as e:
+                print(f"Error reading discount uses from Redis: {str(e)}")
+        with self._fallback_lock:
+            if discount_id in self._fallback_uses:
+                return self._fallback_uses[discount_id]
+        return int(discount.used_count or 0)
+
+    @staticmethod
+    def _load_used_count(discount) -> int:
+        """
+        Committed plus reserved uses from MySQL, to (re)load a counter
+        (fresh read, the snapshot may be stale)
+        """
+        from app.extensions import db
+        from app.models.discount import Discount
+        from app.models.discount_redemption import DiscountRedemption
+
+        used = db.session.query(Discount.used_count).filter(
+            Discount.discount_id == discount.discount_id
+        ).scalar()
+        # Pending orders hold their reservation until paid or released
+        reserved = db.session.query(func.count()).select_from(DiscountRedemption).filter(
+            DiscountRedemption.discount_id == discount.discount_id,
+            DiscountRedemption.status == 'RESERVED'
+        ).scalar()
+        return int(used if used is not None else (discount.used_count or 0)) + int(reserved or 0)
+
+
+# Global instance
+discount_redemption_manager: Optional[DiscountRedemptionManager] = None
+
+
+def init_discount_redemption_manager(redis_client=None) -> DiscountRedemptionManager:
+    """Initialize discount redemption manager"""
+    global discount_redemption_manager
+    discount_redemption_manager = DiscountRedemptionManager(redis_client)
+    return discount_redemption_manager
+
+
+def get_discount_redemption_manager() -> DiscountRedemptionManager:
+    """Get discount redemption manager instance (created on first use)"""
+    global discount_redemption_manager
+    if discount_redemption_manager is None:
+        init_discount_redemption_manager(get_redis())
+    return discount_redemption_manager
+
+
+def track_reserved(session, order_id: int) -> None:
+    """Order whose redemption was reserved in this transaction: given back if it rolls back"""
+    session.info.setdefault('discount_reserved', set()).add(int(order_id))
+
+
+def commit_on_commit(session, order_id: int) -> None:
+    """Order whose redemption is committed once this transaction commits"""
+    session.info.setdefault('discount_committed', set()).add(int(order_id))
+
+
+def release_on_commit(session, order_ids) -> None:
+    """Orders whose redemptions are given back once this transaction commits"""
+    session.info.setdefault('discount_released', set()).update(int(order_id) for order_id in order_ids)
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _apply_committed_redemptions(session):
+    session.info.pop('discount_reserved', None)
+    committed = session.info.pop('discount_committed', None)
+    released = session.info.pop('discount_released', None)
+    if not committed and not released:
+        return
+    try:
+        manager = get_discount_redemption_manager()
+        for order_id in committed or ():
+            manager.commit(order_id)
+        for order_id in released or ():
+            manager.release(order_id)
+    except Exception as e:
+        print(f"Error applying committed discount redemptions: {str(e)}")
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _return_reserved_redemptions(session):
+    reserved = session.info.pop('discount_reserved', None)
+    session.info.pop('discount_committed', None)
+    session.info.pop('discount_released', None)
+    if not reserved:
+        return
+    try:
+        manager = get_discount_redemption_manager()
+        for order_id in reserved:
+            manager.release(order_id)
+    except Exception as e:
+        print(f"Error returning reserved discount redemptions: {str(e)}")
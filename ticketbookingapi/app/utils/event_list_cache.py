@@ -0,0 +1,295 @@
+"""
+Public event listing cache
+Two-level cache of /events results keyed by the normalized filter set: an
+in-process LRU (L1) in front of Redis (L2) shared by every API process.
+Concurrent misses on the same key are coalesced into one rebuild (in
+process with a flight per key, across processes with a short Redis lock).
+
+Entries are never updated in place: every organizer/admin write that can
+change a listing bumps a version counter (see invalidate_event_listings),
+which moves all lookups to fresh keys. Counters that change on every sale
+(sold_tickets) are only as fresh as the TTL.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.config import Config
+from app.extensions import get_redis
+
+
+class _Flight:
+    """A rebuild in progress; other callers for the same key wait on it"""
+
+    __slots__ = ('done', 'value')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class EventListCache:
+    """Listing results by filter set (L1 in process, L2 in Redis)"""
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl: int = 60,
+        local_ttl: float = 5,
+        max_items: int = 512,
+        version_check_interval: float = 1,
+        lock_timeout: float = 5
+    ):
+        """
+        Args:
+            redis_client: Redis client (None for in-process only)
+            ttl: Redis entry lifetime in seconds
+            local_ttl: In-process entry lifetime in seconds
+            max_items: Most results kept in process
+            version_check_interval: How often the shared version is re-read
+            lock_timeout: Longest a caller waits for another rebuild
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_items = max_items
+        self.version_check_interval = version_check_interval
+        self.lock_timeout = lock_timeout
+        self.prefix = Config.REDIS_EVENT_LIST_PREFIX
+        self.version_key = f"{self.prefix}version"
+        self._entries = OrderedDict()  # key -> (version, expires_at, value)
+        self._flights: Dict[str, _Flight] = {}
+        self._local_version = 0
+        self._shared_version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        # Metrics
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0
+        self.rebuild_max_seconds = 0.0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(filters: Dict[str, Any]) -> str:
+        """Cache key of a normalized filter set (order and None values do not matter)"""
+        normalized = {k: v for k, v in filters.items() if v is not None}
+        raw = json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_build(self, filters: Dict[str, Any], build: Callable[[], Any]) -> Any:
+        """
+        Cached result for a filter set, built with `build()` on a miss
+
+        The result must be JSON serializable.
+        """
+        key = self.make_key(filters)
+        version = self._current_version()
+
+        value = self._get_local(key, version)
+        if value is not None:
+            return value
+
+        value = self._get_shared(key, version)
+        if value is not None:
+            with self._lock:
+                self.l2_hits += 1
+            self._set_local(key, version, value)
+            return value
+
+        flight_key = f"{version}:{key}"
+        with self._lock:
+            self.misses += 1
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+
+        if not leader:
+            # Another request of this process is rebuilding the same key
+            flight.done.wait(self.lock_timeout)
+            if flight.value is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return flight.value
+            return self._rebuild(key, version, build)
+
+        try:
+            value = self._wait_for_other_process(key, version)
+            if value is None:
+                value = self._rebuild(key, version, build)
+            flight.value = value
+            return value
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(flight_key, None)
+
+    def invalidate(self) -> None:
+        """Drop every cached listing in every process"""
+        with self._lock:
+            self._local_version += 1
+            self._entries.clear()
+            self._version_checked_at = 0.0
+            self.invalidations += 1
+        if self.redis is not None:
+            try:
+                self.redis.incr(self.version_key)
+            except Exception as e:
+                print(f"Error bumping event listing cache version: {str(e)}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.l1_hits + self.l2_hits + self.misses
+            return {
+                'l1_hits': self.l1_hits,
+                'l2_hits': self.l2_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_ratio': round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else 0.0,
+                'rebuilds': self.rebuilds,
+                'rebuild_avg_ms': round(self.rebuild_seconds / self.rebuilds * 1000, 2) if self.rebuilds else 0.0,
+                'rebuild_max_ms': round(self.rebuild_max_seconds * 1000, 2),
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)
+            }
+
+    def _current_version(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            local_version = self._local_version
+            if now - self._version_checked_at < self.version_check_interval:
+                return f"{local_version}.{self._shared_version}"
+        shared_version = None
+        if self.redis is not None:
+            try:
+                shared_version = self.redis.get(self.version_key) or 0
+            except Exception as e:
+                print(f"Error reading event listing cache version: {str(e)}")
+        with self._lock:
+            self._shared_version = shared_version
+            self._version_checked_at = now
+        return f"{local_version}.{shared_version}"
+
+    def _get_local(self, key: str, version: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires_at, value = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.l1_hits += 1
+            return value
+
+    def _set_local(self, key: str, version: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.local_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def _shared_key(self, key: str, version: str) -> str:
+        # Only the shared part of the version: every process agrees on it
+        return f"{self.prefix}{version.split('.', 1)[1]}:{key}"
+
+    def _get_shared(self, key: str, version: str) -> Optional[Any]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(self._shared_key(key, version))
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"Error reading event listing from Redis: {str(e)}")
+            return None
+
+    def _wait_for_other_process(self, key: str, version: str) -> Optional[Any]:
+        """
+        Take the rebuild lock of a key, or wait for the process holding it
+
+        Returns:
+            The value rebuilt by another process, None when this process
+            should rebuild
+        """
+        if self.redis is None:
+            return None
+        lock_key = f"{self._shared_key(key, version)}:lock"
+        try:
+            if self.redis.set(lock_key, 1, nx=True, px=int(self.lock_timeout * 1000)):
+                return None
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                value = self._get_shared(key, version)
+                if value is not None:
+                    with self._lock:
+                        self.coalesced += 1
+                    self._set_local(key, version, value)
+                    return value
+                if not self.redis.exists(lock_key):
+                    return None
+        except Exception as e:
+            print(f"Error waiting for event listing rebuild: {str(e)}")
+        return None
+
+    def _rebuild(self, key: str, version: str, build: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.rebuilds += 1
+            self.rebuild_seconds += elapsed
+            self.rebuild_max_seconds = max(self.rebuild_max_seconds, elapsed)
+
+        self._set_local(key, version, value)
+        if self.redis is not None:
+            shared_key = self._shared_key(key, version)
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(shared_key, json.dumps(value, separators=(',', ':'), default=str), ex=self.ttl)
+                pipe.delete(f"{shared_key}:lock")
+                pipe.execute()
+            except Exception as e:
+                print(f"Error storing event listing in Redis: {str(e)}")
+        return value
+
+
+# Global instance
+event_list_cache: Optional[EventListCache] = None
+
+
+def init_event_list_cache(redis_client=None) -> EventListCache:
+    """Initialize event listing cache"""
+    global event_list_cache
+    event_list_cache = EventListCache(
+        redis_client,
+        ttl=Config.EVENT_LIST_CACHE_TTL,
+        local_ttl=Config.EVENT_LIST_CACHE_LOCAL_TTL,
+        max_items=Config.EVENT_LIST_CACHE_MAX_ITEMS
+    )
+    return event_list_cache
+
+
+def get_event_list_cache() -> EventListCache:
+    """Get event listing cache instance (created on first use)"""
+    global event_list_cache
+    if event_list_cache is None:
+        init_event_list_cache(get_redis())
+    return event_list_cache
+
+
+def invalidate_event_listings() -> None:
+    """Call after committing a write that changes what /events returns"""
+    try:
+        get_event_list_cache().invalidate()
+    except Exception as e:
+        print(f"Error invalidating event listings: {str(e)}")
@@ -0,0 +1,267 @@
+"""
+Event search index
+In-process inverted index for event search, ranked with BM25 over weighted
+fields (name, category, venue, city, description). Text is folded before
+tokenizing, so "ha noi" matches "Hà Nội" and "da lat" matches "Đà Lạt"; the
+last query word also matches as a prefix for search-as-you-type.
+
+Documents are showtime groups (EventCard rows). The index only holds terms;
+EventSearchService loads documents from MySQL, keeps them in sync and turns
+hits back into event cards.
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Field weights (BM25F-style: weighted term frequency and document length)
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'category': 1.5,
+    'venue': 1.5,
+    'city': 1.5,
+    'description': 1.0
+}
+
+# Most vocabulary terms a trailing prefix expands to, and the shortest
+# prefix that expands at all
+MAX_PREFIX_EXPANSIONS = 50
+MIN_PREFIX_LENGTH = 2
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _build_fold_table() -> Dict[int, Optional[str]]:
+    # Latin letters with diacritics (Vietnamese included) map to their base
+    # letter, combining marks (decomposed input) are dropped
+    table: Dict[int, Optional[str]] = {ord('đ'): 'd', ord('Đ'): 'D'}
+    for code in list(range(0x00C0, 0x0250)) + list(range(0x1E00, 0x1F00)):
+        base = ''.join(ch for ch in unicodedata.normalize('NFD', chr(code)) if unicodedata.category(ch) != 'Mn')
+        if base and base != chr(code):
+            table.setdefault(code, base)
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase and strip diacritics ("Đà Lạt" -> "da lat")"""
+    if not text:
+        return ''
+    return text.translate(_FOLD_TABLE).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Folded word tokens of a text (HTML tags dropped)"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(fold(_TAG_RE.sub(' ', text)))
+
+
+class EventSearchIndex:
+    """Inverted index: term -> {doc_id: weighted term frequency}"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}  # For removal
+        self._tf_values: Dict[float, float] = {}  # Shared float objects (few distinct values)
+        self._doc_length: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._lock = threading.RLock()
+        # Documents to reload before the next search (changed by this process)
+        self._stale: Set[str] = set()
+        self.loaded = False
+        self.synced_until = None  # Newest EventCard.refreshed_at indexed
+        # Metrics
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.updates = 0
+
+    def index(self, doc_id: str, fields: Dict[str, Optional[str]]) -> None:
+        """Add or replace a document"""
+        terms: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(fields.get(field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._vocabulary_dirty = True
+                postings[doc_id] = self._tf_values.setdefault(tf, tf)
+            self._doc_terms[doc_id] = tuple(terms)
+            length = sum(terms.values())
+            self._doc_length[doc_id] = length
+            self._total_length += length
+            self.updates += 1
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._vocabulary_dirty = True
+        self._total_length -= self._doc_length.pop(doc_id, 0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_length.clear()
+            self._tf_values.clear()
+            self._total_length = 0.0
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+            self.loaded = False
+            self.synced_until = None
+
+    def mark_stale(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._stale.update(doc_ids)
+
+    def pop_stale(self) -> List[str]:
+        with self._lock:
+            stale = list(self._stale)
+            self._stale.clear()
+            return stale
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Tuple[str, float]]:
+        """
+        Best matching documents for a query, by BM25 score
+
+        Every query word must match (in any field); the last word also
+        matches longer terms it is a prefix of, unless the query ends with a
+        space.
+
+        Returns:
+            [(doc_id, score)], best first
+        """
+        started = time.perf_counter()
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+        prefix = words[-1] if not query[-1].isspace() and len(words[-1]) >= MIN_PREFIX_LENGTH else None
+
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            # Per word: (idf, postings) of each term it matches
+            matches = []
+            for word in words:
+                terms = self._expand_prefix(word) if word == prefix else []
+                if word in self._postings and word not in terms:
+                    terms.append(word)
+                if not terms:
+                    return []
+                matches.append([
+                    (math.log(1 + (n_docs - len(self._postings[term]) + 0.5) / (len(self._postings[term]) + 0.5)),
+                     self._postings[term])
+                    for term in terms
+                ])
+
+            # Documents matching every word, intersected smallest first
+            word_docs = []
+            for postings in matches:
+                if len(postings) == 1:
+                    word_docs.append(postings[0][1].keys())
+                else:
+                    word_docs.append(set().union(*(term_postings for _, term_postings in postings)))
+            word_docs.sort(key=len)
+            candidates = word_docs[0]
+            for docs in word_docs[1:]:
+                # Key view on the left: only the smaller side is iterated
+                candidates = docs & candidates
+                if not candidates:
+                    return []
+
+            k1 = self.k1
+            base = k1 * (1 - self.b)
+            scale = k1 * self.b / avg_length
+            doc_length = self._doc_length
+            scores: Dict[str, float] = {}
+            for doc_id in candidates:
+                norm = base + scale * doc_length[doc_id]
+                score = 0.0
+                for postings in matches:
+                    # A word is scored once, through its best matching term
+                    best = 0.0
+                    for idf, term_postings in postings:
+                        tf = term_postings.get(doc_id)
+                        if tf:
+                            term_score = idf * tf * (k1 + 1) / (tf + norm)
+                            if term_score > best:
+                                best = term_score
+                    score += best
+                scores[doc_id] = score
+            results = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+            self.searches += 1
+            self.search_seconds += time.perf_counter() - started
+        return results[offset:]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'documents': len(self._doc_terms),
+                'terms': len(self._postings),
+                'updates': self.updates,
+                'stale': len(self._stale),
+                'searches': self.searches,
+                'search_avg_ms': round(self.search_seconds / self.searches * 1000, 3) if self.searches else 0.0,
+                'synced_until': self.synced_until.isoformat() if self.synced_until else None
+            }
+
+
+# Global instance
+event_search_index: Optional[EventSearchIndex] = None
+
+
+def get_event_search_index() -> EventSearchIndex:
+    """Get event search index instance (created on first use)"""
+    global event_search_index
+    if event_search_index is None:
+        event_search_index = EventSearchIndex()
+    return event_search_index
+
+
+def mark_search_documents_stale(group_keys: Iterable[str]) -> None:
+    """Reindex these showtime groups before the next search in this process"""
+    get_event_search_index().mark_stale(group_keys)
@@ -0,0 +1,148 @@
+"""
+Seat hold expiry scheduler
+A single background thread drives every hold expiration (instead of one
+sleeping thread per seat), supports real cancellation and hands all holds
+that fall due in the same tick to the expiry callback as one batch.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Any
+
+
+class HoldExpiryScheduler:
+    """Heap-based timer for seat hold expirations driven by one thread"""
+
+    def __init__(
+        self,
+        on_expire: Callable[[List[Dict[str, Any]]], None],
+        tick_seconds: float = 1.0
+    ):
+        """
+        Args:
+            on_expire: Called with the list of entries ({'seat_id', 'event_id',
+                'user_id', 'due_at'}) that fell due in one tick
+            tick_seconds: Batching window; holds due within the same window
+                expire together
+        """
+        self.on_expire = on_expire
+        self.tick_seconds = tick_seconds
+        self._heap = []  # (due_at, seq, seat_id)
+        self._entries = {}  # seat_id -> entry (the heap item with the same seq is the live one)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def schedule(self, seat_id: int, event_id: int, user_id: int, delay_seconds: float) -> None:
+        """Schedule (or reschedule) the expiry of a seat hold"""
+        due_at = time.monotonic() + delay_seconds
+        seq = next(self._seq)
+        with self._cond:
+            self._entries[seat_id] = {
+                'seat_id': seat_id,
+                'event_id': event_id,
+                'user_id': user_id,
+                'due_at': due_at,
+                'seq': seq
+            }
+            heapq.heappush(self._heap, (due_at, seq, seat_id))
+            # Wake the worker if this is now the earliest deadline
+            if self._heap[0][1] == seq:
+                self._cond.notify()
+
+    def cancel(self, seat_id: int) -> bool:
+        """
+        Cancel a scheduled expiry
+
+        The heap item is dropped lazily when it reaches the top; the heap is
+        compacted if cancelled items start to dominate it.
+
+        Returns:
+            True if a pending expiry was cancelled
+        """
+        with self._cond:
+            entry = self._entries.pop(seat_id, None)
+            if len(self._heap) > 2 * len(self._entries) + 1024:
+                self._heap = [item for item in self._heap if self._is_live(item)]
+                heapq.heapify(self._heap)
+            return entry is not None
+
+    def pending_count(self) -> int:
+        """Number of scheduled (not cancelled) expirations"""
+        with self._cond:
+            return len(self._entries)
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='hold-expiry-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _is_live(self, item) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry['seq'] == item[1]
+
+    def _pop_due(self) -> Optional[List[Dict[str, Any]]]:
+        """Wait for the next tick with due entries and pop them (None when stopped)"""
+        with self._cond:
+            while self._running:
+                while self._heap and not self._is_live(self._heap[0]):
+                    heapq.heappop(self._heap)
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        item = heapq.heappop(self._heap)
+                        if self._is_live(item):
+                            due.append(self._entries.pop(item[2]))
+                    if due:
+                        return due
+                    continue
+                timeout = None
+                if self._heap:
+                    # Wake on tick boundaries so holds due in the same tick expire together
+                    wake_at = math.ceil(self._heap[0][0] / self.tick_seconds) * self.tick_seconds
+                    timeout = max(wake_at - now, 0)
+                self._cond.wait(timeout)
+            return None
+
+    def _run(self) -> None:
+        while True:
+            due = self._pop_due()
+            if due is None:
+                return
+            try:
+                self.on_expire(due)
+            except Exception as e:
+                print(f"Error in hold expiry callback: {str(e)}")
+
+
+# Global instance (initialized with the app's expiry callback)
+hold_expiry_scheduler: Optional[HoldExpiryScheduler] = None
+
+
+def init_hold_expiry_scheduler(on_expire, tick_seconds: float = 1.0) -> HoldExpiryScheduler:
+    """Initialize and start the hold expiry scheduler"""
+    global hold_expiry_scheduler
+    if hold_expiry_scheduler is None:
+        hold_expiry_scheduler = HoldExpiryScheduler(on_expire, tick_seconds=tick_seconds)
+        hold_expiry_scheduler.start()
+    return hold_expiry_scheduler
+
+
+def get_hold_expiry_scheduler() -> Optional[HoldExpiryScheduler]:
+    """Get hold expiry scheduler instance"""
+    return hold_expiry_scheduler
@@ -0,0 +1,256 @@
+"""
+General-admission inventory counters
+One Redis counter of remaining tickets per non-seated ticket type. Orders
+take tickets with an atomic check-and-decrement, and cancelled or expired
+orders give them back, so concurrent buyers can never oversell and the
+TicketType row is not read-modify-written on every checkout. The durable
+sold counts are reconciled back to MySQL in batches (see InventoryService).
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.extensions import get_redis
+
+# Take ARGV[1] tickets if that many are left.
+# Returns {1, remaining} on success, {0, remaining} when there are not enough
+# and {-1, 0} when the counter is not loaded yet.
+RESERVE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return {-1, 0}
+end
+local available = tonumber(value)
+local quantity = tonumber(ARGV[1])
+if available < quantity then
+    return {0, available}
+end
+return {1, redis.call('DECRBY', KEYS[1], quantity)}
+"""
+
+# Give tickets back (a counter that is not loaded is rebuilt from MySQL later)
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+class InventoryCounter:
+    """Remaining-ticket counters per ticket type (Redis, in-memory fallback)"""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client
+        self.prefix = Config.REDIS_INVENTORY_PREFIX
+        self.dirty_key = Config.REDIS_INVENTORY_DIRTY_KEY
+        self._reserve_script = None
+        self._release_script = None
+        if redis_client is not None:
+            try:
+                self._reserve_script = redis_client.register_script(RESERVE_SCRIPT)
+                self._release_script = redis_client.register_script(RELEASE_SCRIPT)
+            except Exception as e:
+                print(f"Error registering inventory scripts: {str(e)}")
+        self._fallback_counters = {}
+        self._fallback_dirty = set()
+        self._fallback_lock = threading.Lock()
+
+    def _get_key(self, ticket_type_id: int) -> str:
+        return f"{self.prefix}{ticket_type_id}"
+
+    def reserve(
+        self,
+        ticket_type_id: int,
+        quantity: int,
+        load_available: Callable[[], int]
+    ) -> Tuple[bool, int]:
+        """
+        Atomically take `quantity` tickets of a ticket type
+
+        Args:
+            ticket_type_id: Ticket type ID
+            quantity: Tickets to take
+            load_available: Computes the remaining tickets from MySQL; called
+                only when the counter is not loaded yet
+
+        Returns:
+            (success, remaining tickets)
+        """
+        ticket_type_id = int(ticket_type_id)
+        quantity = int(quantity)
+
+        if self._reserve_script is not None:
+            try:
+                key = self._get_key(ticket_type_id)
+                status, remaining = self._reserve_script(keys=[key], args=[quantity])
+                if int(status) == -1:
+                    # First use: load the counter (NX: another process may
+                    # have loaded it meanwhile) and retry
+                    self.redis.set(key, int(load_available()), nx=True)
+                    status, remaining = self._reserve_script(keys=[key], args=[quantity])
+                return int(status) == 1, int(remaining)
+            except Exception as e:
+                print(f"Error reserving inventory in Redis: {str(e)}")
+                # Fall through to fallback
+
+        with self._fallback_lock:
+            if ticket_type_id not in self._fallback_counters:
+                self._fallback_counters[ticket_type_id] = int(load_available())
+            available = self._fallback_counters[ticket_type_id]
+            if available < quantity:
+                return False, available
+            self._fallback_counters[ticket_type_id] = available - quantity
+            return True, available - quantity
+
+    def release(self, counts: Dict[int, int]) -> None:
+        """Give tickets back, e.g. {ticket_type_id: quantity}"""
+        counts = {int(k): int(v) for k, v in counts.items() if v}
+        if not counts:
+            return
+
+        if self._release_script is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for ticket_type_id, quantity in counts.items():
+                    self._release_script(keys=[self._get_key(ticket_type_id)], args=[quantity], client=pipe)
+                pipe.execute()
+                return
+            except Exception as e:
+                print(f"Error releasing inventory in Redis: {str(e)}")
+                # Fall through to fallback
+
+        with self._fallback_lock:
+            for ticket_type_id, quantity in counts.items():
+                if ticket_type_id in self._fallback_counters:
+                    self._fallback_counters[ticket_type_id] += quantity
+
+    def get_available(self, ticket_type_id: int) -> Optional[int]:
+        """Remaining tickets, or None when the counter is not loaded"""
+        ticket_type_id = int(ticket_type_id)
+        if self.redis is not None:
+            try:
+                value = self.redis.get(self._get_key(ticket_type_id))
+                return int(value) if value is not None else None
+            except Exception as e:
+                print(f"Error reading inventory from Redis: {str(e)}")
+        with self._fallback_lock:
+            return self._fallback_counters.get(ticket_type_id)
+
+    def reset(self, ticket_type_ids: Iterable[int]) -> None:
+        """Drop counters so they are reloaded from MySQL (e.g. quantity changed)"""
+        ticket_type_ids = [int(ticket_type_id) for ticket_type_id in ticket_type_ids]
+        if not ticket_type_ids:
+            return
+        if self.redis is not None:
+            try:
+                self.redis.delete(*[self._get_key(ticket_type_id) for ticket_type_id in ticket_type_ids])
+            except Exception as e:
+                print(f"Error resetting inventory in Redis: {str(e)}")
+        with self._fallback_lock:
+            for ticket_type_id in ticket_type_ids:
+                self._fallback_counters.pop(ticket_type_id, None)
+
+    def mark_dirty(self, ticket_type_ids: Iterable[int]) -> None:
+        """Queue ticket types whose sold count must be reconciled to MySQL"""
+        ticket_type_ids = {int(ticket_type_id) for ticket_type_id in ticket_type_ids}
+        if not ticket_type_ids:
+            return
+        if self.redis is not None:
+            try:
+                self.redis.sadd(self.dirty_key, *ticket_type_ids)
+                return
+            except Exception as e:
+                print(f"Error marking inventory dirty in Redis: {str(e)}")
+                # Fall through to fallback
+        with self._fallback_lock:
+            self._fallback_dirty.update(ticket_type_ids)
+
+    def pop_dirty(self, limit: int = 500) -> List[int]:
+        """Take up to `limit` ticket types from the reconciliation queue"""
+        ticket_type_ids = []
+        with self._fallback_lock:
+            while self._fallback_dirty and len(ticket_type_ids) < limit:
+                ticket_type_ids.append(self._fallback_dirty.pop())
+        if self.redis is not None and len(ticket_type_ids) < limit:
+            try:
+                popped = self.redis.spop(self.dirty_key, limit - len(ticket_type_ids)) or []
+                ticket_type_ids.extend(int(ticket_type_id) for ticket_type_id in popped)
+            except Exception as e:
+                print(f"Error popping dirty inventory from Redis: {str(e)}")
+        return ticket_type_ids
+
+
+# Global instance
+inventory_counter: Optional[InventoryCounter] = None
+
+
+def init_inventory_counter(redis_client=None) -> InventoryCounter:
+    """Initialize inventory counter"""
+    global inventory_counter
+    inventory_counter = InventoryCounter(redis_client)
+    return inventory_counter
+
+
+def get_inventory_counter() -> InventoryCounter:
+    """Get inventory counter instance (created on first use)"""
+    global inventory_counter
+    if inventory_counter is None:
+        init_inventory_counter(get_redis())
+    return inventory_counter
+
+
+def _pending(session, name):
+    return session.info.setdefault(name, defaultdict(int))
+
+
+def track_reserved(session, ticket_type_id: int, quantity: int) -> None:
+    """Tickets taken in this transaction: given back if it rolls back"""
+    _pending(session, 'inventory_reserved')[int(ticket_type_id)] += int(quantity)
+
+
+def release_on_commit(session, counts: Dict[int, int]) -> None:
+    """Tickets to give back once this transaction commits"""
+    pending = _pending(session, 'inventory_released')
+    for ticket_type_id, quantity in counts.items():
+        pending[int(ticket_type_id)] += int(quantity)
+
+
+def reconcile_on_commit(session, ticket_type_ids: Iterable[int]) -> None:
+    """Ticket types whose sold count changed in this transaction"""
+    session.info.setdefault('inventory_dirty', set()).update(int(i) for i in ticket_type_ids)
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _apply_committed_inventory(session):
+    session.info.pop('inventory_reserved', None)
+    released = session.info.pop('inventory_released', None)
+    dirty = session.info.pop('inventory_dirty', None)
+    if not released and not dirty:
+        return
+    try:
+        counter = get_inventory_counter()
+        if released:
+            counter.release(released)
+        if dirty:
+            counter.mark_dirty(dirty)
+    except Exception as e:
+        print(f"Error applying committed inventory changes: {str(e)}")
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _return_reserved_inventory(session):
+    reserved = session.info.pop('inventory_reserved', None)
+    session.info.pop('inventory_released', None)
+    session.info.pop('inventory_dirty', None)
+    if not reserved:
+        return
+    try:
+        get_inventory_counter().release(reserved)
+    except Exception as e:
+        print(f"Error returning reserved inventory: {str(e)}")
@@ -0,0 +1,60 @@
+"""
+Cursor (keyset) pagination helpers
+A cursor is an opaque, URL-safe token holding the sort key of the last row
+of a page; the next page continues strictly after it, so pages stay stable
+while rows are inserted and deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of a row (datetimes, ints, strings) as a cursor"""
+    payload = [
+        {'dt': value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """
+    Decode a cursor made by encode_cursor
+
+    Args:
+        cursor: Cursor from the client (empty = first page)
+        size: Expected number of sort key values
+
+    Returns:
+        The sort key values, or None for the first page
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError
+        return [
+            datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+
+
+def parse_limit(limit: Optional[int], default: int = DEFAULT_PAGE_LIMIT, maximum: int = MAX_PAGE_LIMIT) -> int:
+    """Clamp a page size requested by the client"""
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
@@ -0,0 +1,174 @@
+"""
+Rendered ticket QR cache
+Bounded in-process LRU of rendered QR images, optionally backed by Redis so
+API processes share renders. QR images are a pure function of the ticket
+code and render settings, so entries never go stale and the strong ETag can
+be computed without rendering.
+"""
+
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from app.config import Config
+from app.extensions import get_redis
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+class QRImageCache:
+    """LRU of rendered QR bytes keyed by (format, payload)"""
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_items: int = 5000,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: int = 86400,
+        error_correction: str = 'M'
+    ):
+        """
+        Args:
+            redis_client: Redis client (None for in-process only)
+            max_items: Most images kept in process
+            max_bytes: Most image bytes kept in process
+            ttl: Redis entry lifetime in seconds
+            error_correction: QR error correction level ('L', 'M', 'Q', 'H')
+        """
+        self.redis_client = redis_client
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.error_correction = error_correction
+        self.prefix = Config.REDIS_QR_CACHE_PREFIX
+        self._entries = OrderedDict()  # key -> bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        # Metrics
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def etag(self, payload: str, fmt: str) -> str:
+        """Strong ETag of the image for payload (changes with the render settings)"""
+        digest = hashlib.sha1(f"{fmt}:{self.error_correction}:{payload}".encode('utf-8')).hexdigest()
+        return f"qr-{digest[:20]}"
+
+    def get_or_render(
+        self,
+        payload: str,
+        fmt: str = 'png',
+        validate: Optional[Callable[[], bool]] = None
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Get the rendered image for payload, rendering it on a miss
+
+        Args:
+            payload: Data encoded in the QR code
+            fmt: 'png' or 'svg'
+            validate: Called only on a full miss; returning False skips the
+                render (and caching) and returns None
+
+        Returns:
+            (image bytes, etag) or None
+        """
+        key = self.etag(payload, fmt)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image, key
+
+        image = self._get_shared(key)
+        if image is not None:
+            with self._lock:
+                self.redis_hits += 1
+            self._put_local(key, image)
+            return image, key
+
+        if validate is not None and not validate():
+            return None
+
+        from app.utils.qr_generator import render_qr
+        image = render_qr(payload, fmt=fmt, error_correction=self.error_correction)
+        with self._lock:
+            self.misses += 1
+        self._put_local(key, image)
+        self._put_shared(key, image)
+        return image, key
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'redis_hits': self.redis_hits,
+                'misses': self.misses,
+                'items': len(self._entries),
+                'bytes': self._size
+            }
+
+    def _put_local(self, key: str, image: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = image
+            self._size += len(image)
+            while self._entries and (len(self._entries) > self.max_items or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _get_shared(self, key: str) -> Optional[bytes]:
+        if not self.redis_client:
+            return None
+        try:
+            # Redis client decodes responses, so images are stored base64 encoded
+            value = self.redis_client.get(f"{self.prefix}{key}")
+            return base64.b64decode(value) if value else None
+        except Exception as e:
+            print(f"Error reading QR cache: {str(e)}")
+            return None
+
+    def _put_shared(self, key: str, image: bytes) -> None:
+        if not self.redis_client:
+            return
+        try:
+            self.redis_client.setex(f"{self.prefix}{key}", self.ttl, base64.b64encode(image).decode('ascii'))
+        except Exception as e:
+            print(f"Error writing QR cache: {str(e)}")
+
+
+# Global instance
+qr_image_cache: Optional[QRImageCache] = None
+
+
+def init_qr_image_cache(redis_client=None) -> QRImageCache:
+    """Initialize QR image cache"""
+    global qr_image_cache
+    qr_image_cache = QRImageCache(
+        redis_client,
+        max_items=Config.QR_CACHE_MAX_ITEMS,
+        max_bytes=Config.QR_CACHE_MAX_BYTES,
+        ttl=Config.QR_CACHE_TTL,
+        error_correction=Config.QR_ERROR_CORRECTION
+    )
+    return qr_image_cache
+
+
+def get_qr_image_cache() -> QRImageCache:
+    """Get QR image cache instance (created on first use)"""
+    global qr_image_cache
+    if qr_image_cache is None:
+        init_qr_image_cache(get_redis())
+    return qr_image_cache
+
+
+def get_ticket_qr_url(ticket_code: str, fmt: str = 'png') -> str:
+    """URL of a ticket's on-demand QR image (served to the ticket owner only)"""
+    return f"/api/tickets/{ticket_code}/qr.{fmt}"
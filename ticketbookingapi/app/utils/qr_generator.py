@@ -1,12 +1,22 @@
 """
 QR Code Generator Utility
-Generates QR codes for tickets and saves them to uploads directory
+Generates QR codes for tickets and saves them to uploads directory, or
+renders them to PNG/SVG bytes for the on-demand ticket QR endpoint
 """
 import qrcode
+import qrcode.image.svg
 import os
 from io import BytesIO
 import base64
 
+# Error correction levels by name (L ~7%, M ~15%, Q ~25%, H ~30% recoverable)
+ERROR_CORRECTION_LEVELS = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
 def generate_qr_code(data, save_path=None):
     """
     Generate QR code for given data
@@ -71,3 +81,41 @@ def generate_ticket_qr(ticket_code, ticket_id, save_to_file=True):
         return f"/uploads/qrcodes/{filename}"
     else:
         return generate_qr_code(qr_data)
+
+
+def render_qr(data, fmt='png', error_correction='M', box_size=10, border=4):
+    """
+    Render a QR code to image bytes (deterministic for the same arguments)
+
+    Ticket codes are short and shown on screens or clean printouts, so the
+    default level M keeps the symbol at a low version (fewer, larger modules
+    that scan faster) instead of H, which roughly doubles the symbol size.
+
+    Args:
+        data: String data to encode in QR code
+        fmt: 'png' or 'svg'
+        error_correction: 'L', 'M', 'Q' or 'H'
+        box_size: Size of each box in pixels (PNG)
+        border: Border size in boxes
+
+    Returns:
+        bytes: Encoded image
+    """
+    qr = qrcode.QRCode(
+        version=None,  # Smallest version that fits the data
+        error_correction=ERROR_CORRECTION_LEVELS.get(str(error_correction).upper(), qrcode.constants.ERROR_CORRECT_M),
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    buffered = BytesIO()
+    if fmt == 'svg':
+        # Single <path> SVG: scales to any size without blurring
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+        img.save(buffered)
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
+        img.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
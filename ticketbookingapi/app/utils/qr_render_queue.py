@@ -0,0 +1,163 @@
+"""
+Ticket QR render queue
+Pre-renders ticket QR codes into the QR image cache in a small worker pool
+after the order transaction commits, so checkout latency does not depend on
+image encoding and the first fetch of a new ticket's QR is a cache hit.
+"""
+
+import queue
+import threading
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+
+
+class QRRenderQueue:
+    """Worker pool that renders ticket QR codes into the QR image cache"""
+
+    def __init__(self, app, workers: int = 2, batch_size: int = 100):
+        """
+        Args:
+            app: Flask app (workers run inside its app context)
+            workers: Number of render threads
+            batch_size: Most tickets taken off the queue at once
+        """
+        self.app = app
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        # Metrics
+        self.rendered = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, ticket_codes: Iterable[str]) -> None:
+        """Queue ticket codes for rendering"""
+        for ticket_code in ticket_codes:
+            self._queue.put(ticket_code)
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'qr-render-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued ticket is processed (scripts and tests)"""
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        return done.wait(timeout)
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'rendered': self.rendered,
+                'failed': self.failed,
+                'batches': self.batches,
+                'queued': self._queue.qsize()
+            }
+
+    def _next_batch(self) -> List[str]:
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._render_batch(batch)
+            except Exception as e:
+                print(f"Error rendering ticket QR codes: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _render_batch(self, batch: List[str]) -> None:
+        from app.utils.qr_cache import get_qr_image_cache
+
+        rendered = 0
+        failed = 0
+        with self.app.app_context():
+            cache = get_qr_image_cache()
+            for ticket_code in batch:
+                try:
+                    cache.get_or_render(ticket_code, 'png')
+                    rendered += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"Error generating QR code: {e}")
+
+        with self._lock:
+            self.rendered += rendered
+            self.failed += failed
+            self.batches += 1
+
+
+# Global instance (created with the app, started on first use)
+qr_render_queue: Optional[QRRenderQueue] = None
+
+
+def init_qr_render_queue(app, workers: int = None, batch_size: int = None) -> QRRenderQueue:
+    """Initialize the QR render queue for an app"""
+    global qr_render_queue
+    qr_render_queue = QRRenderQueue(
+        app,
+        workers=workers or Config.QR_RENDER_WORKERS,
+        batch_size=batch_size or Config.QR_RENDER_BATCH_SIZE
+    )
+    return qr_render_queue
+
+
+def get_qr_render_queue() -> Optional[QRRenderQueue]:
+    """Get QR render queue instance"""
+    return qr_render_queue
+
+
+def render_ticket_qr_on_commit(tickets: Iterable) -> None:
+    """
+    Pre-render QR codes for tickets created in the current DB transaction
+
+    The tickets are queued only once the transaction commits (a rolled back
+    order renders nothing), and rendering never runs inside the transaction.
+    """
+    from app.extensions import db
+
+    pending = db.session.info.setdefault('qr_pending', [])
+    pending.extend(ticket.ticket_code for ticket in tickets)
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _enqueue_committed_tickets(session):
+    pending = session.info.pop('qr_pending', None)
+    if not pending:
+        return
+    render_queue = get_qr_render_queue()
+    if render_queue is None:
+        return
+    try:
+        render_queue.start()
+        render_queue.enqueue(pending)
+    except Exception as e:
+        print(f"Error queueing ticket QR codes: {str(e)}")
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _discard_pending_tickets(session):
+    session.info.pop('qr_pending', None)
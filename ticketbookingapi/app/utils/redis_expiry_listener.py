@@ -0,0 +1,119 @@
+"""
+Redis expired-key listener
+Subscribes to Redis keyspace notifications for expired keys and hands the
+IDs of expired keys under a prefix to a callback in small debounced batches,
+so seat holds can be released as soon as Redis expires them.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional, Set
+
+
+class RedisExpiryListener:
+    """Background subscriber for `__keyevent@<db>__:expired` notifications"""
+
+    def __init__(
+        self,
+        redis_client,
+        key_prefix: str,
+        on_expired: Callable[[List[int]], None],
+        db_index: int = 0,
+        flush_interval: float = 0.2
+    ):
+        """
+        Args:
+            redis_client: Redis client (decode_responses=True)
+            key_prefix: Only keys starting with this prefix are reported
+            on_expired: Called with the integer suffixes of expired keys
+            db_index: Redis logical database to listen on
+            flush_interval: Debounce window in seconds
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.on_expired = on_expired
+        self.channel = f"__keyevent@{db_index}__:expired"
+        self.flush_interval = flush_interval
+        self.received_count = 0
+        self.flush_count = 0
+        self._thread = None
+        self._running = False
+
+    def enable_notifications(self) -> bool:
+        """
+        Turn on expired-key events on the server (`notify-keyspace-events Ex`)
+
+        Managed Redis services often reject CONFIG; in that case the events
+        must be enabled in the server configuration instead.
+        """
+        try:
+            current = self.redis.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+            if ('E' in current and 'x' in current) or ('E' in current and 'A' in current):
+                return True
+            flags = ''.join(sorted(set(current + 'Ex')))
+            self.redis.config_set('notify-keyspace-events', flags)
+            return True
+        except Exception as e:
+            print(f"Could not enable Redis keyspace notifications: {str(e)}")
+            return False
+
+    def start(self) -> None:
+        """Start the listener thread (idempotent)"""
+        if self._running:
+            return
+        self._running = True
+        self.enable_notifications()
+        self._thread = threading.Thread(target=self._run, name='redis-expiry-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the listener thread"""
+        self._running = False
+
+    def _parse_id(self, key) -> Optional[int]:
+        if isinstance(key, bytes):
+            key = key.decode()
+        if not isinstance(key, str) or not key.startswith(self.key_prefix):
+            return None
+        suffix = key[len(self.key_prefix):]
+        return int(suffix) if suffix.isdigit() else None
+
+    def _flush(self, pending: Set[int]) -> None:
+        self.flush_count += 1
+        try:
+            self.on_expired(sorted(pending))
+        except Exception as e:
+            print(f"Error in expiry listener callback: {str(e)}")
+
+    def _run(self) -> None:
+        backoff = 1
+        while self._running:
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1
+                pending: Set[int] = set()
+                first_pending_at = 0.0
+                while self._running:
+                    message = pubsub.get_message(timeout=self.flush_interval)
+                    if message and message.get('type') == 'message':
+                        key_id = self._parse_id(message.get('data'))
+                        if key_id is not None:
+                            self.received_count += 1
+                            if not pending:
+                                first_pending_at = time.monotonic()
+                            pending.add(key_id)
+                    if pending and time.monotonic() - first_pending_at >= self.flush_interval:
+                        self._flush(pending)
+                        pending = set()
+            except Exception as e:
+                print(f"Redis expiry listener error: {str(e)}; reconnecting in {backoff}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
@@ -4,28 +4,250 @@ Stores seat reservations in Redis with TTL for automatic expiration
 """
 
 import json
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
 from app.config import Config
 from app.extensions import get_redis
 from app.utils.datetime_utils import now_gmt7
 
 
+# Shared Lua helper: does the hold stored in `value` belong to `user_id`?
+# user_id is compared as an integer string so 5, 5.0 and "5" all match.
+_LUA_OWNED_BY = """
+local function owned_by(value, user_id)
+    local ok, data = pcall(cjson.decode, value)
+    if not ok or type(data) ~= 'table' then
+        return false
+    end
+    local owner = tonumber(data['user_id'])
+    return owner ~= nil and string.format('%d', owner) == user_id
+end
+"""
+
+# Acquire every seat for one user, or none of them, and index the new holds.
+# KEYS: hold key per seat, then user index, event index, active events index
+# ARGV[1]: user id, ARGV[2]: ttl in seconds, ARGV[3]: event id,
+# ARGV[4..]: JSON payload per seat
+# Index scores are expiry times in milliseconds taken from the Redis clock, so
+# they line up exactly with the key TTLs.
+# Returns {1, acquired, payload...} on success, where acquired lists the 1-based
+# positions of the seats newly held (existing holds of the same user are kept
+# as-is), or {0, index...} with the 1-based positions of conflicting seats.
+HOLD_SEATS_SCRIPT = _LUA_OWNED_BY + """
+local n = #KEYS - 3
+local user_key, event_key, active_key = KEYS[n + 1], KEYS[n + 2], KEYS[n + 3]
+local user_id, ttl, event_id = ARGV[1], tonumber(ARGV[2]), ARGV[3]
+local conflicts = {0}
+local current = {}
+for i = 1, n do
+    local value = redis.call('GET', KEYS[i])
+    if value then
+        if owned_by(value, user_id) then
+            current[i] = value
+        else
+            table.insert(conflicts, i)
+        end
+    end
+end
+if #conflicts > 1 then
+    return conflicts
+end
+local now = redis.call('TIME')
+local expires_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000) + ttl * 1000
+local score = string.format('%d', expires_ms)
+local acquired = {}
+local held = {1, acquired}
+for i = 1, n do
+    if current[i] then
+        table.insert(held, current[i])
+    else
+        local seat_id = string.match(KEYS[i], '(%d+)$')
+        redis.call('SET', KEYS[i], ARGV[i + 3], 'PX', ttl * 1000)
+        redis.call('ZADD', user_key, score, event_id .. ':' .. seat_id)
+        redis.call('ZADD', event_key, score, seat_id .. ':' .. user_id)
+        table.insert(held, ARGV[i + 3])
+        table.insert(acquired, i)
+    end
+end
+if #acquired > 0 then
+    local top = redis.call('ZSCORE', active_key, event_id)
+    if not top or tonumber(top) < expires_ms then
+        redis.call('ZADD', active_key, score, event_id)
+    end
+end
+return held
+"""
+
+# Delete the holds that belong to ARGV[1] (compare-and-delete) and drop them
+# from the indexes.
+# KEYS: hold key per seat, then user index, event index
+# ARGV[1]: user id, ARGV[2]: event id
+# Returns the 1-based positions of the released seats.
+RELEASE_SEATS_SCRIPT = _LUA_OWNED_BY + """
+local n = #KEYS - 2
+local user_key, event_key = KEYS[n + 1], KEYS[n + 2]
+local released = {}
+for i = 1, n do
+    local value = redis.call('GET', KEYS[i])
+    if value and owned_by(value, ARGV[1]) then
+        local seat_id = string.match(KEYS[i], '(%d+)$')
+        redis.call('DEL', KEYS[i])
+        redis.call('ZREM', user_key, ARGV[2] .. ':' .. seat_id)
+        redis.call('ZREM', event_key, seat_id .. ':' .. ARGV[1])
+        table.insert(released, i)
+    end
+end
+return released
+"""
+
+# Unconditionally delete one hold and its index entries.
+# KEYS[1]: hold key
+# ARGV[1]: user index prefix, ARGV[2]: event index prefix
+DELETE_HOLD_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+local ok, data = pcall(cjson.decode, value)
+if ok and type(data) == 'table' and tonumber(data['user_id']) and tonumber(data['event_id']) then
+    local seat_id = string.match(KEYS[1], '(%d+)$')
+    local user_id = string.format('%d', tonumber(data['user_id']))
+    local event_id = string.format('%d', tonumber(data['event_id']))
+    redis.call('ZREM', ARGV[1] .. user_id, event_id .. ':' .. seat_id)
+    redis.call('ZREM', ARGV[2] .. event_id, seat_id .. ':' .. user_id)
+end
+return 1
+"""
+
+# Collect holds whose expiry has passed, using range queries on the event
+# indexes instead of a keyspace scan, and remove them from every index.
+# KEYS[1]: active events index
+# ARGV[1]: event index prefix, ARGV[2]: user index prefix,
+# ARGV[3]: hold key prefix, ARGV[4]: max entries per event
+# Returns "event_id:seat_id:user_id" for each hold that expired without being
+# taken over by someone else.
+REAP_EXPIRED_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local upper = '(' .. string.format('%d', now_ms)
+local limit = tonumber(ARGV[4])
+local reaped = {}
+local events = redis.call('ZRANGE', KEYS[1], 0, -1)
+for _, event_id in ipairs(events) do
+    local event_key = ARGV[1] .. event_id
+    local expired = redis.call('ZRANGEBYSCORE', event_key, '-inf', upper, 'LIMIT', 0, limit)
+    for _, member in ipairs(expired) do
+        redis.call('ZREM', event_key, member)
+        local seat_id, user_id = string.match(member, '^(%d+):(%d+)$')
+        if seat_id then
+            local user_key = ARGV[2] .. user_id
+            local user_member = event_id .. ':' .. seat_id
+            local score = redis.call('ZSCORE', user_key, user_member)
+            if score and tonumber(score) < now_ms then
+                redis.call('ZREM', user_key, user_member)
+            end
+            if redis.call('EXISTS', ARGV[3] .. seat_id) == 0 then
+                table.insert(reaped, event_id .. ':' .. seat_id .. ':' .. user_id)
+            end
+        end
+    end
+    if redis.call('ZCARD', event_key) == 0 then
+        redis.call('ZREM', KEYS[1], event_id)
+    end
+end
+return reaped
+"""
+
+
+# Reap specific holds (the ones a scheduler saw fall due) instead of scanning
+# the indexes. A hold is reaped only if its key is gone and its index entry is
+# still there, so holds released or consumed on purpose are left alone.
+# KEYS: hold key per seat
+# ARGV[1]: event index prefix, ARGV[2]: user index prefix,
+# ARGV[3..]: "event_id:seat_id:user_id" per seat
+# Returns {reaped, live}: 1-based positions of the reaped holds and of holds
+# the same user still has (not expired yet).
+REAP_HOLDS_SCRIPT = _LUA_OWNED_BY + """
+local reaped, live = {}, {}
+for i = 1, #KEYS do
+    local event_id, seat_id, user_id = string.match(ARGV[i + 2], '^(%d+):(%d+):(%d+)$')
+    if event_id then
+        local value = redis.call('GET', KEYS[i])
+        if value and owned_by(value, user_id) then
+            table.insert(live, i)
+        else
+            local event_key = ARGV[1] .. event_id
+            local indexed = redis.call('ZREM', event_key, seat_id .. ':' .. user_id)
+            redis.call('ZREM', ARGV[2] .. user_id, event_id .. ':' .. seat_id)
+            if indexed == 1 and not value then
+                table.insert(reaped, i)
+            end
+        end
+    end
+end
+return {reaped, live}
+"""
+
+
 class RedisReservationManager:
     """Manage seat reservations with Redis storage"""
     
     def __init__(self, redis_client=None):
         self.redis = redis_client or get_redis()
         self.reservation_prefix = Config.REDIS_SEAT_RESERVATION_PREFIX
+        self.user_index_prefix = Config.REDIS_SEAT_HOLDS_USER_PREFIX
+        self.event_index_prefix = Config.REDIS_SEAT_HOLDS_EVENT_PREFIX
+        self.active_events_key = Config.REDIS_SEAT_HOLDS_ACTIVE_EVENTS_KEY
+        self.dirty_seats_key = Config.REDIS_SEAT_STATE_DIRTY_KEY
         self.default_ttl = 300  # 5 minutes in seconds
+        self.reap_batch_size = 1000  # max expired holds reaped per event per call
         # Fallback in-memory storage if Redis unavailable
         self._fallback_storage = {}
+        self._fallback_dirty = set()
         self._use_fallback = False
+        # Guards multi-seat operations on the fallback storage so they stay all-or-nothing
+        self._fallback_lock = threading.Lock()
+        self._hold_script = None
+        self._release_script = None
+        self._delete_script = None
+        self._reap_script = None
+        self._reap_holds_script = None
+        if self.redis is not None:
+            self._hold_script = self.redis.register_script(HOLD_SEATS_SCRIPT)
+            self._release_script = self.redis.register_script(RELEASE_SEATS_SCRIPT)
+            self._delete_script = self.redis.register_script(DELETE_HOLD_SCRIPT)
+            self._reap_script = self.redis.register_script(REAP_EXPIRED_SCRIPT)
+            self._reap_holds_script = self.redis.register_script(REAP_HOLDS_SCRIPT)
+    
+    @staticmethod
+    def normalize_seat_ids(seat_ids: Iterable[int]) -> List[int]:
+        """Normalize seat IDs to ints, dropping duplicates but keeping order"""
+        seen = set()
+        result = []
+        for seat_id in seat_ids:
+            seat_id = int(seat_id)
+            if seat_id not in seen:
+                seen.add(seat_id)
+                result.append(seat_id)
+        return result
     
     def _get_key(self, seat_id: int) -> str:
         """Get Redis key for a seat reservation"""
         return f"{self.reservation_prefix}{seat_id}"
     
+    def _get_user_index_key(self, user_id: int) -> str:
+        """Get Redis key for a user's hold index"""
+        return f"{self.user_index_prefix}{user_id}"
+    
+    def _get_event_index_key(self, event_id: int) -> str:
+        """Get Redis key for an event's hold index"""
+        return f"{self.event_index_prefix}{event_id}"
+    
     def _check_redis_available(self) -> bool:
         """Check if Redis is available"""
         if self.redis is None:
@@ -53,41 +275,165 @@ class RedisReservationManager:
             duration_minutes: Reservation duration in minutes (default: 5)
             
         Returns:
-            True if created successfully
+            True if created successfully (False if held by another user)
         """
-        reserved_at = now_gmt7()
-        expires_at = reserved_at + timedelta(minutes=duration_minutes)
-        ttl_seconds = duration_minutes * 60
+        result = self.hold_seats(event_id, user_id, [seat_id], ttl=duration_minutes * 60)
+        return result['success']
+    
+    def hold_seats(
+        self,
+        event_id: int,
+        user_id: int,
+        seat_ids: Iterable[int],
+        ttl: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Atomically hold several seats for one user (all-or-nothing)
         
-        reservation_data = {
-            'seat_id': seat_id,
-            'user_id': user_id,
-            'event_id': event_id,
-            'reserved_at': reserved_at.isoformat(),
-            'expires_at': expires_at.isoformat()
-        }
+        Every seat is acquired with SET NX semantics in a single Lua script, so
+        a selection costs one Redis round trip. Seats the user already holds are
+        kept with their current expiry. New holds are added to the per-user and
+        per-event indexes in the same script.
         
-        if self._check_redis_available():
+        Args:
+            event_id: Event ID
+            user_id: User ID
+            seat_ids: Seat IDs to hold
+            ttl: Hold duration in seconds (default: 5 minutes)
+            
+        Returns:
+            Dict with 'success', 'held' (reservation data per seat, in request
+            order), 'acquired' (seat IDs newly held, i.e. not already held by
+            this user) and 'conflicts' (seat IDs held by another user)
+        """
+        seat_ids = self.normalize_seat_ids(seat_ids)
+        user_id = int(user_id)
+        event_id = int(event_id)
+        ttl = int(ttl or self.default_ttl)
+        if not seat_ids:
+            return {'success': True, 'held': [], 'acquired': [], 'conflicts': []}
+        
+        reserved_at = now_gmt7()
+        expires_at = reserved_at + timedelta(seconds=ttl)
+        payloads = [
+            {
+                'seat_id': seat_id,
+                'user_id': user_id,
+                'event_id': event_id,
+                'reserved_at': reserved_at.isoformat(),
+                'expires_at': expires_at.isoformat()
+            }
+            for seat_id in seat_ids
+        ]
+        
+        if self._hold_script is not None:
             try:
-                redis_key = self._get_key(seat_id)
-                self.redis.setex(
-                    redis_key,
-                    ttl_seconds,
-                    json.dumps(reservation_data)
+                keys = [self._get_key(seat_id) for seat_id in seat_ids]
+                keys += [
+                    self._get_user_index_key(user_id),
+                    self._get_event_index_key(event_id),
+                    self.active_events_key
+                ]
+                result = self._hold_script(
+                    keys=keys,
+                    args=[user_id, ttl, event_id] + [json.dumps(p) for p in payloads]
                 )
-                return True
+                if int(result[0]) == 1:
+                    return {
+                        'success': True,
+                        'held': [json.loads(value) for value in result[2:]],
+                        'acquired': [seat_ids[int(i) - 1] for i in result[1]],
+                        'conflicts': []
+                    }
+                return {
+                    'success': False,
+                    'held': [],
+                    'acquired': [],
+                    'conflicts': [seat_ids[int(i) - 1] for i in result[1:]]
+                }
             except Exception as e:
-                print(f"Error creating reservation in Redis: {str(e)}")
+                print(f"Error holding seats in Redis: {str(e)}")
                 # Fall through to fallback
         
         # Fallback to in-memory storage
-        self._use_fallback = True
-        redis_key = self._get_key(seat_id)
-        self._fallback_storage[redis_key] = {
-            'data': reservation_data,
-            'expires_at': expires_at
-        }
-        return True
+        with self._fallback_lock:
+            self._use_fallback = True
+            now = now_gmt7()
+            held = []
+            to_store = []
+            conflicts = []
+            for seat_id, payload in zip(seat_ids, payloads):
+                stored = self._fallback_storage.get(self._get_key(seat_id))
+                if stored and stored['expires_at'] >= now:
+                    if stored['data'].get('user_id') == user_id:
+                        held.append(stored['data'])
+                    else:
+                        conflicts.append(seat_id)
+                    continue
+                held.append(payload)
+                to_store.append(payload)
+            
+            if conflicts:
+                return {'success': False, 'held': [], 'acquired': [], 'conflicts': conflicts}
+            
+            for payload in to_store:
+                self._fallback_storage[self._get_key(payload['seat_id'])] = {
+                    'data': payload,
+                    'expires_at': expires_at
+                }
+            return {
+                'success': True,
+                'held': held,
+                'acquired': [payload['seat_id'] for payload in to_store],
+                'conflicts': []
+            }
+    
+    def release_seats(
+        self,
+        event_id: int,
+        user_id: int,
+        seat_ids: Iterable[int]
+    ) -> List[int]:
+        """
+        Atomically release the given seats if they are held by this user
+        
+        Args:
+            event_id: Event ID
+            user_id: User ID
+            seat_ids: Seat IDs to release
+            
+        Returns:
+            List of seat IDs that were actually released
+        """
+        seat_ids = self.normalize_seat_ids(seat_ids)
+        user_id = int(user_id)
+        event_id = int(event_id)
+        if not seat_ids:
+            return []
+        
+        if self._release_script is not None:
+            try:
+                keys = [self._get_key(seat_id) for seat_id in seat_ids]
+                keys += [
+                    self._get_user_index_key(user_id),
+                    self._get_event_index_key(event_id)
+                ]
+                result = self._release_script(keys=keys, args=[user_id, event_id])
+                return [seat_ids[int(i) - 1] for i in result]
+            except Exception as e:
+                print(f"Error releasing seats in Redis: {str(e)}")
+                # Fall through to fallback
+        
+        # Fallback to in-memory storage
+        released = []
+        with self._fallback_lock:
+            for seat_id in seat_ids:
+                key = self._get_key(seat_id)
+                stored = self._fallback_storage.get(key)
+                if stored and stored['data'].get('user_id') == user_id:
+                    del self._fallback_storage[key]
+                    released.append(seat_id)
+        return released
     
     def get_reservation(self, seat_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -130,7 +476,7 @@ class RedisReservationManager:
     
     def delete_reservation(self, seat_id: int) -> bool:
         """
-        Delete a reservation
+        Delete a reservation (and its index entries)
         
         Args:
             seat_id: Seat ID
@@ -138,10 +484,12 @@ class RedisReservationManager:
         Returns:
             True if deleted successfully
         """
-        if self._check_redis_available():
+        if self._delete_script is not None:
             try:
-                redis_key = self._get_key(seat_id)
-                self.redis.delete(redis_key)
+                self._delete_script(
+                    keys=[self._get_key(seat_id)],
+                    args=[self.user_index_prefix, self.event_index_prefix]
+                )
                 return True
             except Exception as e:
                 print(f"Error deleting reservation from Redis: {str(e)}")
@@ -159,6 +507,9 @@ class RedisReservationManager:
         """
         Get all reservations for a user, optionally filtered by event
         
+        Reads the user's hold index (only unexpired entries) and fetches the
+        holds with a single MGET, so the cost is O(user's holds).
+        
         Args:
             user_id: User ID
             event_id: Optional event ID to filter by
@@ -167,42 +518,44 @@ class RedisReservationManager:
             List of reservation data
         """
         reservations = []
+        user_id = int(user_id)
+        event_id = int(event_id) if event_id is not None else None
         
-        if self._check_redis_available():
+        if self.redis is not None:
             try:
-                pattern = f"{self.reservation_prefix}*"
-                for key in self.redis.scan_iter(match=pattern):
-                    try:
-                        data = self.redis.get(key)
+                now_ms = int(time.time() * 1000)
+                members = self.redis.zrangebyscore(
+                    self._get_user_index_key(user_id), now_ms, '+inf'
+                )
+                seat_ids = []
+                for member in members:
+                    member_event_id, _, seat_id = member.partition(':')
+                    if event_id is None or member_event_id == str(event_id):
+                        seat_ids.append(int(seat_id))
+                
+                if seat_ids:
+                    values = self.redis.mget([self._get_key(seat_id) for seat_id in seat_ids])
+                    for data in values:
                         if not data:
                             continue
-                        
-                        reservation = json.loads(data)
+                        try:
+                            reservation = json.loads(data)
+                        except (json.JSONDecodeError, TypeError) as e:
+                            print(f"Error parsing reservation data: {str(e)}")
+                            continue
+                        # The seat may have been released and re-held by someone else
                         if reservation.get('user_id') == user_id:
-                            if event_id is None or reservation.get('event_id') == event_id:
-                                # Check if expired
-                                expires_at = datetime.fromisoformat(reservation['expires_at'])
-                                if expires_at >= now_gmt7():
-                                    reservations.append(reservation)
-                                else:
-                                    # Expired, delete it
-                                    seat_id = reservation.get('seat_id')
-                                    if seat_id:
-                                        self.delete_reservation(seat_id)
-                    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-                        print(f"Error parsing reservation data: {str(e)}")
-                        continue
+                            reservations.append(reservation)
+                return reservations
             except Exception as e:
                 print(f"Error getting user reservations from Redis: {str(e)}")
                 # Fall through to fallback
         
         # Fallback to in-memory storage
-        if self._use_fallback or not self._check_redis_available():
-            now = now_gmt7()
+        now = now_gmt7()
+        with self._fallback_lock:
             for key, stored in list(self._fallback_storage.items()):
                 if stored['expires_at'] < now:
-                    # Expired, remove it
-                    del self._fallback_storage[key]
                     continue
                 
                 reservation = stored['data']
@@ -225,44 +578,260 @@ class RedisReservationManager:
         reservation = self.get_reservation(seat_id)
         return reservation is not None
     
-    def cleanup_expired(self) -> int:
+    def get_hold_owners(self, seat_ids: Iterable[int]) -> Dict[int, int]:
         """
-        Clean up expired reservations (Redis TTL handles this automatically,
-        but this method can be used for manual cleanup of fallback storage)
+        Get the owners of live holds for a set of seats (single MGET)
         
+        Args:
+            seat_ids: Seat IDs
+            
         Returns:
-            Number of reservations cleaned up
+            Dict of seat_id -> user_id for seats that are currently held
+        """
+        seat_ids = self.normalize_seat_ids(seat_ids)
+        owners = {}
+        if not seat_ids:
+            return owners
+        
+        if self.redis is not None:
+            try:
+                values = self.redis.mget([self._get_key(seat_id) for seat_id in seat_ids])
+                for seat_id, data in zip(seat_ids, values):
+                    if not data:
+                        continue
+                    try:
+                        owners[seat_id] = int(json.loads(data)['user_id'])
+                    except (json.JSONDecodeError, TypeError, KeyError, ValueError) as e:
+                        print(f"Error parsing reservation data: {str(e)}")
+                return owners
+            except Exception as e:
+                print(f"Error getting hold owners from Redis: {str(e)}")
+                # Fall through to fallback
+        
+        now = now_gmt7()
+        with self._fallback_lock:
+            for seat_id in seat_ids:
+                stored = self._fallback_storage.get(self._get_key(seat_id))
+                if stored and stored['expires_at'] >= now:
+                    owners[seat_id] = int(stored['data']['user_id'])
+        return owners
+    
+    def get_event_holds(self, event_id: int) -> Dict[int, int]:
         """
-        count = 0
+        Get every live hold of an event from the event's hold index
+        
+        Args:
+            event_id: Event ID
+            
+        Returns:
+            Dict of seat_id -> user_id
+        """
+        event_id = int(event_id)
+        holds = {}
+        
+        if self.redis is not None:
+            try:
+                now_ms = int(time.time() * 1000)
+                members = self.redis.zrangebyscore(
+                    self._get_event_index_key(event_id), now_ms, '+inf'
+                )
+                candidates = {}
+                for member in members:
+                    seat_id, _, user_id = member.partition(':')
+                    candidates[int(seat_id)] = int(user_id)
+                # Confirm against the hold keys: an index entry can outlive a deleted hold
+                owners = self.get_hold_owners(candidates.keys())
+                return {
+                    seat_id: user_id for seat_id, user_id in owners.items()
+                    if candidates.get(seat_id) == user_id
+                }
+            except Exception as e:
+                print(f"Error getting event holds from Redis: {str(e)}")
+                # Fall through to fallback
+        
         now = now_gmt7()
+        with self._fallback_lock:
+            for stored in self._fallback_storage.values():
+                data = stored['data']
+                if stored['expires_at'] >= now and int(data['event_id']) == event_id:
+                    holds[int(data['seat_id'])] = int(data['user_id'])
+        return holds
+    
+    def mark_seats_dirty(self, seat_ids: Iterable[int]) -> None:
+        """Queue seats whose hold state changed for the write-behind flusher"""
+        seat_ids = self.normalize_seat_ids(seat_ids)
+        if not seat_ids:
+            return
         
-        # Cleanup fallback storage
-        for key in list(self._fallback_storage.keys()):
-            if self._fallback_storage[key]['expires_at'] < now:
-                del self._fallback_storage[key]
-                count += 1
+        if self.redis is not None:
+            try:
+                self.redis.sadd(self.dirty_seats_key, *seat_ids)
+                return
+            except Exception as e:
+                print(f"Error marking seats dirty in Redis: {str(e)}")
+                # Fall through to fallback
         
-        # Redis automatically handles TTL, but we can scan for any expired keys
-        if self._check_redis_available():
+        with self._fallback_lock:
+            self._fallback_dirty.update(seat_ids)
+    
+    def pop_dirty_seats(self, limit: int = 1000) -> List[int]:
+        """Take up to `limit` seats from the write-behind queue"""
+        seat_ids = []
+        
+        with self._fallback_lock:
+            while self._fallback_dirty and len(seat_ids) < limit:
+                seat_ids.append(self._fallback_dirty.pop())
+        
+        if self.redis is not None and len(seat_ids) < limit:
             try:
-                pattern = f"{self.reservation_prefix}*"
-                for key in self.redis.scan_iter(match=pattern):
-                    try:
-                        data = self.redis.get(key)
-                        if not data:
-                            continue
-                        
-                        reservation = json.loads(data)
-                        expires_at = datetime.fromisoformat(reservation['expires_at'])
-                        if expires_at < now:
-                            self.redis.delete(key)
-                            count += 1
-                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
-                        continue
-            except Exception:
-                pass
+                popped = self.redis.spop(self.dirty_seats_key, limit - len(seat_ids)) or []
+                seat_ids.extend(int(seat_id) for seat_id in popped)
+            except Exception as e:
+                print(f"Error popping dirty seats from Redis: {str(e)}")
+        
+        return seat_ids
+    
+    def reap_expired(self) -> List[Dict[str, int]]:
+        """
+        Collect and unindex holds that have expired
+        
+        In Redis the expired entries are found with ZRANGEBYSCORE over the
+        per-event indexes of events that currently have holds, so the cost is
+        proportional to the number of expired holds rather than the keyspace.
+        
+        Returns:
+            List of {'event_id', 'seat_id', 'user_id'} for each expired hold
+        """
+        expired = []
+        
+        # Fallback storage
+        now = now_gmt7()
+        with self._fallback_lock:
+            for key in list(self._fallback_storage.keys()):
+                stored = self._fallback_storage[key]
+                if stored['expires_at'] < now:
+                    del self._fallback_storage[key]
+                    data = stored['data']
+                    expired.append({
+                        'event_id': int(data['event_id']),
+                        'seat_id': int(data['seat_id']),
+                        'user_id': int(data['user_id'])
+                    })
+        
+        if self._reap_script is not None:
+            try:
+                result = self._reap_script(
+                    keys=[self.active_events_key],
+                    args=[
+                        self.event_index_prefix,
+                        self.user_index_prefix,
+                        self.reservation_prefix,
+                        self.reap_batch_size
+                    ]
+                )
+                for entry in result:
+                    event_id, seat_id, user_id = entry.split(':')
+                    expired.append({
+                        'event_id': int(event_id),
+                        'seat_id': int(seat_id),
+                        'user_id': int(user_id)
+                    })
+            except Exception as e:
+                print(f"Error reaping expired reservations from Redis: {str(e)}")
         
-        return count
+        return expired
+    
+    def get_expired_index_holds(self, event_id: int, seat_ids: Iterable[int]) -> List[Dict[str, int]]:
+        """
+        Get the expired hold index entries of an event for the given seats
+        (to reap holds whose keys Redis reported as expired)
+
+        Args:
+            event_id: Event ID
+            seat_ids: Seat IDs whose hold keys expired
+
+        Returns:
+            List of {'event_id', 'seat_id', 'user_id'} to pass to reap_holds
+        """
+        event_id = int(event_id)
+        seat_ids = set(self.normalize_seat_ids(seat_ids))
+        if not seat_ids or self.redis is None:
+            return []
+
+        try:
+            # Only entries scored at or before now: the cost follows the
+            # event's expired holds, not all of its holds
+            members = self.redis.zrangebyscore(
+                self._get_event_index_key(event_id), '-inf', int(time.time() * 1000)
+            )
+        except Exception as e:
+            print(f"Error getting expired holds from Redis: {str(e)}")
+            return []
+
+        holds = []
+        for member in members:
+            seat_id, _, user_id = member.partition(':')
+            if int(seat_id) in seat_ids:
+                holds.append({'event_id': event_id, 'seat_id': int(seat_id), 'user_id': int(user_id)})
+        return holds
+
+    def reap_holds(self, holds: List[Dict[str, int]]) -> Dict[str, List[Dict[str, int]]]:
+        """
+        Reap the given holds if they have expired
+        
+        Args:
+            holds: {'event_id', 'seat_id', 'user_id'} per hold
+            
+        Returns:
+            Dict with 'expired' (holds that expired and were unindexed) and
+            'live' (holds the same user still has)
+        """
+        result = {'expired': [], 'live': []}
+        holds = [
+            {'event_id': int(h['event_id']), 'seat_id': int(h['seat_id']), 'user_id': int(h['user_id'])}
+            for h in holds
+        ]
+        if not holds:
+            return result
+        
+        if self._reap_holds_script is not None:
+            try:
+                reaped, live = self._reap_holds_script(
+                    keys=[self._get_key(h['seat_id']) for h in holds],
+                    args=[self.event_index_prefix, self.user_index_prefix] + [
+                        f"{h['event_id']}:{h['seat_id']}:{h['user_id']}" for h in holds
+                    ]
+                )
+                result['expired'] = [holds[int(i) - 1] for i in reaped]
+                result['live'] = [holds[int(i) - 1] for i in live]
+                return result
+            except Exception as e:
+                print(f"Error reaping holds from Redis: {str(e)}")
+                # Fall through to fallback
+        
+        now = now_gmt7()
+        with self._fallback_lock:
+            for hold in holds:
+                key = self._get_key(hold['seat_id'])
+                stored = self._fallback_storage.get(key)
+                if not stored or int(stored['data']['user_id']) != hold['user_id']:
+                    continue
+                if stored['expires_at'] >= now:
+                    result['live'].append(hold)
+                else:
+                    del self._fallback_storage[key]
+                    result['expired'].append(hold)
+        return result
+    
+    def cleanup_expired(self) -> int:
+        """
+        Clean up expired reservations (Redis TTL removes the holds themselves;
+        this drops their stale index entries and expired fallback storage)
+        
+        Returns:
+            Number of reservations cleaned up
+        """
+        return len(self.reap_expired())
 
 
 # Global instance (will be initialized after Redis connection)
@@ -279,3 +848,38 @@ def init_redis_reservation_manager(redis_client=None) -> RedisReservationManager
 def get_redis_reservation_manager() -> Optional[RedisReservationManager]:
     """Get Redis reservation manager instance"""
     return redis_reservation_manager
+
+
+def release_holds_on_commit(event_id: int, user_id: int, seat_ids: Iterable[int]) -> None:
+    """
+    Drop holds consumed by the current DB transaction once it commits
+
+    Until then the holds keep the seats from being taken by another user;
+    if the transaction rolls back they stay in place and simply expire.
+    """
+    from app.extensions import db
+
+    seat_ids = [int(seat_id) for seat_id in seat_ids if seat_id]
+    if not seat_ids:
+        return
+    pending = db.session.info.setdefault('holds_consumed', {})
+    pending.setdefault((int(event_id), int(user_id)), set()).update(seat_ids)
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _release_consumed_holds(session):
+    pending = session.info.pop('holds_consumed', None)
+    if not pending:
+        return
+    try:
+        manager = get_redis_reservation_manager()
+        if manager:
+            for (event_id, user_id), seat_ids in pending.items():
+                manager.release_seats(event_id, user_id, seat_ids)
+    except Exception as e:
+        print(f"Error releasing consumed seat holds: {str(e)}")
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _keep_consumed_holds(session):
+    session.info.pop('holds_consumed', None)
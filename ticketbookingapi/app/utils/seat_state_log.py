@@ -0,0 +1,239 @@
+"""
+Seat state version log
+Keeps a monotonically increasing seat-state version per event and a bounded
+log of the seat changes behind each version, so clients can revalidate a
+seat map with an ETag and resync with only the seats changed since the
+version they already have.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from app.config import Config
+from app.extensions import get_redis
+
+# Bump the version and append one log entry per changed seat; once the log is
+# over its limit the oldest entries are dropped and the floor (oldest version
+# a diff can still be served from) moves up.
+RECORD_CHANGES_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+for i = 2, #ARGV, 2 do
+    redis.call('ZADD', KEYS[2], version, version .. ':' .. ARGV[i] .. ':' .. ARGV[i + 1])
+end
+local size = redis.call('ZCARD', KEYS[2])
+local max_entries = tonumber(ARGV[1])
+if size > max_entries then
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, size - max_entries - 1)
+    local head = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    if head[2] then
+        redis.call('SET', KEYS[3], head[2])
+    end
+end
+return version
+"""
+
+# Bump the version and invalidate every diff (layout changes)
+RESET_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+redis.call('DEL', KEYS[2])
+redis.call('SET', KEYS[3], version)
+return version
+"""
+
+
+class SeatStateLog:
+    """Per-event seat state versions and bounded change logs"""
+
+    def __init__(self, redis_client=None, max_entries: Optional[int] = None):
+        self.redis = redis_client or get_redis()
+        self.prefix = Config.REDIS_SEAT_STATE_LOG_PREFIX
+        self.max_entries = max_entries or Config.SEAT_STATE_LOG_SIZE
+        # Fallback in-memory storage if Redis unavailable:
+        # event_id -> {'version', 'floor', 'log': deque of (version, seat_id, status)}
+        self._fallback_storage = {}
+        self._fallback_lock = threading.Lock()
+        self._record_script = None
+        self._reset_script = None
+        if self.redis is not None:
+            self._record_script = self.redis.register_script(RECORD_CHANGES_SCRIPT)
+            self._reset_script = self.redis.register_script(RESET_SCRIPT)
+
+    def _keys(self, event_id: int):
+        base = f"{self.prefix}{int(event_id)}"
+        return [f"{base}:version", f"{base}:changes", f"{base}:floor"]
+
+    def _fallback_state(self, event_id: int) -> Dict[str, Any]:
+        return self._fallback_storage.setdefault(int(event_id), {
+            'version': 0,
+            'floor': 0,
+            'log': deque(maxlen=self.max_entries)
+        })
+
+    def record(self, event_id: int, changes: Dict[int, str]) -> int:
+        """
+        Record seat status changes of an event under a new version
+
+        Args:
+            event_id: Event ID
+            changes: Dict of seat_id -> new status
+
+        Returns:
+            The new seat state version
+        """
+        if self._record_script is not None:
+            try:
+                args = [self.max_entries]
+                for seat_id, status in changes.items():
+                    args.extend([int(seat_id), status])
+                return int(self._record_script(keys=self._keys(event_id), args=args))
+            except Exception as e:
+                print(f"Error recording seat changes in Redis: {str(e)}")
+                # Fall through to fallback
+
+        with self._fallback_lock:
+            state = self._fallback_state(event_id)
+            state['version'] += 1
+            log = state['log']
+            for seat_id, status in changes.items():
+                if len(log) == log.maxlen:
+                    log.popleft()
+                    state['floor'] = log[0][0] if log else state['version']
+                log.append((state['version'], int(seat_id), status))
+            return state['version']
+
+    def reset(self, event_id: int) -> int:
+        """Bump the version and drop the change log (clients must fully resync)"""
+        if self._reset_script is not None:
+            try:
+                return int(self._reset_script(keys=self._keys(event_id)))
+            except Exception as e:
+                print(f"Error resetting seat change log in Redis: {str(e)}")
+
+        with self._fallback_lock:
+            state = self._fallback_state(event_id)
+            state['version'] += 1
+            state['floor'] = state['version']
+            state['log'].clear()
+            return state['version']
+
+    def get_version(self, event_id: int) -> int:
+        """Current seat state version of an event (0 if nothing was recorded)"""
+        if self.redis is not None:
+            try:
+                return int(self.redis.get(self._keys(event_id)[0]) or 0)
+            except Exception as e:
+                print(f"Error getting seat state version from Redis: {str(e)}")
+
+        with self._fallback_lock:
+            state = self._fallback_storage.get(int(event_id))
+            return state['version'] if state else 0
+
+    def get_changes_since(self, event_id: int, since: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the seats whose status changed after a version
+
+        Args:
+            event_id: Event ID
+            since: Version the client already has
+
+        Returns:
+            Dict with 'version' and 'changes' (seat_id -> latest status), or
+            None if the log no longer covers `since` and a full resync is needed
+        """
+        since = int(since)
+        if self.redis is not None:
+            try:
+                version_key, changes_key, floor_key = self._keys(event_id)
+                pipe = self.redis.pipeline()
+                pipe.get(version_key)
+                pipe.get(floor_key)
+                pipe.zrangebyscore(changes_key, f"({since}", '+inf')
+                version, floor, members = pipe.execute()
+                version = int(version or 0)
+                if since > version or since < int(floor or 0):
+                    return None
+                changes = {}
+                for member in members:
+                    _, seat_id, status = member.split(':', 2)
+                    changes[int(seat_id)] = status
+                return {'version': version, 'changes': changes}
+            except Exception as e:
+                print(f"Error reading seat change log from Redis: {str(e)}")
+
+        with self._fallback_lock:
+            state = self._fallback_storage.get(int(event_id))
+            version = state['version'] if state else 0
+            if since > version or (state and since < state['floor']):
+                return None
+            changes = {}
+            if state:
+                for entry_version, seat_id, status in state['log']:
+                    if entry_version > since:
+                        changes[seat_id] = status
+            return {'version': version, 'changes': changes}
+
+
+# Global instance (created lazily so it picks up the Redis client)
+seat_state_log: Optional[SeatStateLog] = None
+
+
+def init_seat_state_log(redis_client=None) -> SeatStateLog:
+    """Initialize seat state log"""
+    global seat_state_log
+    seat_state_log = SeatStateLog(redis_client=redis_client)
+    return seat_state_log
+
+
+def get_seat_state_log() -> SeatStateLog:
+    """Get seat state log instance"""
+    global seat_state_log
+    if seat_state_log is None:
+        seat_state_log = SeatStateLog()
+    return seat_state_log
+
+
+def record_seat_changes_on_commit(seat_ids: Iterable[int], status: str) -> None:
+    """
+    Record seat status changes made in the current DB transaction
+
+    The changes are logged (and broadcast to the event room) only once the
+    transaction commits, so a client can never see a version whose seat data
+    is not yet visible in the database.
+    """
+    from app.extensions import db
+    from app.models.seat import Seat
+    from app.models.ticket_type import TicketType
+
+    seat_ids = {int(seat_id) for seat_id in seat_ids if seat_id}
+    if not seat_ids:
+        return
+    rows = db.session.query(Seat.seat_id, TicketType.event_id).join(TicketType).filter(
+        Seat.seat_id.in_(seat_ids)
+    ).all()
+    pending = db.session.info.setdefault('seat_changes', {})
+    for seat_id, event_id in rows:
+        pending.setdefault(event_id, {})[seat_id] = status
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _record_pending_seat_changes(session):
+    pending = session.info.pop('seat_changes', None)
+    if not pending:
+        return
+    try:
+        from app.services.seat_map_service import SeatMapService
+        from app.utils.broadcast_coalescer import publish_seat_changes
+
+        for event_id, changes in pending.items():
+            publish_seat_changes(event_id, changes, SeatMapService.record_changes(event_id, changes))
+    except Exception as e:
+        print(f"Error recording committed seat changes: {str(e)}")
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _discard_pending_seat_changes(session):
+    session.info.pop('seat_changes', None)
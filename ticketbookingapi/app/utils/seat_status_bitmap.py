@@ -0,0 +1,216 @@
+"""
+Seat status bitmap
+Keeps the packed 2-bit seat status vector of each event up to date, so a
+status poll is one GET instead of a read of every seat row. Seat i of the
+event layout occupies bits 2*(i % 4) and 2*(i % 4) + 1 of byte i // 4; in
+Redis the codes are written in place with BITFIELD.
+
+A bitmap is tagged with the layout version it was built for. Changes to a
+missing (or outdated) bitmap are dropped, and the next read rebuilds it from
+the database. A rebuild only stores its result if no change arrived while it
+was reading, so a change committed mid-rebuild is never lost.
+"""
+
+import threading
+import uuid
+from typing import Dict, Optional
+
+from app.config import Config
+from app.extensions import get_redis
+
+# Apply code changes if the bitmap exists for this layout version; otherwise
+# cancel any rebuild in progress (it may have read the seats too early).
+# KEYS[1]: bitmap, KEYS[2]: layout version, KEYS[3]: rebuild token
+# ARGV[1]: layout version, ARGV[2..]: bit offset, code pairs
+APPLY_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    redis.call('DEL', KEYS[3])
+    return 0
+end
+local args = {}
+for i = 2, #ARGV, 2 do
+    table.insert(args, 'SET')
+    table.insert(args, 'u2')
+    table.insert(args, ARGV[i])
+    table.insert(args, ARGV[i + 1])
+end
+if #args > 0 then
+    redis.call('BITFIELD', KEYS[1], unpack(args))
+end
+return 1
+"""
+
+# Store a rebuilt bitmap if the rebuild token is still ours
+# KEYS[1]: bitmap, KEYS[2]: layout version, KEYS[3]: rebuild token
+# ARGV[1]: token, ARGV[2]: layout version, ARGV[3]: packed bitmap, ARGV[4]: ttl
+STORE_SCRIPT = """
+if redis.call('GET', KEYS[3]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[3])
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[4])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[4])
+return 1
+"""
+
+# Read the bitmap hex-encoded (the client decodes responses as text)
+# KEYS[1]: bitmap, KEYS[2]: layout version
+# Returns {layout version, hex}, or {} if missing
+READ_SCRIPT = """
+local version = redis.call('GET', KEYS[2])
+local packed = redis.call('GET', KEYS[1])
+if not version or not packed then
+    return {}
+end
+return {version, (string.gsub(packed, '.', function(c) return string.format('%02x', string.byte(c)) end))}
+"""
+
+REBUILD_TOKEN_TTL_MS = 30000
+
+
+def bit_offset(position: int) -> int:
+    """BITFIELD offset of a seat's u2 code (Redis numbers bits from the MSB)"""
+    return (position >> 2) * 8 + 6 - ((position & 3) << 1)
+
+
+class SeatStatusBitmap:
+    """Per-event packed seat status codes in Redis (or process memory)"""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client or get_redis()
+        self.prefix = Config.REDIS_SEAT_STATUS_PREFIX
+        self.ttl = Config.SEAT_LAYOUT_CACHE_TTL
+        # Fallback in-memory storage if Redis unavailable:
+        # event_id -> (layout_version, bytearray); rebuild generation per event
+        self._fallback_storage = {}
+        self._fallback_generation = {}
+        self._fallback_lock = threading.Lock()
+        self._read_script = None
+        self._apply_script = None
+        self._store_script = None
+        if self.redis is not None:
+            self._read_script = self.redis.register_script(READ_SCRIPT)
+            self._apply_script = self.redis.register_script(APPLY_SCRIPT)
+            self._store_script = self.redis.register_script(STORE_SCRIPT)
+
+    def _keys(self, event_id: int):
+        base = f"{self.prefix}{int(event_id)}"
+        return [base, f"{base}:layout", f"{base}:rebuild"]
+
+    def get(self, event_id: int, layout_version: str) -> Optional[bytes]:
+        """Packed codes of an event, or None if they must be rebuilt"""
+        if self._read_script is not None:
+            try:
+                result = self._read_script(keys=self._keys(event_id)[:2])
+                if not result or result[0] != layout_version:
+                    return None
+                return bytes.fromhex(result[1])
+            except Exception as e:
+                print(f"Error reading seat status bitmap from Redis: {str(e)}")
+
+        with self._fallback_lock:
+            stored = self._fallback_storage.get(int(event_id))
+            if stored and stored[0] == layout_version:
+                return bytes(stored[1])
+            return None
+
+    def begin_rebuild(self, event_id: int) -> Optional[str]:
+        """Start a rebuild; pass the token to store() once the seats were read"""
+        if self.redis is not None:
+            try:
+                token = uuid.uuid4().hex
+                self.redis.set(self._keys(event_id)[2], token, px=REBUILD_TOKEN_TTL_MS)
+                return token
+            except Exception as e:
+                print(f"Error starting seat status bitmap rebuild: {str(e)}")
+
+        with self._fallback_lock:
+            generation = self._fallback_generation.get(int(event_id), 0) + 1
+            self._fallback_generation[int(event_id)] = generation
+            return f"local:{generation}"
+
+    def store(self, event_id: int, layout_version: str, packed: bytes, token: Optional[str]) -> bool:
+        """Store a rebuilt bitmap unless a change arrived since begin_rebuild()"""
+        if token is None:
+            return False
+        if self._store_script is not None and not token.startswith('local:'):
+            try:
+                return bool(self._store_script(
+                    keys=self._keys(event_id),
+                    args=[token, layout_version, packed, self.ttl]
+                ))
+            except Exception as e:
+                print(f"Error storing seat status bitmap in Redis: {str(e)}")
+                return False
+
+        with self._fallback_lock:
+            if token != f"local:{self._fallback_generation.get(int(event_id), 0)}":
+                return False
+            self._fallback_storage[int(event_id)] = (layout_version, bytearray(packed))
+            return True
+
+    def apply(self, event_id: int, layout_version: str, codes: Dict[int, int]) -> None:
+        """
+        Write new codes in place
+
+        Args:
+            event_id: Event ID
+            layout_version: Layout the positions refer to
+            codes: Dict of layout position -> 2-bit code
+        """
+        if self._apply_script is not None:
+            try:
+                args = [layout_version]
+                for position, code in codes.items():
+                    args.extend([bit_offset(position), code])
+                self._apply_script(keys=self._keys(event_id), args=args)
+                return
+            except Exception as e:
+                print(f"Error updating seat status bitmap in Redis: {str(e)}")
+                self.invalidate(event_id)
+                return
+
+        with self._fallback_lock:
+            event_id = int(event_id)
+            stored = self._fallback_storage.get(event_id)
+            if not stored or stored[0] != layout_version:
+                # Cancel any rebuild in progress
+                self._fallback_generation[event_id] = self._fallback_generation.get(event_id, 0) + 1
+                return
+            packed = stored[1]
+            for position, code in codes.items():
+                byte, shift = position >> 2, (position & 3) << 1
+                if byte < len(packed):
+                    packed[byte] = (packed[byte] & ~(3 << shift)) | (code << shift)
+
+    def invalidate(self, event_id: int) -> None:
+        """Drop an event's bitmap (rebuilt from the database on the next read)"""
+        if self.redis is not None:
+            try:
+                self.redis.delete(*self._keys(event_id))
+            except Exception as e:
+                print(f"Error invalidating seat status bitmap: {str(e)}")
+
+        with self._fallback_lock:
+            event_id = int(event_id)
+            self._fallback_storage.pop(event_id, None)
+            self._fallback_generation[event_id] = self._fallback_generation.get(event_id, 0) + 1
+
+
+# Global instance (created lazily so it picks up the Redis client)
+seat_status_bitmap: Optional[SeatStatusBitmap] = None
+
+
+def init_seat_status_bitmap(redis_client=None) -> SeatStatusBitmap:
+    """Initialize seat status bitmap"""
+    global seat_status_bitmap
+    seat_status_bitmap = SeatStatusBitmap(redis_client=redis_client)
+    return seat_status_bitmap
+
+
+def get_seat_status_bitmap() -> SeatStatusBitmap:
+    """Get seat status bitmap instance"""
+    global seat_status_bitmap
+    if seat_status_bitmap is None:
+        seat_status_bitmap = SeatStatusBitmap()
+    return seat_status_bitmap
@@ -0,0 +1,14 @@
+-- Migration: Keyset pagination indexes on EventCard
+-- Date: 2026-10-18
+-- One index per /events sort, each ending with the group_key tie-breaker so
+-- a cursor page is a single range scan.
+
+UPDATE `EventCard` SET `created_at` = `start_datetime` WHERE `created_at` IS NULL;
+ALTER TABLE `EventCard` MODIFY `created_at` datetime NOT NULL;
+
+ALTER TABLE `EventCard` DROP INDEX `idx_event_card_ranking`;
+ALTER TABLE `EventCard` DROP INDEX `ix_EventCard_next_start_datetime`;
+CREATE INDEX `idx_event_card_ranking` ON `EventCard` (`is_featured`, `popularity_score`, `created_at`, `group_key`);
+CREATE INDEX `idx_event_card_upcoming` ON `EventCard` (`next_start_datetime`, `group_key`);
+CREATE INDEX `idx_event_card_newest` ON `EventCard` (`created_at`, `group_key`);
+CREATE INDEX `idx_event_card_popular` ON `EventCard` (`popularity_score`, `group_key`);
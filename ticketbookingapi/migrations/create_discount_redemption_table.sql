@@ -0,0 +1,17 @@
+-- Migration: Create DiscountRedemption table (discount use of each order)
+-- Date: 2026-10-18
+-- The order -> discount link used to live only in Redis (or process memory),
+-- so a paid order could miss its Discount.used_count increment. Rows are
+-- written by the API (DiscountService) at checkout, payment and cancellation.
+
+CREATE TABLE IF NOT EXISTS `DiscountRedemption` (
+  `order_id` bigint(20) NOT NULL,
+  `discount_id` bigint(20) NOT NULL,
+  `status` enum('RESERVED','COMMITTED','RELEASED') NOT NULL DEFAULT 'RESERVED',
+  `created_at` datetime NULL DEFAULT NULL,
+  `updated_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`order_id`),
+  KEY `ix_DiscountRedemption_discount_id` (`discount_id`),
+  CONSTRAINT `fk_discount_redemption_order` FOREIGN KEY (`order_id`) REFERENCES `Order` (`order_id`) ON DELETE CASCADE ON UPDATE RESTRICT,
+  CONSTRAINT `fk_discount_redemption_discount` FOREIGN KEY (`discount_id`) REFERENCES `Discount` (`discount_id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,31 @@
+-- Migration: Create EventCard table (catalog read model, one row per showtime group)
+-- Date: 2026-10-18
+-- Rows are maintained by the API (EventCardService). After creating the
+-- table, backfill it with: python scripts/rebuild_event_cards.py
+
+CREATE TABLE IF NOT EXISTS `EventCard` (
+  `group_key` varchar(100) NOT NULL,
+  `event_id` bigint(20) NOT NULL,
+  `category_id` bigint(20) NULL DEFAULT NULL,
+  `venue_id` bigint(20) NOT NULL,
+  `venue_city` varchar(100) NULL DEFAULT NULL,
+  `min_price` decimal(15,2) NULL DEFAULT NULL,
+  `max_price` decimal(15,2) NULL DEFAULT NULL,
+  `start_datetime` datetime NOT NULL,
+  `next_start_datetime` datetime NULL DEFAULT NULL,
+  `showtime_count` int(11) NOT NULL DEFAULT 1,
+  `total_capacity` int(11) NOT NULL DEFAULT 0,
+  `available_tickets` int(11) NOT NULL DEFAULT 0,
+  `is_featured` tinyint(1) NOT NULL DEFAULT 0,
+  `popularity_score` int(11) NOT NULL DEFAULT 0,
+  `created_at` datetime NULL DEFAULT NULL,
+  `refreshed_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`group_key`),
+  KEY `ix_EventCard_event_id` (`event_id`),
+  KEY `ix_EventCard_venue_id` (`venue_id`),
+  KEY `ix_EventCard_venue_city` (`venue_city`),
+  KEY `ix_EventCard_min_price` (`min_price`),
+  KEY `ix_EventCard_next_start_datetime` (`next_start_datetime`),
+  KEY `idx_event_card_category_next` (`category_id`, `next_start_datetime`),
+  KEY `idx_event_card_ranking` (`is_featured`, `popularity_score`, `created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -1,7 +1,27 @@
+import os
+from dotenv import load_dotenv
+
+# The async runtime must patch the standard library before anything else is
+# imported (sockets, threads, PyMySQL, redis-py all become cooperative)
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE.startswith('gevent'):
+    from gevent import monkey
+    monkey.patch_all()
+
 from app import create_app
 from app.extensions import socketio
 
 app = create_app()
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5000, debug=True, allow_unsafe_werkzeug=True)
+    port = int(os.getenv('PORT', 5000))
+    if ASYNC_MODE == 'threading':
+        # Development server: one OS thread per connection
+        socketio.run(app, host="0.0.0.0", port=port, debug=True, allow_unsafe_werkzeug=True)
+    else:
+        # eventlet/gevent WSGI server: one green thread per connection
+        socketio.run(app, host="0.0.0.0", port=port, debug=False, log_output=False)
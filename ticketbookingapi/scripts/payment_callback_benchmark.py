@@ -0,0 +1,169 @@
+"""
+Payment callback benchmark
+
+Times the database work a successful payment callback (VNPay / PayPal /
+VietQR) does for an order: OrderService.mark_seats_as_booked plus the order
+status change and commit. Orders of 1 and 50 seats are compared, against the
+former per-seat implementation (one Seat/TicketType/Event lookup per ticket)
+kept here as a baseline. Reports latency percentiles and SQL statements per
+callback; with the set-based path the statement count does not grow with the
+number of seats.
+
+Runs against an in-memory SQLite database by default, or a scratch MySQL
+database with --database-url (tables are created there; do not point it at
+production).
+
+Usage:
+    python scripts/payment_callback_benchmark.py --orders 50
+    python scripts/payment_callback_benchmark.py --database-url mysql+pymysql://root:pw@localhost/bench
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event as sa_event
+
+from app.extensions import db
+from app import models  # noqa: F401  (registers every table)
+from app.models import Event, Order, Ticket, TicketType, Venue
+from app.models.seat import Seat
+from app.services.order_service import OrderService
+from app.utils.broadcast_coalescer import init_broadcast_coalescer
+from app.utils.datetime_utils import now_gmt7
+
+SEAT_COUNTS = (1, 50)
+
+
+def legacy_mark_seats_as_booked(order_id):
+    """Previous implementation: per-seat lookups and per-type counter bumps"""
+    tickets = Ticket.query.filter_by(order_id=order_id).all()
+    ticket_type_counts = {}
+    for ticket in tickets:
+        if ticket.seat_id:
+            seat = db.session.get(Seat, ticket.seat_id)
+            if seat and seat.status in ['RESERVED', 'AVAILABLE']:
+                seat.status = 'BOOKED'
+        ticket_type_counts[ticket.ticket_type_id] = ticket_type_counts.get(ticket.ticket_type_id, 0) + 1
+    for ticket_type_id, count in ticket_type_counts.items():
+        ticket_type = db.session.get(TicketType, ticket_type_id)
+        ticket_type.sold_quantity = (ticket_type.sold_quantity or 0) + count
+        event = db.session.get(Event, ticket_type.event_id)
+        event.sold_tickets = (event.sold_tickets or 0) + count
+
+
+def make_app(database_url):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(orders_per_size):
+    """One event, one seated ticket type, PENDING orders holding RESERVED seats"""
+    db.create_all()
+    start = now_gmt7() + timedelta(days=7)
+    db.session.add(Venue(venue_id=1, venue_name='Bench', address='-', city='-', capacity=100000))
+    db.session.add(Event(
+        event_id=1, venue_id=1, manager_id=1, event_name='Bench', start_datetime=start,
+        end_datetime=start + timedelta(hours=2), total_capacity=100000, status='PUBLISHED', sold_tickets=0
+    ))
+    db.session.add(TicketType(
+        ticket_type_id=1, event_id=1, type_name='Seated', price=100000, quantity=100000, sold_quantity=0
+    ))
+
+    batches = {}
+    next_seat = 1
+    next_order = 1
+    for mode in ('legacy', 'bulk'):
+        for seat_count in SEAT_COUNTS:
+            order_ids = []
+            for _ in range(orders_per_size):
+                order_id = next_order
+                next_order += 1
+                db.session.add(Order(
+                    order_id=order_id, user_id=1, order_code=f'BENCH-{order_id}',
+                    total_amount=100000 * seat_count, final_amount=100000 * seat_count, order_status='PENDING'
+                ))
+                for _ in range(seat_count):
+                    seat_id = next_seat
+                    next_seat += 1
+                    db.session.add(Seat(
+                        seat_id=seat_id, ticket_type_id=1, row_name='R', seat_number=str(seat_id),
+                        status='RESERVED', x_pos=0, y_pos=0
+                    ))
+                    db.session.add(Ticket(
+                        ticket_id=seat_id, order_id=order_id, ticket_type_id=1, seat_id=seat_id,
+                        ticket_code=f'BENCH-T{seat_id}', price=100000
+                    ))
+                order_ids.append(order_id)
+            batches[(mode, seat_count)] = order_ids
+    db.session.commit()
+    return batches
+
+
+def run_batch(order_ids, mark_booked, statements):
+    latencies = []
+    counts = []
+    for order_id in order_ids:
+        db.session.expunge_all()  # Each callback is a fresh request
+        statements[0] = 0
+        started = time.perf_counter()
+        mark_booked(order_id)
+        order = db.session.get(Order, order_id)
+        order.order_status = 'PAID'
+        order.paid_at = now_gmt7()
+        db.session.commit()
+        latencies.append((time.perf_counter() - started) * 1000)
+        counts.append(statements[0])
+    return latencies, counts
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=50, help='Callbacks timed per order size')
+    parser.add_argument('--database-url', default='sqlite://', help='Scratch database (default: in-memory SQLite)')
+    args = parser.parse_args()
+
+    app = make_app(args.database_url)
+    # Seat broadcasts are coalesced as in the API, but not sent anywhere
+    coalescer = init_broadcast_coalescer(lambda *_args, **_kwargs: None)
+    with app.app_context():
+        batches = seed(args.orders)
+        statements = [0]
+
+        def count_statement(*_args, **_kwargs):
+            statements[0] += 1
+
+        sa_event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+        print(f"{'path':<8} {'seats':>5} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'SQL/callback':>13}")
+        for mode, mark_booked in (('legacy', legacy_mark_seats_as_booked), ('bulk', OrderService.mark_seats_as_booked)):
+            for seat_count in SEAT_COUNTS:
+                latencies, counts = run_batch(batches[(mode, seat_count)], mark_booked, statements)
+                print(
+                    f"{mode:<8} {seat_count:>5} {percentile(latencies, 50):>8.2f} {percentile(latencies, 95):>8.2f} "
+                    f"{statistics.mean(latencies):>8.2f} {statistics.mean(counts):>13.1f}"
+                )
+
+        booked = Seat.query.filter(Seat.status == 'BOOKED').count()
+        expected = sum(len(order_ids) * seat_count for (_, seat_count), order_ids in batches.items())
+        coalescer.stop()
+        print(f"Seats booked: {booked}/{expected}, seat changes broadcast: {coalescer.get_metrics()['changes_published']}")
+        return 0 if booked == expected else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
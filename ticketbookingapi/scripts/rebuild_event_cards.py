@@ -0,0 +1,28 @@
+"""
+Rebuild the EventCard read model
+
+Recomputes every showtime group card from Event / TicketType / Venue. Run it
+once after creating the table (migrations/create_event_card_table.sql, or
+ticketbookingdb.sql on a fresh database), or to repair the table; the API
+keeps it up to date afterwards. Published listings, featured events and
+recommendations are served from this table only.
+
+Usage:
+    python scripts/rebuild_event_cards.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.models.event_card import EventCard
+from app.services.event_card_service import EventCardService
+
+app = create_app()
+
+with app.app_context():
+    print("Rebuilding event cards...")
+    groups = EventCardService.rebuild_all()
+    print(f"Groups refreshed: {groups}, cards: {EventCard.query.count()}")
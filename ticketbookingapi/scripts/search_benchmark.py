@@ -0,0 +1,149 @@
+"""
+Event search benchmark
+
+Builds the in-process event search index (app.utils.event_search_index) over
+synthetic Vietnamese events and reports build time and memory, query latency
+percentiles, and the latency of an incremental update (one edited event
+reindexed). Queries are typed without accents, as users do, and are compared
+against a full scan for the phrase, i.e. what LIKE '%q%' does on every
+search (the scan gets pre-folded text, so both match the same documents).
+
+No database is needed: documents are indexed directly, as
+EventSearchService does with the rows it loads from EventCard.
+
+Usage:
+    python scripts/search_benchmark.py --events 100000
+    python scripts/search_benchmark.py --events 20000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.event_search_index import EventSearchIndex, fold
+
+CITIES = ['Hà Nội', 'Hồ Chí Minh', 'Đà Nẵng', 'Đà Lạt', 'Huế', 'Hải Phòng', 'Cần Thơ', 'Nha Trang', 'Vũng Tàu', 'Quy Nhơn']
+CATEGORIES = ['Âm nhạc', 'Thể thao', 'Hội thảo', 'Sân khấu', 'Triển lãm', 'Lễ hội', 'Hài kịch', 'Ẩm thực']
+VENUES = ['Nhà hát Lớn', 'Sân vận động Mỹ Đình', 'Trung tâm Hội nghị Quốc gia', 'Nhà văn hóa Thanh niên',
+          'Cung Điền kinh', 'Phố đi bộ', 'Quảng trường Lâm Viên', 'Bảo tàng Mỹ thuật']
+NAME_WORDS = ['Đêm nhạc', 'Liveshow', 'Hòa nhạc', 'Giải chạy', 'Festival', 'Tuần lễ', 'Chung kết', 'Triển lãm',
+              'mùa thu', 'mùa xuân', 'Trịnh Công Sơn', 'acoustic', 'giao hưởng', 'ánh sáng', 'cà phê', 'bóng đá',
+              'marathon', 'nghệ thuật', 'thiếu nhi', 'phố cổ', 'biển xanh', 'hoa anh đào', 'rock', 'jazz']
+DESCRIPTION_WORDS = ['chương trình', 'khán giả', 'nghệ sĩ', 'đặc biệt', 'trải nghiệm', 'không gian', 'âm thanh',
+                     'vé', 'cuối tuần', 'gia đình', 'bạn bè', 'sự kiện', 'lần đầu tiên', 'tại', 'cùng', 'với',
+                     'những', 'ca khúc', 'nổi tiếng', 'hấp dẫn', 'miễn phí', 'trẻ em', 'hoạt động', 'ngoài trời']
+
+# Random syllables (artist, brand and place names) keep the vocabulary realistic
+ONSETS = ['b', 'c', 'ch', 'd', 'đ', 'g', 'gi', 'h', 'kh', 'l', 'm', 'n', 'ng', 'nh', 'ph', 'qu', 'r', 's', 't',
+          'th', 'tr', 'v', 'x']
+VOWELS = ['a', 'ă', 'â', 'e', 'ê', 'i', 'o', 'ô', 'ơ', 'u', 'ư', 'y']
+TONES = ['', '\u0300', '\u0301', '\u0303', '\u0309', '\u0323']
+CODAS = ['', 'c', 'm', 'n', 'ng', 'nh', 'p', 't']
+
+QUERIES = ['ha noi', 'da lat', 'dem nhac trinh cong son', 'marathon da nang', 'hoa nhac giao huong',
+           'festival hoa anh dao', 'jazz', 'am nhac ho chi minh', 'trien lam my thuat', 'liveshow acou']
+
+
+def syllable(rng):
+    word = rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(TONES) + rng.choice(CODAS)
+    return unicodedata.normalize('NFC', word).capitalize()
+
+
+def make_event(rng, event_id):
+    city = rng.choice(CITIES)
+    artist = ' '.join(syllable(rng) for _ in range(2))
+    name = ' '.join(rng.sample(NAME_WORDS, 3)) + f' {artist} {city} {2024 + event_id % 3}'
+    words = [rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(20, 60))]
+    words += [syllable(rng) for _ in range(5)]
+    description = '<p>' + ' '.join(words) + '</p>'
+    return {
+        'name': name,
+        'description': description,
+        'venue': rng.choice(VENUES),
+        'city': city,
+        'category': rng.choice(CATEGORIES)
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def timed(fn, runs):
+    latencies = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100000, help='Synthetic events to index')
+    parser.add_argument('--queries', type=int, default=50, help='Timed runs per query')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = {f'e{event_id}': make_event(rng, event_id) for event_id in range(1, args.events + 1)}
+
+    index = EventSearchIndex()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    for doc_id, fields in documents.items():
+        index.index(doc_id, fields)
+    build_seconds = time.perf_counter() - started
+    # Peak RSS growth (KB on Linux); the index is the only large allocation here
+    memory_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    metrics = index.get_metrics()
+    print(f"Indexed {metrics['documents']} events, {metrics['terms']} terms in {build_seconds:.1f}s "
+          f"(~{memory_mb:.0f} MB)")
+
+    # Baseline: every search scans all events for the phrase
+    scan_text = [
+        (doc_id, fold(' '.join(fields[key] for key in ('name', 'description', 'venue', 'city', 'category'))))
+        for doc_id, fields in documents.items()
+    ]
+
+    def scan(phrase):
+        # Every row is read: ranking (or a total) needs all the matches
+        return [doc_id for doc_id, text in scan_text if phrase in text]
+
+    print(f"{'query':<26} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8} {'scan p50':>9} {'scan matches':>13}")
+    index_latencies = []
+    for query in QUERIES:
+        latencies, hits = timed(lambda: index.search(query, 20), args.queries)
+        scan_latencies, scan_hits = timed(lambda: scan(query), max(1, args.queries // 10))
+        index_latencies.extend(latencies)
+        print(f"{query:<26} {len(hits):>6} {percentile(latencies, 50):>8.2f} {percentile(latencies, 95):>8.2f} "
+              f"{percentile(scan_latencies, 50):>9.2f} {len(scan_hits):>13}")
+    print(f"All queries: p50 {percentile(index_latencies, 50):.2f} ms, p95 {percentile(index_latencies, 95):.2f} ms, "
+          f"mean {statistics.mean(index_latencies):.2f} ms")
+
+    # Incremental update: an organizer renames an event
+    update_latencies = []
+    doc_ids = list(documents)
+    for i in range(1000):
+        doc_id = rng.choice(doc_ids)
+        fields = dict(documents[doc_id], name=f'Đêm nhạc đặc biệt số {i} {documents[doc_id]["city"]}')
+        started = time.perf_counter()
+        index.index(doc_id, fields)
+        update_latencies.append((time.perf_counter() - started) * 1000)
+    found = index.search('dem nhac dac biet so 999', 1)
+    print(f"Reindex one event: p50 {percentile(update_latencies, 50):.3f} ms, "
+          f"p95 {percentile(update_latencies, 95):.3f} ms (renamed event found: {bool(found)})")
+    return 0 if found else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
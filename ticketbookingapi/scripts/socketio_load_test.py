@@ -0,0 +1,183 @@
+"""
+Socket.IO idle-connection load test
+
+Opens many seat-map websocket connections against a running API server,
+joins each one to an event room (like SeatMap.jsx does), keeps them idle
+while answering Engine.IO pings, and reports how many connections the
+server holds plus its memory per connection.
+
+The client speaks the Engine.IO v4 / Socket.IO v5 wire protocol directly
+over `websockets` (asyncio), so one client process can hold tens of
+thousands of connections. Raise the open file limit on both sides first,
+e.g. `ulimit -n 100000`.
+
+Start the server in the runtime under test, e.g.:
+    SOCKETIO_ASYNC_MODE=eventlet python run.py
+
+Usage:
+    python scripts/socketio_load_test.py --url http://localhost:5000 \\
+        --connections 50000 --event-id 1 --hold 60 --pid <server pid>
+
+Requires: websockets (pip install websockets)
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+
+import websockets
+
+
+def read_rss_kb(pid):
+    """Resident memory of a process in KB (Linux /proc), None if unavailable"""
+    if not pid:
+        return None
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        base = args.url.rstrip('/').replace('http://', 'ws://').replace('https://', 'wss://')
+        self.ws_url = f"{base}/socket.io/?EIO=4&transport=websocket"
+        self.stop = asyncio.Event()
+        self.connected = 0
+        self.failed = 0
+        self.dropped = 0
+        self.messages = 0
+        self.handshake_ms = []
+        self.errors = {}
+
+    async def client(self, gate):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                ws = await websockets.connect(
+                    self.ws_url,
+                    open_timeout=self.args.timeout,
+                    ping_interval=None,  # Engine.IO has its own heartbeat
+                    max_queue=16
+                )
+                opened = await asyncio.wait_for(ws.recv(), self.args.timeout)
+                if not opened.startswith('0'):
+                    raise RuntimeError(f'unexpected open packet {opened[:20]!r}')
+                await ws.send('40')
+                while True:
+                    packet = await asyncio.wait_for(ws.recv(), self.args.timeout)
+                    if packet.startswith('40'):
+                        break
+                    if packet == '2':
+                        await ws.send('3')
+                await ws.send('42' + json.dumps(['join_event', {'event_id': self.args.event_id}]))
+            except Exception as e:
+                self.failed += 1
+                key = type(e).__name__
+                self.errors[key] = self.errors.get(key, 0) + 1
+                return
+            self.connected += 1
+            self.handshake_ms.append((time.perf_counter() - started) * 1000)
+
+        try:
+            while not self.stop.is_set():
+                try:
+                    packet = await asyncio.wait_for(ws.recv(), 1.0)
+                except asyncio.TimeoutError:
+                    continue
+                if packet == '2':
+                    await ws.send('3')
+                elif packet.startswith('42'):
+                    self.messages += 1
+        except Exception:
+            self.dropped += 1
+            self.connected -= 1
+        finally:
+            await ws.close()
+
+    async def run(self):
+        args = self.args
+        rss_before = read_rss_kb(args.pid)
+        gate = asyncio.Semaphore(args.concurrency)
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(self.client(gate)) for _ in range(args.connections)]
+
+        # Ramp-up progress
+        while self.connected + self.failed < args.connections:
+            await asyncio.sleep(1)
+            print(f"  ramp-up: {self.connected} connected, {self.failed} failed "
+                  f"({time.perf_counter() - started:.0f}s)")
+        ramp_seconds = time.perf_counter() - started
+
+        await asyncio.sleep(min(args.hold, 5))
+        rss_after = read_rss_kb(args.pid)
+
+        # Hold the connections idle
+        hold_until = time.perf_counter() + max(args.hold - 5, 0)
+        while time.perf_counter() < hold_until:
+            await asyncio.sleep(min(10, hold_until - time.perf_counter()))
+            print(f"  holding: {self.connected} connected, {self.dropped} dropped, "
+                  f"{self.messages} messages, server RSS {read_rss_kb(args.pid) or '-'} KB")
+
+        self.stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.report(ramp_seconds, rss_before, rss_after)
+
+    def report(self, ramp_seconds, rss_before, rss_after):
+        print()
+        print(f"Connections requested : {self.args.connections}")
+        print(f"Connections held      : {self.connected} (failed {self.failed}, dropped {self.dropped})")
+        if self.errors:
+            print(f"Connect errors        : {self.errors}")
+        print(f"Ramp-up time          : {ramp_seconds:.1f}s ({self.args.connections / ramp_seconds:.0f} conn/s)")
+        if self.handshake_ms:
+            ordered = sorted(self.handshake_ms)
+            print(f"Handshake latency     : p50 {statistics.median(ordered):.1f} ms, "
+                  f"p95 {ordered[int(len(ordered) * 0.95) - 1]:.1f} ms, max {ordered[-1]:.1f} ms")
+        print(f"Messages received     : {self.messages}")
+        if rss_before is not None and rss_after is not None:
+            per_conn = (rss_after - rss_before) / max(self.connected, 1)
+            print(f"Server RSS            : {rss_before / 1024:.1f} MB -> {rss_after / 1024:.1f} MB "
+                  f"({per_conn:.1f} KB per connection)")
+        else:
+            print("Server RSS            : pass --pid <server pid> (Linux) to measure memory per connection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000', help='API server base URL')
+    parser.add_argument('--connections', type=int, default=1000, help='Connections to open')
+    parser.add_argument('--concurrency', type=int, default=500, help='Handshakes in flight at once')
+    parser.add_argument('--event-id', type=int, default=1, help='Event room to join')
+    parser.add_argument('--hold', type=float, default=30, help='Seconds to keep the connections open')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-handshake timeout in seconds')
+    parser.add_argument('--pid', type=int, default=None, help='Server PID, for memory per connection')
+    args = parser.parse_args()
+
+    limit = raise_fd_limit()
+    if limit < args.connections + 100:
+        print(f"Warning: open file limit is {limit}; raise it (ulimit -n) for {args.connections} connections")
+
+    print(f"Opening {args.connections} connections to {args.url} (event {args.event_id})")
+    asyncio.run(LoadTest(args).run())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Multi-worker Socket.IO check
+
+Runs two Socket.IO servers ("worker A" and "worker B") in one process, both
+configured through get_socketio_options() with a Redis message queue that is
+backed by one shared fake Redis server. Worker B serves HTTP on a local port;
+a real Socket.IO client connects to it and joins an event room through the
+app's own `join_event` handler. Worker A (which has no clients at all)
+broadcasts a seat update to that room, and the script verifies that the
+client on worker B receives it.
+
+Requires: fakeredis, python-socketio[client] (pip install fakeredis requests)
+
+Usage:
+    python scripts/socketio_multiworker_check.py
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+import redis
+import socketio as socketio_client
+from flask import Flask
+from flask_socketio import SocketIO
+
+from app.extensions import get_socketio_options
+from app.utils.broadcast_coalescer import build_seats_updated
+
+FAKE_QUEUE_URL = 'redis://fake-redis:6379/0'
+EVENT_ID = 1
+
+
+def use_fake_redis():
+    """Route every Redis connection the Socket.IO managers open to one fake server"""
+    server = fakeredis.FakeServer()
+    redis.Redis.from_url = staticmethod(lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+
+
+def make_worker(name):
+    """Create a worker app with the app's room handlers"""
+    from app import socket_handlers
+
+    app = Flask(name)
+    sio = SocketIO(app, **get_socketio_options(message_queue=FAKE_QUEUE_URL))
+    sio.on_event('join_event', socket_handlers.handle_join_event)
+    sio.on_event('leave_event', socket_handlers.handle_leave_event)
+    return app, sio
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    use_fake_redis()
+    app_a, sio_a = make_worker('worker_a')
+    app_b, sio_b = make_worker('worker_b')
+
+    port = free_port()
+    threading.Thread(
+        target=sio_b.run,
+        args=(app_b,),
+        kwargs={'host': '127.0.0.1', 'port': port, 'allow_unsafe_werkzeug': True, 'log_output': False},
+        daemon=True
+    ).start()
+    time.sleep(1.0)
+
+    received = []
+    got_update = threading.Event()
+    client = socketio_client.Client()
+
+    @client.on('seats_updated')
+    def on_seats_updated(data):
+        received.append(data)
+        got_update.set()
+
+    client.connect(f'http://127.0.0.1:{port}', wait_timeout=5)
+    client.emit('join_event', {'event_id': EVENT_ID})
+    # Let the join reach worker B and both managers subscribe to the queue channel
+    time.sleep(0.5)
+
+    payload = build_seats_updated(EVENT_ID, {101: 'RESERVED', 102: 'AVAILABLE'}, version=7)
+    started = time.time()
+    sio_a.emit('seats_updated', payload, room=f'event_{EVENT_ID}')
+
+    delivered = got_update.wait(5)
+    elapsed_ms = (time.time() - started) * 1000
+    client.disconnect()
+
+    if not delivered or received[0] != payload:
+        print(f"FAIL: client on worker B did not receive the broadcast (got {received!r})")
+        return 1
+
+    print(f"OK: emit on worker A reached a client on worker B in {elapsed_ms:.1f} ms")
+    print(f"    payload: {received[0]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -76,6 +76,22 @@ CREATE TABLE `Discount`  (
   INDEX `idx_event`(`event_id` ASC, `is_active` ASC) USING BTREE COMMENT 'For event-specific discounts'
 ) ENGINE = InnoDB AUTO_INCREMENT = 30001 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Compact;
 
+-- ----------------------------
+-- Table structure for DiscountRedemption
+-- ----------------------------
+DROP TABLE IF EXISTS `DiscountRedemption`;
+CREATE TABLE `DiscountRedemption`  (
+  `order_id` bigint(20) NOT NULL,
+  `discount_id` bigint(20) NOT NULL,
+  `status` enum('RESERVED','COMMITTED','RELEASED') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT 'RESERVED',
+  `created_at` datetime NULL DEFAULT NULL,
+  `updated_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`order_id`) USING BTREE,
+  INDEX `ix_DiscountRedemption_discount_id`(`discount_id` ASC) USING BTREE,
+  CONSTRAINT `fk_discount_redemption_order` FOREIGN KEY (`order_id`) REFERENCES `Order` (`order_id`) ON DELETE CASCADE ON UPDATE RESTRICT,
+  CONSTRAINT `fk_discount_redemption_discount` FOREIGN KEY (`discount_id`) REFERENCES `Discount` (`discount_id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Compact;
+
 -- ----------------------------
 -- Table structure for Event
 -- ----------------------------
@@ -118,6 +134,39 @@ CREATE TABLE `Event`  (
   CONSTRAINT `fk_event_category` FOREIGN KEY (`category_id`) REFERENCES `EventCategory` (`category_id`) ON DELETE SET NULL ON UPDATE RESTRICT
 ) ENGINE = InnoDB AUTO_INCREMENT = 210053 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Compact;
 
+-- ----------------------------
+-- Table structure for EventCard
+-- ----------------------------
+DROP TABLE IF EXISTS `EventCard`;
+CREATE TABLE `EventCard`  (
+  `group_key` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `event_id` bigint(20) NOT NULL,
+  `category_id` bigint(20) NULL DEFAULT NULL,
+  `venue_id` bigint(20) NOT NULL,
+  `venue_city` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL,
+  `min_price` decimal(15, 2) NULL DEFAULT NULL,
+  `max_price` decimal(15, 2) NULL DEFAULT NULL,
+  `start_datetime` datetime NOT NULL,
+  `next_start_datetime` datetime NULL DEFAULT NULL,
+  `showtime_count` int(11) NOT NULL DEFAULT 1,
+  `total_capacity` int(11) NOT NULL DEFAULT 0,
+  `available_tickets` int(11) NOT NULL DEFAULT 0,
+  `is_featured` tinyint(1) NOT NULL DEFAULT 0,
+  `popularity_score` int(11) NOT NULL DEFAULT 0,
+  `created_at` datetime NOT NULL,
+  `refreshed_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`group_key`) USING BTREE,
+  INDEX `ix_EventCard_event_id`(`event_id` ASC) USING BTREE,
+  INDEX `ix_EventCard_venue_id`(`venue_id` ASC) USING BTREE,
+  INDEX `ix_EventCard_venue_city`(`venue_city` ASC) USING BTREE,
+  INDEX `ix_EventCard_min_price`(`min_price` ASC) USING BTREE,
+  INDEX `idx_event_card_category_next`(`category_id` ASC, `next_start_datetime` ASC) USING BTREE,
+  INDEX `idx_event_card_ranking`(`is_featured` ASC, `popularity_score` ASC, `created_at` ASC, `group_key` ASC) USING BTREE,
+  INDEX `idx_event_card_upcoming`(`next_start_datetime` ASC, `group_key` ASC) USING BTREE,
+  INDEX `idx_event_card_newest`(`created_at` ASC, `group_key` ASC) USING BTREE,
+  INDEX `idx_event_card_popular`(`popularity_score` ASC, `group_key` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Compact;
+
 -- ----------------------------
 -- Table structure for EventCategory
 -- ----------------------------
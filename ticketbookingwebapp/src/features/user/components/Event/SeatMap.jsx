@@ -62,6 +62,22 @@ const SeatMap = ({ ticketType, eventId, onSelectionChange, maxSelection = 10, on
             updateRowsData();
         });
 
+        socket.on('seats_updated', (data) => {
+            // Batched seat state changes (the server coalesces updates per room)
+            const changes = {};
+            (data.reserved || []).forEach(id => { changes[id] = 'RESERVED'; });
+            (data.released || []).forEach(id => { changes[id] = 'AVAILABLE'; });
+            (data.booked || []).forEach(id => { changes[id] = 'BOOKED'; });
+            setSeats(prevSeats =>
+                prevSeats.map(seat =>
+                    changes[seat.seat_id]
+                        ? { ...seat, status: changes[seat.seat_id] }
+                        : seat
+                )
+            );
+            updateRowsData();
+        });
+
         socketRef.current = socket;
 
         return () => {